@@ -0,0 +1,567 @@
+"""오프라인 크롤링 벤치마크: 로컬 가짜 병원 사이트로 전체 파이프라인 실행
+
+실제 사이트(amc.seoul.kr, snuh.org) 대신 로컬 HTTP 서버가 diseaseList.do / diseaseDetail.do
+(AMC)와 nList.do / nView.do (SNUH) 모양의 페이지를 만들어 보낸다. 응답 지연, 오류 비율,
+질병 수(1천~10만 개), 상세 페이지 크기를 정할 수 있고, --recorded로 지난 실행의 HTML
+캐시 디렉터리를 주면 기록된 실제 페이지를 그대로 보낸다.
+
+크롤링은 실행마다 새 프로세스에서 crawler.run()으로 목록 수집 → 상세 페이지 → 파싱 →
+출력(AMC는 파일, SNUH는 --db가 있으면 PostgreSQL, 없으면 JSONL)까지 전부 돌리고,
+처리량, 최대 메모리, 단계별 소요 시간을 출력한다. 같은 작업 디렉터리에서 --runs번
+반복하므로 두 번째 실행부터는 증분 크롤링(304, 변경 없음) 경로를 잰다.
+
+--save에 결과를 한 줄씩 쌓아 두고 --compare로 같은 설정의 지난 결과와 비교하면
+커밋 사이에 fetch / parse / DB 경로가 느려졌는지 확인할 수 있다.
+
+--max-rss를 주면 크롤러나 파싱 프로세스의 최대 메모리가 그 값(MB)을 넘을 때 종료 코드 1로
+끝난다. 질병 수를 바꿔 가며 같은 상한으로 돌리면 메모리가 목록 크기에 따라 늘지 않는지
+(--seen disk, 스트리밍 경로) 확인할 수 있다.
+
+--profile로 crawler.py와 같은 크롤링 프로필(profiles.py, --config 설정 파일)을 골라 배치 크기,
+대기열, 재시도 설정별 처리량을 잴 수 있다 (미러·동시 요청 수·속도는 이 스크립트 옵션이 우선).
+실행마다 적용된 설정 값과 해시가 측정값에 남아 --save 결과에도 함께 기록된다.
+
+    python bench_crawl.py --diseases 1000 --latency 20 --error-rate 0.01
+    python bench_crawl.py --diseases 100000 --save bench_results.jsonl --compare bench_results.jsonl
+    python bench_crawl.py --db "host=localhost dbname=postgres user=postgres"
+    python bench_crawl.py --diseases 200000 --page-kb 4 --seen disk --max-rss 150
+    python bench_crawl.py --diseases 5000 --profile fast-local-mirror --save bench_results.jsonl
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import resource  # 최대 메모리 (Unix)
+except ImportError:
+    resource = None
+
+HOSTS = ('www.amc.seoul.kr', 'www.snuh.org')
+DEPARTMENTS = ('내과', '외과', '신경과', '소아청소년과', '피부과', '안과', '정형외과', '이비인후과')
+SYMPTOMS = ('두통', '발열', '기침', '복통', '구토', '어지러움', '피로감', '발진', '호흡곤란', '관절통')
+
+
+# ---------------------------------------------------------------------------
+# 가짜 병원 사이트
+
+class MockCatalogue:
+    """질병 번호로 목록·상세 페이지 HTML을 만드는 가짜 사이트 (같은 번호는 항상 같은 내용)"""
+
+    def __init__(self, diseases, per_page=20, page_kb=40):
+        self.diseases = diseases
+        self.per_page = per_page
+        self.pages = (diseases + per_page - 1) // per_page
+        # 실제 페이지처럼 메뉴·스크립트·꼬리말이 본문보다 훨씬 큼 (파싱 비용을 비슷하게)
+        menu = ''.join(f'<li><a href="/menu/{i}.do">메뉴 항목 {i}</a></li>' for i in range(40))
+        block = f'<div class="gnb"><ul>{menu}</ul></div><script>var config = {{"page": 1}};</script>'
+        self.filler = block * max(1, page_kb * 1024 // len(block.encode()))
+
+    def _page(self, body):
+        return f'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>{self.filler}{body}</body></html>'
+
+    def _range(self, page_index):
+        start = (page_index - 1) * self.per_page
+        return range(max(start, 0), min(start + self.per_page, self.diseases))
+
+    def _pager(self, page_index):
+        # 10쪽 단위 페이저 + 처음/마지막 링크 (전자정부 프레임워크 기본 모양)
+        block = (page_index - 1) // 10 * 10
+        links = [f'<a href="?pageIndex={k}">{k}</a>' for k in range(block + 1, min(block + 10, self.pages) + 1)]
+        links = ['<a href="?pageIndex=1">처음</a>'] + links + [f'<a href="?pageIndex={self.pages}">마지막</a>']
+        return f'<div class="pagingWrapper">{"".join(links)}</div>'
+
+    def _symptoms(self, i):
+        rng = random.Random(i)
+        return rng.sample(SYMPTOMS, 3), rng.sample(DEPARTMENTS, 2)
+
+    def amc_list(self, page_index):
+        items = ''.join(
+            f'<li><a href="./diseaseDetail.do?contentId={i}">질환{i}(Disease {i})</a></li>'
+            for i in self._range(page_index)
+        )
+        return self._page(f'<ul class="descBox">{items}</ul>{self._pager(page_index)}')
+
+    def amc_detail(self, i):
+        symptoms, departments = self._symptoms(i)
+        related = ''.join(f'<a href="#">질환{(i + k) % self.diseases}</a>' for k in (1, 2))
+        return self._page(f'''<div class="contBox"><strong class="contTitle">질환{i}(Disease {i})</strong><dl>
+<dt>증상</dt><dd><ul>{"".join(f"<li>{s}</li>" for s in symptoms)}</ul></dd>
+<dt>진료과</dt><dd>{"".join(f'<a href="#">{d}</a>' for d in departments)}</dd>
+<dt>동의어</dt><dd>syn{i}, 별칭{i}</dd>
+<dt>관련질환</dt><dd>{related}</dd></dl></div>''')
+
+    def snuh_list(self, page_index):
+        items = ''.join(
+            f'<div class="item"><a href="./nView.do?medid={i}"><strong>질병{i}[Disease {i}]</strong></a></div>'
+            for i in self._range(page_index)
+        )
+        return self._page(f'<div class="thumbType04">{items}</div>')
+
+    def snuh_detail(self, i):
+        symptoms, departments = self._symptoms(i)
+        return self._page(f'''<h3>질병{i}[Disease {i}]</h3>
+<div class="viewRow tooltipRow"><em>진료과</em><p>{"".join(f'<a href="#">{d}</a>' for d in departments)}</p></div>
+<div id="section-정의"><p>정의 {i}</p></div>
+<div id="section-증상"><h5>증상</h5>{"".join(f"<p>{s}</p>" for s in symptoms)}</div>''')
+
+    def render(self, path, query):
+        """(HTML, ETag 사용 여부) 또는 None"""
+        q = parse_qs(query)
+        try:
+            if path.endswith('diseaseList.do'):
+                return self.amc_list(int(q['pageIndex'][0])), False
+            if path.endswith('diseaseDetail.do'):
+                i = int(q['contentId'][0])
+                return (self.amc_detail(i), False) if i < self.diseases else None
+            if path.endswith('nList.do'):
+                return self.snuh_list(int(q['pageIndex'][0])), False
+            if path.endswith('nView.do'):
+                i = int(q['medid'][0])
+                return (self.snuh_detail(i), True) if i < self.diseases else None
+        except (KeyError, ValueError):
+            return None
+        return None
+
+
+class RecordedPages:
+    """지난 실행의 HTML 캐시(HtmlCache 디렉터리)에 기록된 페이지를 경로+쿼리로 찾아 보냄"""
+
+    def __init__(self, dirs):
+        from cache import HtmlCache
+
+        self.index = {}
+        for root in dirs:
+            cache = HtmlCache(root)
+            for url in cache.urls():
+                parts = urlsplit(url)
+                self.index[f'{parts.path}?{parts.query}'] = (cache, url)
+
+    def render(self, path, query):
+        entry = self.index.get(f'{path}?{query}')
+        if entry is None:
+            return None
+        cache, url = entry
+        html = cache.get(url)
+        return (html, True) if html is not None else None
+
+
+def serve_mock(port, options, ready):
+    """가짜 사이트 HTTP 서버 (별도 프로세스에서 실행)"""
+    if options['recorded']:
+        pages = RecordedPages(options['recorded'])
+    else:
+        pages = MockCatalogue(options['diseases'], options['per_page'], options['page_kb'])
+    latency = options['latency'] / 1000
+    jitter = options['jitter'] / 1000
+    error_rate = options['error_rate']
+    rng = random.Random(options['seed'])
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body=b'', headers=()):
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if latency or jitter:
+                time.sleep(max(0.0, latency + rng.uniform(-jitter, jitter)))
+            if error_rate and rng.random() < error_rate:
+                self._reply(503, b'Service Unavailable')
+                return
+
+            url = urlsplit(self.path)
+            page = pages.render(url.path, url.query)
+            if page is None:
+                self._reply(404, b'Not Found')
+                return
+
+            html, use_etag = page
+            body = html.encode('utf-8')
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+            if use_etag:
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                headers.append(('ETag', etag))
+                if self.headers.get('If-None-Match') == etag:
+                    self._reply(304, headers=headers[1:])
+                    return
+            self._reply(200, body, headers)
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    ready.set()
+    server.serve_forever()
+
+
+def wait_for_server(base, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'{base}/health', timeout=1)
+        except urllib.error.HTTPError:
+            return  # 404라도 응답하면 준비됨
+        except OSError:
+            time.sleep(0.1)
+        else:
+            return
+    raise RuntimeError(f"가짜 사이트가 응답하지 않습니다: {base}")
+
+
+# ---------------------------------------------------------------------------
+# 크롤링 실행 (실행마다 새 프로세스)
+
+def peak_memory_mb():
+    """(이 프로세스 최대 RSS, 끝난 자식 프로세스 중 최대 RSS) MB. 측정할 수 없으면 None"""
+    if resource is None:
+        return None, None
+    # Linux는 KB, macOS는 바이트 단위
+    unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit)
+
+
+def build_sites(options):
+    import asan
+    import uni
+
+    sites = {'amc': asan.AmcSite(), 'snuh': uni.SnuhSite()}
+    if options['db']:
+        uni.DB_CONFIG = {'dsn': options['db']}
+        uni.DB_TABLE = options['db_table']
+    else:
+        # DB 없이도 SNUH 파이프라인 전체를 돌 수 있도록 JSONL로 저장
+        from sinks import JsonLinesSink
+
+        snuh = sites['snuh']
+        snuh.open_output = lambda on_saved: JsonLinesSink('snuh_diseases.jsonl', uni.DB_COLUMNS)
+        snuh.output_summary = lambda sink: []
+
+    return [sites[name] for name in options['sites']]
+
+
+def bench_profile(base, options):
+    """--profile 설정에 벤치마크 값(가짜 사이트 미러, HTTP 페처, 동시 요청 수, 속도)을 덮어쓴 프로필"""
+    import crawler
+    from profiles import load_profile
+
+    pages = (options['diseases'] + options['per_page'] - 1) // options['per_page']
+    overrides = {
+        'mirrors': {host: base for host in HOSTS},
+        'fetch_backend': 'http',
+        'workers': options['workers'],
+        'rate_limit': options['rate'],
+        'max_pages': max(crawler.Site.max_pages, pages + 1),
+    }
+    if options['parse_workers'] is not None:
+        overrides['parse_workers'] = options['parse_workers']
+    if options['seen']:
+        overrides['seen_urls'] = options['seen']
+    return load_profile(options['profile'], options['config'], overrides)
+
+
+def crawl_once(workdir, base, options, results):
+    """작업 디렉터리에서 crawler.run() 한 번 실행하고 측정값을 results로 보냄"""
+    os.chdir(workdir)
+    log = open('crawl.log', 'a', encoding='utf-8')
+    sys.stdout = sys.stderr = log
+
+    import crawler
+    from metrics import METRICS
+
+    profile = bench_profile(base, options)
+    sites = build_sites(options)
+    start = time.perf_counter()
+    crawler.run(sites, profile=profile)
+    elapsed = time.perf_counter() - start
+
+    log.flush()
+    result = METRICS.to_dict()
+    result['elapsed'] = round(elapsed, 3)
+    result['peak_rss_mb'], result['peak_child_rss_mb'] = peak_memory_mb()
+    results.put(result)
+
+
+def prepare_db(options):
+    import psycopg2
+    import uni
+
+    conn = psycopg2.connect(options['db'])
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {options['db_table']}")
+    cursor.execute(f"""
+        CREATE TABLE {options['db_table']} (
+            id SERIAL PRIMARY KEY,
+            {', '.join(f'{c} TEXT' for c in uni.DB_COLUMNS if c != 'url')},
+            url TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP
+        )
+    """)
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# 결과 정리, 저장, 비교
+
+def counter(metrics, name, **labels):
+    return sum(c['value'] for c in metrics['counters']
+               if c['name'] == name and all(c['labels'].get(k) == v for k, v in labels.items()))
+
+
+def summarize(result):
+    """비교에 쓰는 주요 값"""
+    elapsed = result['elapsed'] or 1e-9
+    pages = counter(result, 'pages_total')
+    rows = counter(result, 'rows_total')
+    summary = {
+        'elapsed': result['elapsed'],
+        'pages': pages,
+        'failed': counter(result, 'pages_total', result='failed'),
+        'unchanged': counter(result, 'pages_total', result='unchanged'),
+        'errors': counter(result, 'errors_total'),
+        'retries': counter(result, 'retries_total'),
+        'pages_per_sec': round(pages / elapsed, 1),
+        'rows_per_sec': round(rows / elapsed, 1),
+        'peak_rss_mb': result['peak_rss_mb'] and round(result['peak_rss_mb'], 1),
+        'peak_child_rss_mb': result['peak_child_rss_mb'] and round(result['peak_child_rss_mb'], 1),
+    }
+    for stage in result['stages']:
+        # 가짜 사이트 포트는 실행마다 달라지므로 비교 키에서 뺌
+        labels = {k: 'mock' if k in ('host', 'mirror') and v.startswith('127.0.0.1:') else v
+                  for k, v in stage['labels'].items()}
+        label = ','.join(f'{k}={v}' for k, v in sorted(labels.items()))
+        key = f"{stage['name'].replace('_seconds', '')}[{label}]"
+        summary[f'{key}.p50_ms'] = round(stage['p50'] * 1000, 2)
+        summary[f'{key}.p95_ms'] = round(stage['p95'] * 1000, 2)
+        summary[f'{key}.sum_s'] = round(stage['sum'], 3)
+    return summary
+
+
+def print_run(index, result):
+    summary = summarize(result)
+    print(f"\n[실행 {index}] {summary['elapsed']:.1f}초, 상세 페이지 {summary['pages']}개 "
+          f"(실패 {summary['failed']}, 변경 없음 {summary['unchanged']}, 오류 {summary['errors']})")
+    print(f"  처리량: {summary['pages_per_sec']} 페이지/초, {summary['rows_per_sec']} 행/초")
+    print(f"  프로필: {result['info']['profile']} ({result['info']['profile_digest']})")
+    if summary['peak_rss_mb'] is not None:
+        print(f"  최대 메모리: 크롤러 {summary['peak_rss_mb']} MB, 파싱 프로세스 {summary['peak_child_rss_mb']} MB")
+    print(f"  {'단계':<16}{'구분':<36}{'횟수':>8}{'p50ms':>9}{'p95ms':>9}{'합계s':>9}")
+    for stage in result['stages']:
+        label = ','.join(f'{v}' for _, v in sorted(stage['labels'].items()))
+        print(f"  {stage['name'].replace('_seconds', ''):<16}{label[:35]:<36}{stage['count']:>8}"
+              f"{stage['p50'] * 1000:>9.1f}{stage['p95'] * 1000:>9.1f}{stage['sum']:>9.2f}")
+    retries, trips = counter(result, 'retries_total'), counter(result, 'circuit_open_total')
+    if retries or trips:
+        print(f"  재시도 {retries}회, 회로 차단 {trips}회")
+    errors = [c for c in result['counters'] if c['name'] == 'errors_total']
+    for c in errors:
+        print(f"  오류: {', '.join(f'{k}={v}' for k, v in sorted(c['labels'].items()))} → {c['value']}")
+
+
+def git_revision():
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=here,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=here,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+# 같은 설정끼리만 비교 (db, sites 등이 다르면 비교하지 않음)
+COMPARE_KEYS = ('diseases', 'per_page', 'page_kb', 'latency', 'jitter', 'error_rate', 'workers',
+                'rate', 'parse_workers', 'sites', 'recorded', 'db', 'seen', 'profile')
+
+# 값이 클수록 좋은 항목 (나머지는 작을수록 좋음)
+HIGHER_IS_BETTER = ('pages_per_sec', 'rows_per_sec')
+
+
+def load_baseline(path, options):
+    if not os.path.exists(path):
+        return None
+    baseline = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if all(entry['options'].get(k) == options.get(k) for k in COMPARE_KEYS):
+                baseline = entry  # 같은 설정 중 가장 최근 결과
+    return baseline
+
+
+def print_comparison(baseline, runs, threshold):
+    print(f"\n[비교] 기준: {baseline['revision']} ({baseline['time']}), 변화가 {threshold:.0%} 넘는 항목에 표시")
+    for index, (old, new) in enumerate(zip(baseline['runs'], runs), 1):
+        new = summarize(new)
+        print(f"  실행 {index}")
+        for key, value in new.items():
+            before = old.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before:
+                continue
+            if key.endswith('_ms') and max(before, value) < 1:
+                continue  # 1ms 미만은 측정 잡음이 더 큼
+            change = (value - before) / before
+            worse = -change if key in HIGHER_IS_BETTER else change
+            mark = ' ✗ 느려짐' if worse > threshold else ' ✓ 빨라짐' if worse < -threshold else ''
+            if key.endswith('.sum_s') and not mark:
+                continue
+            print(f"    {key:<58}{before:>12} → {value:<12}({change:+.1%}){mark}")
+
+
+def check_memory_ceiling(runs, limit_mb):
+    """실행마다 크롤러·파싱 프로세스의 최대 메모리가 limit_mb 이하인지 확인 (넘으면 종료 코드 1)"""
+    over = []
+    for index, result in enumerate(runs, 1):
+        for key, label in (('peak_rss_mb', '크롤러'), ('peak_child_rss_mb', '파싱 프로세스')):
+            value = result[key]
+            if value is None:
+                print(f"\n[메모리 상한] 이 플랫폼에서는 최대 메모리를 잴 수 없습니다.")
+                return
+            if value > limit_mb:
+                over.append(f"실행 {index} {label} {value:.1f} MB")
+    if over:
+        print(f"\n✗ 메모리 상한 {limit_mb} MB 초과: {', '.join(over)}")
+        sys.exit(1)
+    print(f"\n✓ 메모리 상한 {limit_mb} MB 이내")
+
+
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="로컬 가짜 병원 사이트로 크롤링 전체 파이프라인 측정")
+    parser.add_argument('--diseases', type=int, default=1000,
+                        help="사이트별 질병 수 (기본 1000, --recorded면 목록 페이지 상한 계산에만 사용)")
+    parser.add_argument('--per-page', type=int, default=20, help="목록 페이지당 질병 수")
+    parser.add_argument('--page-kb', type=int, default=40, help="상세·목록 페이지 크기 (KB, 메뉴·스크립트 포함)")
+    parser.add_argument('--latency', type=float, default=0, help="응답 지연 (ms)")
+    parser.add_argument('--jitter', type=float, default=0, help="응답 지연 흔들림 (± ms)")
+    parser.add_argument('--error-rate', type=float, default=0, help="503으로 응답할 비율 (0~1)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--recorded', nargs='*', metavar='CACHE_DIR',
+                        help="생성한 페이지 대신 보낼 HTML 캐시 디렉터리 (예: cache/amc cache/snuh)")
+    parser.add_argument('--sites', nargs='*', default=['amc', 'snuh'], choices=['amc', 'snuh'])
+    parser.add_argument('--workers', type=int, default=8, help="사이트별 동시 요청 수")
+    parser.add_argument('--rate', type=float, default=0, help="호스트별 초당 최대 요청 수 (0이면 제한 없음)")
+    parser.add_argument('--parse-workers', type=int, help="파싱 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--runs', type=int, default=1, help="같은 작업 디렉터리에서 반복할 횟수 (2번째부터 증분)")
+    parser.add_argument('--db', help="SNUH 결과를 저장할 PostgreSQL DSN (없으면 JSONL)")
+    parser.add_argument('--db-table', default='bench_snuh_diseases')
+    parser.add_argument('--port', type=int, default=0, help="가짜 사이트 포트 (0이면 빈 포트)")
+    parser.add_argument('--workdir', help="작업 디렉터리 (기본: 임시 디렉터리, 끝나면 삭제)")
+    parser.add_argument('--save', help="결과를 한 줄씩 덧붙일 JSONL 파일")
+    parser.add_argument('--compare', help="같은 설정의 지난 결과와 비교할 JSONL 파일")
+    parser.add_argument('--threshold', type=float, default=0.1, help="느려짐으로 표시할 변화 비율")
+    parser.add_argument('--seen', choices=('memory', 'disk', 'bloom'),
+                        help="목록 중복 제거용 본 URL 집합 (기본: crawler 설정)")
+    parser.add_argument('--profile',
+                        help="크롤링 프로필 (배치 크기·대기열·재시도 등, 미러·동시 요청 수·속도는 위 옵션이 우선)")
+    parser.add_argument('--config', help="프로필 설정 파일 (.toml / .json)")
+    parser.add_argument('--max-rss', type=float,
+                        help="메모리 상한 (MB): 크롤러나 파싱 프로세스의 최대 메모리가 넘으면 종료 코드 1")
+    return parser.parse_args()
+
+
+def free_port():
+    import socket
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def main():
+    args = parse_args()
+    if args.config:
+        args.config = os.path.abspath(args.config)  # 크롤링은 작업 디렉터리에서 실행
+    options = {k: v for k, v in vars(args).items()
+               if k not in ('port', 'workdir', 'save', 'compare', 'threshold', 'runs', 'max_rss')}
+    context = multiprocessing.get_context('spawn')
+
+    port = args.port or free_port()
+    base = f'http://127.0.0.1:{port}'
+    ready = context.Event()
+    server = context.Process(target=serve_mock, args=(port, options, ready), daemon=True)
+    server.start()
+    ready.wait(30)
+    wait_for_server(base)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench_crawl_')
+    os.makedirs(workdir, exist_ok=True)
+    conn = prepare_db(options) if args.db else None
+
+    source = f"기록된 페이지 {', '.join(args.recorded)}" if args.recorded else f"질병 {args.diseases:,}개/사이트"
+    print(f"[벤치마크] {source}, 지연 {args.latency}±{args.jitter}ms, 오류 {args.error_rate:.1%}, "
+          f"사이트 {', '.join(args.sites)}, 동시 요청 {args.workers}")
+    print(f"  가짜 사이트 {base}, 작업 디렉터리 {workdir} (로그: crawl.log)")
+
+    runs = []
+    try:
+        for index in range(1, args.runs + 1):
+            results = context.Queue()
+            worker = context.Process(target=crawl_once, args=(workdir, base, options, results))
+            worker.start()
+            result = None
+            while result is None:
+                try:
+                    result = results.get(timeout=1)
+                except queue.Empty:
+                    if not worker.is_alive():
+                        raise RuntimeError(f"크롤링 프로세스가 비정상 종료했습니다 ({workdir}/crawl.log 확인)")
+            worker.join()
+            runs.append(result)
+            print_run(index, result)
+    finally:
+        server.terminate()
+        if conn is not None:
+            conn.close()
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.compare:
+        baseline = load_baseline(args.compare, options)
+        if baseline is None:
+            print(f"\n[비교] {args.compare}에 같은 설정의 결과가 없습니다.")
+        else:
+            print_comparison(baseline, runs, args.threshold)
+
+    if args.save:
+        entry = {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'revision': git_revision(),
+            'options': options,
+            # 실제로 적용된 설정 값 (같은 프로필이라도 설정 파일·코드 기본값이 바뀌면 해시가 달라짐)
+            'profile_digest': runs[-1]['info']['profile_digest'],
+            'settings': runs[-1]['settings'],
+            'runs': [summarize(result) for result in runs],
+        }
+        with open(args.save, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        print(f"\n✓ '{args.save}'에 결과 저장")
+
+    if args.max_rss:
+        check_memory_ceiling(runs, args.max_rss)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""BulkWriter 저장 속도 측정 (로컬 PostgreSQL)
+
+임시 테이블을 만들어 가짜 레코드 N개를 배치로 저장하고, 행 수·upsert 동작을 확인한 뒤
+초당 저장 건수를 출력한다. 끝나면 테이블을 지운다.
+
+    python bench_db.py --rows 20000 --host localhost --dbname postgres --user postgres
+"""
+import argparse
+import time
+
+import psycopg2
+
+from dbwriter import BulkWriter
+
+COLUMNS = ('disease_name_kr', 'disease_name_eng', 'department', 'symptoms', 'url')
+TABLE = 'bench_bulk_writer'
+
+
+def make_rows(count, tag=''):
+    return [{
+        'disease_name_kr': f'질환{i}',
+        'disease_name_eng': None if i % 7 == 0 else f'Disease {i}',
+        'department': '내과, 외과' if i % 2 else '소아청소년과',
+        'symptoms': f'증상\t{i}\n두통 \\ 발열{tag}',
+        'url': f'https://example.com/disease/{i}',
+    } for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BulkWriter 저장 속도 측정')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--pool-size', type=int, default=2)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5432)
+    parser.add_argument('--dbname', default='postgres')
+    parser.add_argument('--user', default='postgres')
+    parser.add_argument('--password', default='')
+    args = parser.parse_args()
+
+    db_config = {'host': args.host, 'port': args.port, 'dbname': args.dbname,
+                 'user': args.user, 'password': args.password}
+    conn = psycopg2.connect(**db_config)
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            id SERIAL PRIMARY KEY,
+            {', '.join(f'{c} TEXT' for c in COLUMNS if c != 'url')},
+            url TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP
+        )
+    """)
+
+    try:
+        for label, rows in (('신규 저장', make_rows(args.rows)),
+                            ('같은 내용 재저장', make_rows(args.rows)),
+                            ('변경 내용 저장', make_rows(args.rows, tag='!'))):
+            writer = BulkWriter(db_config, TABLE, COLUMNS, pool_size=args.pool_size)
+            start = time.perf_counter()
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= writer.batch_size:
+                    writer.submit(batch)
+                    batch = []
+            if batch:
+                writer.submit(batch)
+            writer.close()
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {len(rows)}개 {elapsed:.2f}초 ({len(rows) / elapsed:,.0f}개/초, 배치 {writer.batch_size})")
+
+        cursor.execute(f"SELECT COUNT(*), COUNT(disease_name_eng) FROM {TABLE}")
+        total, with_eng = cursor.fetchone()
+        cursor.execute(f"SELECT symptoms FROM {TABLE} WHERE url = %s", (rows[1]['url'],))
+        symptoms = cursor.fetchone()[0]
+        print(f"행 수: {total} (기대 {args.rows}), 영문명 있는 행: {with_eng}")
+        print(f"특수문자 보존: {symptoms == rows[1]['symptoms']}")
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
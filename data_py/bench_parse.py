@@ -0,0 +1,261 @@
+"""상세 페이지 파서 마이크로 벤치마크
+
+저장된 AMC/SNUH 상세 페이지로 현재 파서(lxml, 구간 파싱, 한 번 순회)와
+변경 전 파서(BeautifulSoup html.parser, 여러 번 전체 탐색)의 속도를 비교하고
+두 결과가 필드 단위로 같은지 확인한다.
+
+    python bench_parse.py --site amc --cache cache/amc
+    python bench_parse.py --site snuh --dir saved/snuh --rounds 5
+"""
+import argparse
+import glob
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+import asan
+import uni
+from cache import HtmlCache
+from records import flatten
+
+
+def legacy_amc_detail(html, url, disease_name):
+    """변경 전 asan.py의 parse_disease_detail (BeautifulSoup html.parser, 여러 번 전체 탐색)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # 질병명 추출 (한글명, 영문명)
+    disease_name_kr = disease_name
+    disease_name_eng = ""
+    
+    # 질병명이 "질병명(영문명)" 형태일 경우 분리
+    if '(' in disease_name and ')' in disease_name:
+        disease_name_kr = disease_name.split('(')[0].strip()
+        disease_name_eng = disease_name.split('(')[1].split(')')[0].strip()
+    
+    # 증상 추출
+    symptoms = []
+    symptom_section = soup.find('dt', string='증상')
+    if symptom_section:
+        symptom_dd = symptom_section.find_next_sibling('dd')
+        if symptom_dd:
+            symptom_items = symptom_dd.find_all('li')
+            if symptom_items:
+                symptoms = [item.get_text(strip=True) for item in symptom_items]
+            else:
+                symptoms_text = symptom_dd.get_text(strip=True)
+                if symptoms_text:
+                    symptoms = [symptoms_text]
+    
+    symptoms_str = ', '.join(symptoms) if symptoms else "정보 없음"
+    
+    # 진료과 추출
+    departments = []
+    dept_section = soup.find('dt', string='진료과')
+    if dept_section:
+        dept_dd = dept_section.find_next_sibling('dd')
+        if dept_dd:
+            dept_links = dept_dd.find_all('a')
+            if dept_links:
+                departments = [link.get_text(strip=True) for link in dept_links]
+            else:
+                dept_text = dept_dd.get_text(strip=True)
+                if dept_text:
+                    departments = [dept_text]
+    
+    departments_str = ', '.join(departments) if departments else "정보 없음"
+    
+    # 동의어 추출
+    synonyms = []
+    synonym_section = soup.find('dt', string='동의어')
+    if synonym_section:
+        synonym_dd = synonym_section.find_next_sibling('dd')
+        if synonym_dd:
+            synonym_text = synonym_dd.get_text(strip=True)
+            if synonym_text:
+                # 쉼표나 공백으로 분리
+                synonyms = [s.strip() for s in synonym_text.replace(',', ' ').split() if s.strip()]
+    
+    synonyms_str = ', '.join(synonyms) if synonyms else "정보 없음"
+    
+    # 관련질환 추출
+    related_diseases = []
+    related_section = soup.find('dt', string='관련질환')
+    if related_section:
+        related_dd = related_section.find_next_sibling('dd')
+        if related_dd:
+            related_links = related_dd.find_all('a')
+            if related_links:
+                related_diseases = [link.get_text(strip=True) for link in related_links]
+            else:
+                related_text = related_dd.get_text(strip=True)
+                if related_text:
+                    related_diseases = [related_text]
+    
+    related_diseases_str = ', '.join(related_diseases) if related_diseases else "정보 없음"
+    
+    result = {
+        'disease_name_kr': disease_name_kr,
+        'disease_name_eng': disease_name_eng,
+        'symptoms': symptoms_str,
+        'department': departments_str,
+        'synonyms': synonyms_str,
+        'related_diseases': related_diseases_str,
+        'url': url
+    }
+    
+    return result
+
+
+def legacy_snuh_detail(html, url, disease_name):
+    """변경 전 uni.py의 parse_disease_detail (BeautifulSoup html.parser, 여러 번 전체 탐색)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # 병명 추출
+    disease_name_kr = ""
+    disease_name_eng = ""
+    
+    title_elem = soup.find('h3')
+    if title_elem:
+        title_text = title_elem.get_text(strip=True)
+        if '[' in title_text and ']' in title_text:
+            disease_name_kr = title_text.split('[')[0].strip()
+            disease_name_eng = title_text.split('[')[1].split(']')[0].strip()
+        else:
+            disease_name_kr = title_text
+    else:
+        disease_name_kr = disease_name
+    
+    # 진료과 추출
+    department = ""
+    dept_div = soup.find('div', class_='viewRow tooltipRow')
+    if dept_div:
+        em_tag = dept_div.find('em')
+        if em_tag and '진료과' in em_tag.get_text():
+            p_tag = dept_div.find('p')
+            if p_tag:
+                dept_links = p_tag.find_all('a')
+                if dept_links:
+                    departments = [link.get_text(strip=True) for link in dept_links]
+                    department = ', '.join(departments)
+    
+    if not department:
+        all_viewrows = soup.find_all('div', class_='viewRow')
+        for viewrow in all_viewrows:
+            em_tag = viewrow.find('em')
+            if em_tag and '진료과' in em_tag.get_text():
+                p_tag = viewrow.find('p')
+                if p_tag:
+                    dept_links = p_tag.find_all('a')
+                    if dept_links:
+                        departments = [link.get_text(strip=True) for link in dept_links]
+                        department = ', '.join(departments)
+                    break
+    
+    # 증상 추출
+    symptoms = ""
+    symptom_div = soup.find('div', id='section-증상')
+    if symptom_div:
+        p_tags = symptom_div.find_all('p')
+        if p_tags:
+            symptoms_list = [p.get_text(strip=True) for p in p_tags if p.get_text(strip=True)]
+            symptoms = ' '.join(symptoms_list)
+    
+    if not symptoms:
+        symptom_headers = soup.find_all('h5')
+        for header in symptom_headers:
+            if '증상' in header.get_text():
+                parent_div = header.find_parent('div')
+                if parent_div:
+                    p_tags = parent_div.find_all('p')
+                    if p_tags:
+                        symptoms_list = [p.get_text(strip=True) for p in p_tags if p.get_text(strip=True)]
+                        symptoms = ' '.join(symptoms_list)
+                        break
+    
+    if not symptoms:
+        definition_div = soup.find('div', id='section-정의')
+        if definition_div:
+            p_tags = definition_div.find_all('p')
+            if p_tags:
+                symptoms_list = [p.get_text(strip=True) for p in p_tags[:2] if p.get_text(strip=True)]
+                symptoms = ' '.join(symptoms_list)
+    
+    result = {
+        'disease_name_kr': disease_name_kr,
+        'disease_name_eng': disease_name_eng,
+        'department': department if department else None,
+        'symptoms': symptoms if symptoms else None,
+        'url': url
+    }
+    
+    return result
+
+
+# (현재 파서, 변경 전 파서, 예전 문자열 형식에서 빈 목록 표기)
+SITES = {
+    'amc': (asan.parse_disease_detail, legacy_amc_detail, asan.MISSING_TEXT),
+    'snuh': (uni.parse_disease_detail, legacy_snuh_detail, None),
+}
+
+
+def load_pages(cache_dir=None, html_dir=None):
+    """(url, html) 목록. 캐시에서는 목록 페이지(*List.do)를 제외한 상세 페이지만"""
+    pages = []
+    if cache_dir:
+        cache = HtmlCache(cache_dir)
+        for url in cache.urls():
+            if 'List.do' not in url:
+                html = cache.get(url)
+                if html is not None:
+                    pages.append((url, html))
+        cache.close()
+    if html_dir:
+        for path in sorted(glob.glob(os.path.join(html_dir, '*.html'))):
+            with open(path, encoding='utf-8') as f:
+                pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def run(parse, pages, rounds):
+    """rounds번 전체 페이지를 파싱하고 (초당 페이지 수, 마지막 결과 목록) 반환"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = [parse(html, url, url) for url, html in pages]
+    elapsed = time.perf_counter() - start
+    return len(pages) * rounds / elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상세 페이지 파서 벤치마크")
+    parser.add_argument('--site', choices=sorted(SITES), required=True)
+    parser.add_argument('--cache', help="HtmlCache 디렉터리 (예: cache/amc)")
+    parser.add_argument('--dir', help="저장된 상세 페이지 *.html 디렉터리")
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.cache, args.dir)
+    if not pages:
+        print("벤치마크할 페이지가 없습니다. --cache 또는 --dir을 지정하세요.")
+        return
+
+    current, legacy, missing = SITES[args.site]
+    legacy_rate, legacy_results = run(legacy, pages, args.rounds)
+    current_rate, current_results = run(current, pages, args.rounds)
+
+    print(f"[{args.site}] 페이지 {len(pages)}개 x {args.rounds}회")
+    print(f"- 변경 전 (bs4 html.parser): {legacy_rate:8.1f} pages/sec")
+    print(f"- 현재 (lxml):               {current_rate:8.1f} pages/sec  ({current_rate / legacy_rate:.1f}배)")
+
+    mismatches = 0
+    for (url, _), old, new in zip(pages, legacy_results, current_results):
+        new = flatten(new, missing)
+        for field in old:
+            if old[field] != new[field]:
+                mismatches += 1
+                print(f"  [차이] {url} {field}: {old[field]!r} → {new[field]!r}")
+    print(f"- 필드 차이: {mismatches}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""시작 시간 측정: 모듈 import와 첫 요청까지 걸리는 시간
+
+모듈마다 새 인터프리터에서 import 시간을 재고, 무거운 라이브러리(selenium, requests 등)가
+같이 불러와졌는지 보여 준다. --url을 주면 페처를 만들어 첫 페이지를 가져오기까지의
+시간도 잰다 (selenium이면 브라우저 시작 시간 포함).
+
+    python bench_startup.py
+    python bench_startup.py --url http://127.0.0.1:8765/health/nMedInfo/nList.do?pageIndex=1 --backend http
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HEAVY = ('selenium', 'requests', 'psycopg2', 'pandas', 'pyarrow', 'bs4')
+
+_IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_FIRST_FETCH = """
+import json, time
+start = time.perf_counter()
+from fetcher import create_fetcher
+imported = time.perf_counter()
+fetcher = create_fetcher({backend!r})
+html = fetcher.fetch({url!r})
+fetched = time.perf_counter()
+fetcher.close()
+print(json.dumps({{'import': imported - start, 'first_fetch': fetched - imported, 'size': len(html or '')}}))
+"""
+
+
+def run_snippet(code):
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-c', code], cwd=here, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import / 첫 요청 시간 측정")
+    parser.add_argument('--modules', nargs='*', default=['asan', 'uni', 'crawler'])
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--url', help="첫 요청 시간을 잴 URL")
+    parser.add_argument('--backend', default='http', choices=['http', 'selenium', 'auto'])
+    args = parser.parse_args()
+
+    print("[import 시간] (새 인터프리터, 최솟값)")
+    for module in args.modules:
+        runs = [run_snippet(_IMPORT.format(module=module, heavy=HEAVY)) for _ in range(args.rounds)]
+        best = min(run['seconds'] for run in runs)
+        loaded = ', '.join(runs[0]['loaded']) or '-'
+        print(f"  {module:<10} {best * 1000:7.1f} ms   함께 불러온 라이브러리: {loaded}")
+
+    if args.url:
+        print(f"\n[첫 요청] backend={args.backend}")
+        result = run_snippet(_FIRST_FETCH.format(backend=args.backend, url=args.url))
+        print(f"  fetcher import {result['import'] * 1000:7.1f} ms")
+        print(f"  첫 요청        {result['first_fetch'] * 1000:7.1f} ms ({result['size']:,}자)")
+
+
+if __name__ == "__main__":
+    main()
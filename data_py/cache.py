@@ -0,0 +1,179 @@
+import gzip
+import os
+import sqlite3
+import threading
+import time
+
+from fetcher import Fetcher, Page
+from state import content_hash
+
+# 정리할 때 한 번에 읽는 항목 수 (항목이 수백만 개여도 메모리에 다 올리지 않음)
+EVICT_BATCH = 1000
+
+
+class CacheMiss(Exception):
+    """오프라인 모드에서 캐시에 없는 URL을 요청함"""
+
+
+def _blob_path(root, digest):
+    return os.path.join(root, 'objects', digest[:2], f'{digest}.html.gz')
+
+
+def read_blob(root, digest):
+    """캐시 디렉터리에서 내용 해시로 HTML 읽기"""
+    with gzip.open(_blob_path(root, digest), 'rt', encoding='utf-8') as f:
+        return f.read()
+
+
+class HtmlCache:
+    """가져온 HTML을 보관하는 디스크 캐시
+
+    본문은 내용 해시로 이름 붙인 gzip 파일로 한 번만 저장하고(같은 내용은 공유),
+    URL -> 해시 색인은 SQLite에 둔다. 오래됐거나 용량을 넘은 항목은 evict()로 정리한다.
+    """
+
+    def __init__(self, root, max_bytes=500 * 1024 * 1024, max_age_days=30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 24 * 3600
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(root, 'index.db'), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+        # 정리(evict)용 색인: 오래된 순서, 본문을 아직 참조하는 항목
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_fetched_at ON entries (fetched_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)")
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+    def put(self, url, html):
+        """URL의 HTML 저장"""
+        digest = content_hash(html)
+        path = _blob_path(self.root, digest)
+
+        with self.lock:
+            known = self.conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if not known:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f'{path}.{threading.get_ident()}.tmp'
+                with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                    f.write(html)
+                os.replace(tmp_path, path)
+                self.conn.execute("INSERT INTO blobs VALUES (?, ?)", (digest, os.path.getsize(path)))
+            self.conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (url, digest, time.time()))
+            self.conn.commit()
+        return digest
+
+    def touch(self, url):
+        """변경 없음(304) 응답을 받은 URL의 시각 갱신 (나이 기준 정리에서 제외되도록)"""
+        with self.lock:
+            self.conn.execute("UPDATE entries SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+    def digest(self, url):
+        """URL에 대응하는 내용 해시 (없으면 None)"""
+        with self.lock:
+            row = self.conn.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def urls(self):
+        """캐시에 있는 URL 목록"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT url FROM entries ORDER BY url")]
+
+    def get(self, url):
+        """URL의 HTML (없으면 None)"""
+        digest = self.digest(url)
+        if digest is None:
+            return None
+        try:
+            return read_blob(self.root, digest)
+        except FileNotFoundError:
+            return None
+
+    def evict(self):
+        """max_age보다 오래된 항목을 지우고, 전체 크기가 max_bytes를 넘으면 오래된 순으로 삭제"""
+        with self.lock:
+            self.conn.execute("DELETE FROM entries WHERE fetched_at < ?", (time.time() - self.max_age,))
+
+            total = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM blobs WHERE digest IN (SELECT digest FROM entries)"
+            ).fetchone()[0]
+            # 오래된 항목부터 EVICT_BATCH개씩 지우고, 본문을 참조하는 항목이 더 없으면 그 크기만큼 줄임
+            while total > self.max_bytes:
+                rows = self.conn.execute("""
+                    SELECT e.url, e.digest, b.size FROM entries e JOIN blobs b ON b.digest = e.digest
+                    ORDER BY e.fetched_at LIMIT ?
+                """, (EVICT_BATCH,)).fetchall()
+                if not rows:
+                    break
+                for url, digest, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                    if self.conn.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+                        total -= size
+
+            # 더 이상 참조되지 않는 본문 파일 삭제
+            removed = 0
+            while True:
+                orphans = self.conn.execute(
+                    "SELECT digest FROM blobs WHERE digest NOT IN (SELECT digest FROM entries) LIMIT ?",
+                    (EVICT_BATCH,),
+                ).fetchall()
+                for (digest,) in orphans:
+                    try:
+                        os.remove(_blob_path(self.root, digest))
+                    except FileNotFoundError:
+                        pass
+                self.conn.executemany("DELETE FROM blobs WHERE digest = ?", orphans)
+                removed += len(orphans)
+                if len(orphans) < EVICT_BATCH:
+                    break
+            self.conn.commit()
+
+        if removed:
+            print(f"[캐시] {removed}개 파일 정리")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CachingFetcher(Fetcher):
+    """가져온 HTML을 HtmlCache에 저장하는 페처 래퍼"""
+
+    def __init__(self, fetcher, cache):
+        self.fetcher = fetcher
+        self.cache = cache
+
+    def fetch_page(self, url, ready=None, validators=None):
+        page = self.fetcher.fetch_page(url, ready, validators)
+        if page.html is not None:
+            self.cache.put(url, page.html)
+        elif page.status == 304:
+            self.cache.touch(url)
+        return page
+
+    def close(self):
+        self.fetcher.close()
+
+
+class OfflineFetcher(Fetcher):
+    """캐시에서만 읽는 페처 (--reparse 모드, 네트워크 사용 안 함)"""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def fetch_page(self, url, ready=None, validators=None):
+        html = self.cache.get(url)
+        if html is None:
+            raise CacheMiss(f"캐시에 없음: {url}")
+        return Page(html, 200, None, None)
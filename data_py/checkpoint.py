@@ -0,0 +1,167 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from records import LIST_FIELDS, DiseaseRecord
+
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Checkpoint:
+    """중단된 크롤링을 이어서 하기 위한 작업 기록 (SQLite)
+
+    발견한 질병 목록(발견 순서)과 URL별 처리 상태(pending/done/failed), 끝난 URL의
+    결과를 보관한다. 목록을 끝까지 수집했으면 그 사실도 기록해 두어, --resume 때는
+    목록 수집을 건너뛰고 끝나지 않은 URL만 다시 처리한다.
+    여러 스레드에서 함께 사용할 수 있다. joined는 DiseaseRecord.from_dict에 넘기는
+    쉼표로 이어 붙인 목록 필드.
+    """
+
+    def __init__(self, path, commit_every=20, joined=LIST_FIELDS):
+        self.joined = joined
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                disease TEXT NOT NULL,
+                status TEXT NOT NULL,
+                record TEXT,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        # 발견 순서로 나눠 읽기 위한 색인
+        self.conn.execute("CREATE INDEX IF NOT EXISTS urls_position ON urls (position)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.commit_every = commit_every
+        self.pending = 0
+        self.position = self.conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM urls").fetchone()[0]
+
+    def _maybe_commit(self):
+        # 호출하는 쪽에서 lock을 잡고 있어야 함
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.conn.commit()
+            self.pending = 0
+
+    def reset(self):
+        """새 실행 시작: 지난 기록을 모두 지움"""
+        with self.lock:
+            self.conn.execute("DELETE FROM urls")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.commit()
+            self.position = 0
+
+    def list_complete(self):
+        """지난 실행에서 질병 목록을 끝까지 수집했는지 여부"""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'list_complete'").fetchone()
+        return row is not None
+
+    def track(self, diseases):
+        """발견한 질병을 기록하면서 흘려보냄
+
+        이미 끝난(done) URL은 건너뛰고, 목록을 끝까지 돌면 목록 수집 완료로 표시한다.
+        diseases.complete가 False면(가져오지 못한 목록 페이지가 있음) 완료로 표시하지 않아
+        --resume 때 목록을 다시 탐색한다.
+        """
+        for disease in diseases:
+            if self._add(disease) != DONE:
+                yield disease
+
+        if not getattr(diseases, 'complete', True):
+            self.commit()
+            return
+
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('list_complete', ?)",
+                              (datetime.now().isoformat(),))
+            self.conn.commit()
+
+    def _add(self, disease):
+        with self.lock:
+            row = self.conn.execute("SELECT status FROM urls WHERE url = ?", (disease['url'],)).fetchone()
+            if row is not None:
+                return row[0]
+            self.conn.execute(
+                "INSERT INTO urls VALUES (?, ?, ?, ?, NULL, ?)",
+                (disease['url'], self.position, json.dumps(disease, ensure_ascii=False),
+                 PENDING, datetime.now().isoformat()),
+            )
+            self.position += 1
+            self._maybe_commit()
+        return PENDING
+
+    def _set(self, urls, status, records=None):
+        now = datetime.now().isoformat()
+        records = records or [None] * len(urls)
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE urls SET status = ?, record = ?, updated_at = ? WHERE url = ?",
+                [(status, None if record is None else json.dumps(dict(record), ensure_ascii=False), now, url)
+                 for url, record in zip(urls, records)],
+            )
+            self._maybe_commit()
+
+    def done(self, url, record=None):
+        """URL 처리 완료 (record를 주면 --resume 때 다시 내보낼 수 있도록 보관)"""
+        self._set([url], DONE, [record])
+
+    def done_many(self, urls):
+        self._set(urls, DONE)
+
+    def failed(self, urls):
+        """처리에 실패한 URL (--resume 때 다시 시도)"""
+        self._set(urls, FAILED)
+
+    def _scan(self, column, where, args, batch=500):
+        # 발견 순서대로 batch개씩 읽어 흘려보냄 (목록 전체를 메모리에 올리지 않음).
+        # 읽는 도중 상태가 바뀌어도 되도록 커서를 열어 두지 않고 position으로 이어서 읽는다
+        position = -1
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT position, {column} FROM urls WHERE position > ? AND {where} "
+                    f"ORDER BY position LIMIT ?", (position, *args, batch)
+                ).fetchall()
+            for position, value in rows:
+                yield json.loads(value)
+            if len(rows) < batch:
+                return
+
+    def remaining(self):
+        """끝나지 않은(pending/failed) 질병 (발견 순서로 흘려보냄)"""
+        return self._scan('disease', 'status != ?', (DONE,))
+
+    def failures(self):
+        """실패한 질병 (발견 순서로 흘려보냄, 같은 실행 안에서 다시 시도할 때)"""
+        return self._scan('disease', 'status = ?', (FAILED,))
+
+    def records(self):
+        """끝난 URL의 보관된 결과 (발견 순서로 흘려보냄)"""
+        rows = self._scan('record', 'status = ? AND record IS NOT NULL', (DONE,))
+        return (DiseaseRecord.from_dict(data, self.joined) for data in rows)
+
+    def counts(self):
+        """상태별 URL 수"""
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall()
+        counts = dict.fromkeys((PENDING, DONE, FAILED), 0)
+        counts.update(rows)
+        return counts
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+            self.pending = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,864 @@
+import argparse
+import importlib
+import json
+import os
+import socket
+import threading
+import time
+
+from cache import CachingFetcher, HtmlCache, OfflineFetcher
+from checkpoint import Checkpoint
+from discovery import BloomUrlSet, DiscoveryError, DiskUrlSet, ListDiscovery, read_last_page
+from extract import parse_html
+from fetcher import create_fetcher
+from history import REPARSE, RecordHistory
+from metrics import METRICS
+from pipeline import detail_pipeline, parse_pool
+from profiles import Profile, ProfileError, load_profile, parse_override
+from records import LIST_FIELDS, flatten
+from sinks import LockedSink, RecordStats, create_sink
+from state import CrawlState
+
+
+# 사이트 이름 -> 어댑터 클래스 ('모듈.클래스', 실행할 사이트만 import)
+SITES = {
+    'amc': 'asan.AmcSite',
+    'snuh': 'uni.SnuhSite',
+}
+
+# 페처 설정: 'http' | 'selenium' | 'auto' (HTTP 우선, 필요한 페이지만 Selenium)
+FETCH_BACKEND = 'auto'
+
+# 미러: 원래 호스트 대신 요청을 보낼 주소 ({'www.amc.seoul.kr': 'http://127.0.0.1:8765'}, 비어 있으면 원래 사이트)
+MIRRORS = {}
+
+# 브라우저 풀 크기: Selenium이 필요할 때 동시에 띄울 수 있는 headless Chrome 수
+BROWSERS = 2
+
+# 파싱 설정: 모든 사이트가 함께 쓰는 파싱 프로세스 수(None이면 CPU 코어 수), 사이트별 파싱 대기열 크기
+PARSE_WORKERS = None
+PARSE_QUEUE = 32
+
+# 증분 크롤링: 지난 실행의 ETag/Last-Modified와 내용 해시를 저장해 두고 바뀐 페이지만 다시 처리
+INCREMENTAL = True
+
+# HTML 캐시: 가져온 페이지를 압축 보관해 두고 --reparse로 네트워크 없이 다시 파싱
+CACHE_MAX_MB = 500
+CACHE_MAX_AGE_DAYS = 30
+
+# 재시도: 페이지 요청의 일시 오류(429·5xx, 연결 오류) 재시도 횟수, 429·5xx와 응답 지연에 맞춘
+# 호스트별 속도 자동 조절, 목록을 다 돈 뒤 실패한 상세 페이지를 다시 시도할 횟수
+RETRIES = 4
+ADAPTIVE_RATE = True
+FAILED_RETRY_ROUNDS = 1
+
+# 목록 페이지를 가져오지 못했을 때 다시 시도할 횟수와 간격(초)
+LIST_RETRIES = 2
+LIST_RETRY_DELAY = 5.0
+
+# 출력과 체크포인트를 디스크에 반영하는 간격 (결과 수)
+FLUSH_EVERY = 20
+
+# 변경 피드·버전 기록: 크롤링마다 추가·수정·삭제된 레코드만 {사이트}_history.db에 덧붙임
+# (python history.py changes / as-of로 변경분이나 특정 크롤링 시점의 목록을 꺼냄)
+HISTORY = True
+
+# 목록 중복 제거에 쓰는 본 URL 집합: 'memory'(set) | 'disk'(SQLite 임시 파일, 메모리 일정) |
+# 'bloom'(확률적, SEEN_CAPACITY개에서 처음 보는 URL을 SEEN_ERROR_RATE 확률로 건너뜀)
+SEEN_URLS = 'memory'
+SEEN_CAPACITY = 2_000_000
+SEEN_ERROR_RATE = 1e-6
+
+# 측정값: Prometheus 텍스트 형식으로 내보낼 포트(None이면 끔), 진행 로그를 JSON 한 줄씩 출력할지
+METRICS_PORT = None
+LOG_JSON = False
+
+# 분산 크롤링(--queue): 워커가 한 번에 임대하는 URL 수, 대기열이 비었을 때 다시 확인하는 간격(초),
+# 함께 도는 워커 노드 수 (호스트별 요청 속도를 노드 수로 나눠 합계가 사이트 제한을 넘지 않게)
+CLAIM_BATCH = 20
+QUEUE_POLL_SECONDS = 2.0
+WORKER_NODES = 1
+
+
+class Site:
+    """병원 사이트 어댑터
+
+    목록 탐색, 상세 페이지 요청·파싱, 증분 상태, 캐시, 체크포인트, 출력은 엔진이 맡고
+    어댑터는 사이트마다 다른 부분(URL, 준비 조건, 목록·상세 파싱, 출력)만 정한다.
+    새 병원은 이 클래스를 상속한 어댑터 하나를 만들고 SITES에 등록하면 된다.
+    """
+
+    name = None  # 짧은 이름 (파일 이름 접두어, 로그 표시)
+    title = None  # 화면에 표시할 이름
+    host = None  # 요청 속도 제한 단위
+    list_ready = None  # 목록 페이지 준비 조건 (Ready)
+    detail_ready = None  # 상세 페이지 준비 조건 (Ready)
+    max_pages = 200
+    workers = 4  # 목록·상세 페이지 동시 요청 수
+    rate_limit = 2.0  # 호스트의 초당 최대 요청 수
+
+    # True면 매 실행 전체 결과를 출력(바뀌지 않은 페이지는 지난번 결과로),
+    # False면 바뀐 결과만 출력 (DB처럼 이미 저장된 것은 다시 쓰지 않는 경우)
+    snapshot = True
+
+    # 예전 문자열 형식(지난 상태 등)에서 ', '로 이어 붙인 목록 필드. 여기 없는 목록 필드의
+    # 문자열은 항목 하나로 읽음
+    joined_fields = LIST_FIELDS
+
+    stat_fields = ()  # 요약 통계에 표시할 (필드, 라벨)
+    sample_fields = ('disease_name_kr', 'symptoms', 'department')
+
+    def __init__(self):
+        self.prefix = ''  # 여러 사이트를 함께 돌릴 때 로그 앞에 붙는 [이름]
+        self.state_file = f'{self.name}_state.db'
+        self.checkpoint_file = f'{self.name}_checkpoint.db'
+        self.history_file = f'{self.name}_history.db'
+        self.cache_dir = f'cache/{self.name}'
+
+    def log(self, message, **fields):
+        """진행 로그 출력. LOG_JSON이면 {'ts', 'site', 'msg', ...fields} JSON 한 줄로"""
+        body = message.lstrip('\n')
+        if LOG_JSON:
+            if body.strip('=-'):
+                record = {'ts': round(time.time(), 3), 'site': self.name, 'msg': body, **fields}
+                print(json.dumps(record, ensure_ascii=False))
+            return
+        print('\n' * (len(message) - len(body)) + self.prefix + body)
+
+    def list_url(self, page_index):
+        """목록 페이지 URL"""
+        raise NotImplementedError
+
+    def parse_list(self, root):
+        """목록 페이지(lxml 루트)에서 [{'disease_name', 'url'}, ...] 추출"""
+        raise NotImplementedError
+
+    # 상세 페이지 파서: parse_detail(html, url, disease_name) -> dict
+    # 파싱 프로세스로 넘어가므로 모듈 최상위 함수를 staticmethod로 지정한다
+    parse_detail = None
+
+    def open_output(self, on_saved):
+        """결과 출력(RecordSink) 열기. 열 수 없으면 None
+
+        저장이 비동기로 끝나는 출력(confirms_writes)은 배치마다 on_saved(rows, failed)를
+        불러 저장 결과를 알려야 한다.
+        """
+        raise NotImplementedError
+
+    def output_summary(self, sink):
+        """실행이 끝난 뒤 출력할 저장 결과 줄 목록"""
+        return []
+
+
+def load_site(name):
+    """등록된 이름으로 사이트 어댑터 생성"""
+    if name not in SITES:
+        raise ValueError(f"알 수 없는 사이트: {name} (가능: {', '.join(SITES)})")
+    module_name, class_name = SITES[name].rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def get_disease_list_from_page(site, fetcher, page_index):
+    """특정 목록 페이지에서 (질병 목록, 페이저에 표시된 마지막 페이지 번호) 추출
+
+    페이지를 가져오지 못하면 빈 페이지와 구분할 수 있도록 (None, None)을 반환한다.
+    """
+    try:
+        site.log(f"[페이지 {page_index}] 로딩 중...")
+        html = fetcher.fetch(site.list_url(page_index), site.list_ready)
+
+        root = parse_html(html)
+        last_page = read_last_page(root)
+        disease_data = site.parse_list(root)
+
+        if not disease_data:
+            site.log(f"[페이지 {page_index}] 질병 목록을 찾을 수 없습니다.")
+            return [], last_page
+
+        for disease in disease_data:
+            disease['page'] = page_index
+        site.log(f"[페이지 {page_index}] {len(disease_data)}개 질병 발견")
+        return disease_data, last_page
+
+    except Exception as e:
+        site.log(f"[페이지 {page_index}] 오류: {e}")
+        METRICS.error('list', e, site=site.name)
+        return None, None
+
+
+def seen_url_set():
+    """SEEN_URLS 설정에 맞는 본 URL 집합을 만드는 함수"""
+    if SEEN_URLS == 'disk':
+        return DiskUrlSet
+    if SEEN_URLS == 'bloom':
+        return lambda: BloomUrlSet(SEEN_CAPACITY, SEEN_ERROR_RATE)
+    return set
+
+
+def get_all_disease_list(site, fetcher, retries=None):
+    """모든 페이지의 질병 목록 탐색기 생성
+
+    마지막 페이지를 먼저 찾고, 나머지 목록 페이지는 병렬로 가져오면서
+    중복 제거된 질병을 순서대로 흘려보낸다 (상세 크롤링과 동시에 진행).
+    retries는 목록 페이지 재시도 횟수 (None이면 LIST_RETRIES, 캐시에서 읽을 때는 0).
+    """
+    return ListDiscovery(
+        lambda page_index: get_disease_list_from_page(site, fetcher, page_index),
+        max_pages=site.max_pages,
+        workers=site.workers,
+        retries=LIST_RETRIES if retries is None else retries,
+        retry_delay=LIST_RETRY_DELAY,
+        seen=seen_url_set(),
+    )
+
+
+def print_changes(site, history, counts):
+    """이번 크롤링의 변경 수 출력"""
+    site.log(f"\n[변경] 크롤링 {history.crawl}: 추가 {counts['insert']}개, 수정 {counts['update']}개, "
+             f"삭제 {counts['delete']}개 ({site.history_file})")
+
+
+def print_stats(site, stats):
+    """필드별 요약 통계와 샘플 출력"""
+    site.log(f"\n[통계] 총 {stats.count}개")
+    for field, label in site.stat_fields:
+        site.log(f"- {label}: {stats.filled[field]}개")
+
+    if stats.samples:
+        site.log(f"\n[데이터 샘플]")
+        for record in stats.samples:
+            row = flatten(record)
+            site.log("  " + " | ".join(str(row.get(field) or '')[:30] for field in site.sample_fields))
+
+
+def crawl_site(site, base_fetcher, executor, resume=False, shared=None):
+    """사이트 하나 크롤링 (목록 수집 → 상세 페이지 → 출력)"""
+    site.log("=" * 60)
+    site.log(f"{site.title} 크롤링")
+    site.log("=" * 60)
+
+    state = CrawlState(site.state_file, joined=site.joined_fields) if INCREMENTAL else None
+    checkpoint = Checkpoint(site.checkpoint_file, joined=site.joined_fields)
+    history = RecordHistory(site.history_file) if HISTORY else None
+
+    def saved(rows, failed):
+        # 비동기 출력(DB)의 배치 저장 결과: 저장된 것만 완료로, 실패한 것은 다음 실행에 다시
+        failed_urls = {data['url'] for data in failed}
+        if len(rows) > len(failed):
+            site.log(f" → 저장: {len(rows) - len(failed)}개")
+        METRICS.inc('rows_total', len(rows) - len(failed), site=site.name)
+        done = [data['url'] for data in rows if data['url'] not in failed_urls]
+        if state is not None:
+            # 저장이 확인된 것만 상태에 기록 (stage해 둔 것), 실패한 것은 지워 다음 실행에 다시
+            state.confirm(done)
+            if failed_urls:
+                state.forget(list(failed_urls))
+        checkpoint.done_many(done)
+        if failed_urls:
+            checkpoint.failed(list(failed_urls))
+
+    sink = site.open_output(saved)
+    if sink is None:
+        site.log(f"출력을 열 수 없어 {site.title} 크롤링을 건너뜁니다.")
+        checkpoint.close()
+        if state is not None:
+            state.close()
+        if history is not None:
+            history.close()
+        return
+    deferred = getattr(sink, 'confirms_writes', False)
+    if hasattr(sink, 'queue'):
+        METRICS.set('db_queue_depth', sink.queue.qsize, site=site.name)
+
+    cache = HtmlCache(site.cache_dir, max_bytes=CACHE_MAX_MB * 1024 * 1024, max_age_days=CACHE_MAX_AGE_DAYS)
+    fetcher = CachingFetcher(base_fetcher, cache)
+    stats = RecordStats(field for field, _ in site.stat_fields)
+
+    def handle(idx, total, disease, detail, changed, last_round=True):
+        # 상세 페이지 결과 하나를 출력·체크포인트에 반영 → 'ok' | 'unchanged' | 'failed'
+        if detail is None:
+            result, mark = 'failed', "✗" if last_round else "✗ (나중에 다시 시도)"
+            checkpoint.failed([disease['url']])
+
+        elif not changed and not site.snapshot:
+            # 바뀌지 않은 페이지는 다시 쓰지 않음
+            result, mark = 'unchanged', "= (변경 없음)"
+            checkpoint.done(disease['url'])
+
+        else:
+            # 바뀌지 않은 페이지도 스냅샷 출력에는 지난번 결과로 포함
+            with METRICS.timer('write_seconds', site=site.name):
+                sink.write(detail)
+                if shared is not None:
+                    shared.write({'site': site.name, **detail})
+            stats.add(detail)
+            result, mark = ('ok', "✓") if changed else ('unchanged', "✓ (변경 없음)")
+            if not deferred:
+                METRICS.inc('rows_total', site=site.name)
+                checkpoint.done(disease['url'], detail if site.snapshot else None)
+
+        if history is not None:
+            # 가져오지 못한 페이지도 본 것으로 기록 (삭제로 판단되지 않게)
+            history.observe(disease['url'], detail)
+        if result != 'failed' or last_round:
+            METRICS.inc('pages_total', site=site.name, result=result)
+        site.log(f"[{idx}/{total}] {disease['disease_name'][:40]}... {mark}",
+                 event='page', index=idx, total=total, url=disease['url'], result=result)
+        return result
+
+    try:
+        if history is not None:
+            history.begin(resume=resume)
+
+        if resume and checkpoint.list_complete():
+            # Step 1: 지난 실행에서 끝까지 수집한 목록 중 끝나지 않은 것만
+            disease_list = checkpoint.remaining()
+            counts = checkpoint.counts()
+            total = counts['pending'] + counts['failed']
+            site.log(f"\n[Step 1] 체크포인트에서 이어서 실행: 남은 질병 {total}개")
+        else:
+            if not resume:
+                checkpoint.reset()
+
+            # Step 1: 질병 목록 수집
+            site.log("\n[Step 1] 질병 목록 수집 중...")
+            discovery = get_all_disease_list(site, fetcher)
+
+            try:
+                found = discovery.find_last_page()
+            except DiscoveryError as e:
+                site.log(f"\n목록 탐색 실패: {e} (--resume으로 다시 시도)")
+                return
+            if not found:
+                site.log("\n질병 목록을 찾을 수 없습니다.")
+                return
+
+            site.log(f"\n약 {discovery.expected}개 질병 발견 (목록 페이지 {discovery.last_page}개)")
+            site.log("\n[샘플 10개]")
+            for i, d in enumerate(discovery.peek(10), 1):
+                site.log(f"  {i}. {d['disease_name']}")
+
+            # 발견한 URL을 체크포인트에 기록 (--resume이면 이미 끝난 URL은 건너뜀)
+            disease_list = checkpoint.track(discovery)
+            total = discovery.expected
+
+        # Step 2: 상세 정보 크롤링 (남은 목록 페이지는 함께 수집)
+        site.log(f"\n[Step 2] 상세 정보 크롤링 시작...")
+        site.log(f"약 {total}개 질병 크롤링 예정")
+        site.log("-" * 60)
+
+        # 이어서 실행하면 지난번에 끝낸 결과부터 기록
+        if resume and site.snapshot:
+            for record in checkpoint.records():
+                sink.write(record)
+                stats.add(record)
+            if stats.count:
+                site.log(f"  [지난 실행 결과: {stats.count}개]")
+
+        success_count = 0
+        unchanged_count = 0
+        fail_count = 0
+
+        # 워커 스레드가 가져오고 파싱 프로세스가 처리하며, 결과는 목록 순서대로 받는다.
+        # 재시도까지 실패한 페이지는 체크포인트에 실패로 남고, 목록을 다 돈 뒤 체크포인트에서
+        # 다시 읽어 FAILED_RETRY_ROUNDS번 더 시도한다 (실패 목록을 메모리에 모아 두지 않음)
+        for attempt in range(FAILED_RETRY_ROUNDS + 1):
+            if attempt:
+                if not fail_count:
+                    break
+                disease_list, total, fail_count = checkpoint.failures(), fail_count, 0
+                site.log(f"\n[재시도 {attempt}] 실패한 {total}개 다시 시도")
+            last_round = attempt == FAILED_RETRY_ROUNDS
+
+            results = detail_pipeline(
+                disease_list, fetcher, site.parse_detail, site.detail_ready, state,
+                fetch_workers=site.workers, max_pending=PARSE_QUEUE, executor=executor, label=site.name,
+                confirm_writes=deferred,
+            )
+            for idx, (disease, detail, changed) in enumerate(results, 1):
+                result = handle(idx, total, disease, detail, changed, last_round)
+                if result == 'failed':
+                    fail_count += 1
+                elif result == 'ok':
+                    success_count += 1
+                elif result == 'unchanged':
+                    unchanged_count += 1
+
+                # 주기적으로 디스크에 반영
+                if idx % FLUSH_EVERY == 0 and not deferred:
+                    sink.flush()
+                    checkpoint.commit()
+                    site.log(f"  [저장: {stats.count}개]")
+
+        sink.close()  # 비동기 출력은 남은 저장이 끝날 때까지 대기
+        # 목록을 빠짐없이 가져왔을 때만 이번에 못 본 URL을 삭제로 기록
+        changes = history.finish(complete=checkpoint.list_complete()) if history is not None else None
+
+
+        # Step 3: 결과 출력
+        counts = checkpoint.counts()
+        site.log("\n" + "=" * 60)
+        site.log(f"[Step 3] {site.title} 크롤링 완료")
+        site.log("=" * 60)
+        site.log(f"\n✅ 총 수집: {sum(counts.values())}개 (중복 제거 후)")
+        site.log(f"✅ 성공: {success_count}개")
+        if state is not None:
+            site.log(f"= 변경 없음(재파싱 생략): {unchanged_count}개")
+        site.log(f"✗ 실패: {fail_count}개" + (" (--resume으로 다시 시도)" if counts['failed'] else ""))
+        print_stats(site, stats)
+        if changes is not None:
+            print_changes(site, history, changes)
+        for line in site.output_summary(sink):
+            site.log(line)
+
+    except Exception as e:
+        site.log(f"\n오류: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        sink.close()
+        checkpoint.close()
+        if state is not None:
+            state.close()
+        if history is not None:
+            history.close()
+        cache.evict()
+        cache.close()
+
+
+def reparse_site(site, executor, shared=None):
+    """캐시된 HTML만으로 사이트 결과 다시 생성 (네트워크 사용 안 함)"""
+    site.log("=" * 60)
+    site.log(f"{site.title} 재파싱 (캐시)")
+    site.log("=" * 60)
+
+    state = CrawlState(site.state_file, joined=site.joined_fields) if INCREMENTAL else None
+
+    def saved(rows, failed):
+        if len(rows) > len(failed):
+            site.log(f" → 저장: {len(rows) - len(failed)}개")
+        if failed and state is not None:
+            state.forget([data['url'] for data in failed])
+
+    sink = site.open_output(saved)
+    if sink is None:
+        site.log(f"출력을 열 수 없어 {site.title} 재파싱을 건너뜁니다.")
+        if state is not None:
+            state.close()
+        return
+
+    cache = HtmlCache(site.cache_dir)
+    stats = RecordStats(field for field, _ in site.stat_fields)
+    history = RecordHistory(site.history_file) if HISTORY else None
+
+    try:
+        # 목록도 캐시에서 읽으면서 바로 흘려보냄 (목록 전체를 메모리에 모으지 않음).
+        # 캐시에 없는 페이지는 다시 읽어도 없으므로 재시도하지 않음
+        discovery = get_all_disease_list(site, OfflineFetcher(cache), retries=0)
+        try:
+            found = discovery.find_last_page()
+        except DiscoveryError as e:
+            site.log(f"\n캐시에 질병 목록이 없습니다: {e} (먼저 크롤링하세요)")
+            return
+        if not found:
+            site.log("\n캐시에 질병 목록이 없습니다.")
+            return
+
+        # 파서가 바뀌어 달라진 결과도 변경으로 기록 (캐시에 없는 URL이 있을 수 있어 삭제는 판단 안 함)
+        if history is not None:
+            history.begin(kind=REPARSE)
+
+        results = detail_pipeline(
+            discovery, OfflineFetcher(cache), site.parse_detail, site.detail_ready,
+            fetch_workers=site.workers, max_pending=PARSE_QUEUE, executor=executor, label=site.name,
+        )
+        for disease, detail, _ in results:
+            if not detail:
+                continue
+            sink.write(detail)
+            stats.add(detail)
+            if shared is not None:
+                shared.write({'site': site.name, **detail})
+            # 다음 증분 실행이 예전 결과를 재사용하지 않도록 갱신
+            if state is not None:
+                state.replace_record(detail['url'], detail)
+            if history is not None:
+                history.observe(detail['url'], detail)
+        sink.close()
+        changes = history.finish() if history is not None else None
+
+        site.log(f"\n재파싱: {discovery.count}개 중 {stats.count}개 (나머지는 캐시에 없음)")
+        print_stats(site, stats)
+        if changes is not None:
+            print_changes(site, history, changes)
+        for line in site.output_summary(sink):
+            site.log(line)
+
+    finally:
+        sink.close()
+        if state is not None:
+            state.close()
+        if history is not None:
+            history.close()
+        cache.close()
+
+
+def open_work_queue(target):
+    """분산 크롤링 대기열: 'postgres'면 SNUH와 같은 DB(uni.DB_CONFIG), 아니면 그 경로의 SQLite 파일"""
+    from workqueue import open_queue
+
+    db_config = importlib.import_module('uni').DB_CONFIG if target == 'postgres' else None
+    return open_queue(target, db_config)
+
+
+def coordinate_site(site, base_fetcher, queue, resume=False):
+    """코디네이터: 목록을 탐색해 찾은 질병을 작업 대기열에 넣음 (상세 페이지는 워커가 처리)"""
+    site.log("=" * 60)
+    site.log(f"{site.title} 목록 탐색 (코디네이터)")
+    site.log("=" * 60)
+
+    if not resume:
+        queue.reset(site.name)
+    cache = HtmlCache(site.cache_dir, max_bytes=CACHE_MAX_MB * 1024 * 1024, max_age_days=CACHE_MAX_AGE_DAYS)
+    discovery = get_all_disease_list(site, CachingFetcher(base_fetcher, cache))
+
+    try:
+        try:
+            found = discovery.find_last_page()
+        except DiscoveryError as e:
+            site.log(f"\n목록 탐색 실패: {e} (--resume으로 다시 시도)")
+            return
+        if not found:
+            site.log("\n질병 목록을 찾을 수 없습니다.")
+            return
+        site.log(f"\n약 {discovery.expected}개 질병 발견 (목록 페이지 {discovery.last_page}개)")
+
+        # 워커가 목록 탐색을 기다리지 않도록 CLAIM_BATCH개씩 바로 넣음
+        added = 0
+        batch = []
+        for disease in discovery:
+            batch.append(disease)
+            if len(batch) >= CLAIM_BATCH:
+                added += queue.add(site.name, batch)
+                batch = []
+        added += queue.add(site.name, batch)
+
+        if discovery.complete:
+            queue.finish_list(site.name)
+            site.log(f"\n✅ 대기열에 {added}개 추가, 목록 탐색 완료")
+        else:
+            # 목록이 끝나지 않았다고 표시해 두면 워커는 끝내지 않고 기다린다
+            site.log(f"\n대기열에 {added}개 추가, 가져오지 못한 목록 페이지가 있음 (--resume으로 다시 시도)")
+        counts = queue.counts(site.name)
+        site.log("대기열: " + ", ".join(f"{status} {count}" for status, count in counts.items()))
+
+    finally:
+        cache.evict()
+        cache.close()
+
+
+def work_site(site, base_fetcher, executor, queue, worker, shared=None):
+    """워커: 대기열에서 URL을 임대해 상세 페이지를 처리하고 결과를 알림 (목록이 끝나고 대기열이 비면 종료)
+
+    실패한 URL은 대기열로 돌아가 다른 워커(또는 자신)가 다시 시도한다. 저장이 비동기로
+    끝나는 출력(DB)은 저장이 확인된 뒤에 완료로 알린다. 버전 기록은 워커마다 따로 크롤링
+    번호를 받고, 워커는 목록의 일부만 보므로 삭제는 판단하지 않는다.
+    """
+    site.log("=" * 60)
+    site.log(f"{site.title} 상세 정보 크롤링 (워커 {worker})")
+    site.log("=" * 60)
+
+    state = CrawlState(site.state_file, joined=site.joined_fields) if INCREMENTAL else None
+    history = RecordHistory(site.history_file) if HISTORY else None
+
+    def report(done, failed):
+        # 대기열에 결과 알림. 임대가 끝나 다른 워커에게 넘어간 URL은 반영되지 않고 그 워커가 처리
+        lost = queue.complete(site.name, worker, done) + queue.fail(site.name, worker, failed)
+        if lost:
+            METRICS.inc('lease_lost_total', len(lost), site=site.name)
+            site.log(f"  [대기열] 임대를 잃어 반영하지 못함: {len(lost)}개 (다른 워커가 다시 처리)",
+                     event='lease_lost', urls=lost)
+
+    def saved(rows, failed):
+        failed_urls = {data['url'] for data in failed}
+        if len(rows) > len(failed):
+            site.log(f" → 저장: {len(rows) - len(failed)}개")
+        METRICS.inc('rows_total', len(rows) - len(failed), site=site.name)
+        done = [data['url'] for data in rows if data['url'] not in failed_urls]
+        if state is not None:
+            state.confirm(done)
+            if failed_urls:
+                state.forget(list(failed_urls))
+        report(done, list(failed_urls))
+
+    sink = site.open_output(saved)
+    if sink is None:
+        site.log(f"출력을 열 수 없어 {site.title} 크롤링을 건너뜁니다.")
+        if state is not None:
+            state.close()
+        if history is not None:
+            history.close()
+        return
+    deferred = getattr(sink, 'confirms_writes', False)
+    if hasattr(sink, 'queue'):
+        METRICS.set('db_queue_depth', sink.queue.qsize, site=site.name)
+
+    cache = HtmlCache(site.cache_dir, max_bytes=CACHE_MAX_MB * 1024 * 1024, max_age_days=CACHE_MAX_AGE_DAYS)
+    fetcher = CachingFetcher(base_fetcher, cache)
+    stats = RecordStats(field for field, _ in site.stat_fields)
+    counts = dict.fromkeys(('ok', 'unchanged', 'failed'), 0)
+
+    try:
+        if history is not None:
+            # 같은 기록 파일을 쓰는 다른 워커와 크롤링 번호를 나누지 않음 (끝내는 시점이 서로 다름)
+            history.begin(worker=worker)
+
+        while True:
+            batch = queue.claim(site.name, worker, CLAIM_BATCH)
+            if not batch:
+                if queue.drained(site.name):
+                    break
+                time.sleep(QUEUE_POLL_SECONDS)
+                continue
+
+            done, failed = [], []
+            results = detail_pipeline(
+                batch, fetcher, site.parse_detail, site.detail_ready, state,
+                fetch_workers=site.workers, max_pending=PARSE_QUEUE, executor=executor, label=site.name,
+                confirm_writes=deferred,
+            )
+            for disease, detail, changed in results:
+                if detail is None:
+                    result, mark = 'failed', "✗ (대기열로)"
+                    failed.append(disease['url'])
+                elif not changed and not site.snapshot:
+                    result, mark = 'unchanged', "= (변경 없음)"
+                    done.append(disease['url'])
+                else:
+                    with METRICS.timer('write_seconds', site=site.name):
+                        sink.write(detail)
+                        if shared is not None:
+                            shared.write({'site': site.name, **detail})
+                    stats.add(detail)
+                    result, mark = ('ok', "✓") if changed else ('unchanged', "✓ (변경 없음)")
+                    if not deferred:
+                        METRICS.inc('rows_total', site=site.name)
+                        done.append(disease['url'])
+                if history is not None:
+                    # 가져오지 못한 페이지도 본 것으로 기록 (다른 워커가 다시 처리)
+                    history.observe(disease['url'], detail)
+                counts[result] += 1
+                METRICS.inc('pages_total', site=site.name, result=result)
+                site.log(f"[{sum(counts.values())}] {disease['disease_name'][:40]}... {mark}",
+                         event='page', url=disease['url'], result=result, worker=worker)
+
+            # 출력에 반영한 뒤에 완료로 알림 (워커가 죽으면 임대가 끝나 다른 워커가 다시 처리)
+            if not deferred:
+                sink.flush()
+            report(done, failed)
+            if history is not None:
+                history.commit()
+
+        sink.close()
+        # 워커는 목록의 일부만 처리하므로 못 본 URL을 삭제로 기록하지 않음
+        changes = history.finish(complete=False) if history is not None else None
+
+        site.log("\n" + "=" * 60)
+        site.log(f"{site.title} 워커 {worker} 완료")
+        site.log("=" * 60)
+        site.log(f"\n✅ 성공: {counts['ok']}개")
+        if state is not None:
+            site.log(f"= 변경 없음(재파싱 생략): {counts['unchanged']}개")
+        site.log(f"✗ 실패 후 대기열로: {counts['failed']}개")
+        site.log("대기열: " + ", ".join(f"{status} {count}" for status, count in queue.counts(site.name).items()))
+        print_stats(site, stats)
+        if changes is not None:
+            print_changes(site, history, changes)
+        for line in site.output_summary(sink):
+            site.log(line)
+
+    except Exception as e:
+        site.log(f"\n오류: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        sink.close()
+        if state is not None:
+            state.close()
+        if history is not None:
+            history.close()
+        cache.evict()
+        cache.close()
+
+
+def run(sites, resume=False, reparse=False, output=None, queue=None, role=None, worker=None, profile=None):
+    """여러 사이트를 한 프로세스에서 동시에 크롤링
+
+    페처(HTTP 세션, 브라우저)와 파싱 프로세스 풀은 모든 사이트가 함께 쓰고,
+    요청 속도는 호스트별로 제한한다. output을 주면 모든 사이트의 결과를
+    site 필드를 붙여 그 파일에도 기록한다. 끝나면 측정값 요약을 출력한다.
+
+    queue(작업 대기열)를 주면 분산 모드로, role이 'coordinator'면 목록만 탐색해 대기열에
+    넣고, 'worker'면 대기열의 URL을 처리한다 (worker는 워커 이름, 없으면 호스트-PID).
+    워커는 실행 내내 임대를 하트비트로 연장하고, 끝날 때 남은 임대를 돌려놓는다.
+
+    profile(profiles.Profile)을 주면 그 설정을 모듈 상수와 사이트에 먼저 적용한다. 적용된 실제
+    설정 값은 프로필 이름·해시와 함께 측정값에 남는다 (주지 않으면 'default'로 지금 값을 기록).
+    """
+    if role == 'worker' and worker is None:
+        worker = f"{socket.gethostname()}-{os.getpid()}"
+    profile = profile or Profile('default', {})
+    profile.apply(sites)
+    METRICS.reset()
+    METRICS.info.update(sites=','.join(site.name for site in sites),
+                        mode=role or ('reparse' if reparse else 'resume' if resume else 'crawl'),
+                        profile=profile.name, profile_digest=profile.digest(sites))
+    METRICS.settings.update(profile.settings(sites))
+    print(f"[프로필] {profile.name} ({METRICS.info['profile_digest']})"
+          + (f" - {profile.source}" if profile.source else ""))
+    server = METRICS.serve(METRICS_PORT) if METRICS_PORT else None
+    if server is not None:
+        print(f"[측정] http://127.0.0.1:{METRICS_PORT}/metrics")
+
+    if len(sites) > 1:
+        for site in sites:
+            site.prefix = f"[{site.name}] "
+
+    shared = LockedSink(create_sink([output])) if output else None
+    fetcher = None
+    if not reparse:
+        # 여러 노드의 워커가 같은 호스트에 요청하므로 노드 수로 나눈 속도만 씀
+        share = WORKER_NODES if role == 'worker' else 1
+        fetcher = create_fetcher(FETCH_BACKEND, rate=max(site.rate_limit for site in sites) / share,
+                                 host_rates={site.host: site.rate_limit / share for site in sites},
+                                 browsers=BROWSERS, mirrors=MIRRORS,
+                                 retries=RETRIES, adaptive=ADAPTIVE_RATE)
+
+    heartbeat = None
+    if role == 'worker':
+        heartbeat = threading.Event()
+
+        def beat():
+            while not heartbeat.wait(queue.lease_seconds / 3):
+                try:
+                    queue.heartbeat(worker)
+                except Exception as e:
+                    print(f"  [대기열] 하트비트 오류: {e}")
+
+        threading.Thread(target=beat, name='heartbeat', daemon=True).start()
+
+    try:
+        with parse_pool(PARSE_WORKERS) as executor:
+            if reparse:
+                jobs = [(reparse_site, (site, executor, shared)) for site in sites]
+            elif role == 'coordinator':
+                jobs = [(coordinate_site, (site, fetcher, queue, resume)) for site in sites]
+            elif role == 'worker':
+                jobs = [(work_site, (site, fetcher, executor, queue, worker, shared)) for site in sites]
+            else:
+                jobs = [(crawl_site, (site, fetcher, executor, resume, shared)) for site in sites]
+
+            if len(jobs) == 1:
+                func, args = jobs[0]
+                func(*args)
+            else:
+                threads = [threading.Thread(target=func, args=args, name=args[0].name) for func, args in jobs]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+    finally:
+        if heartbeat is not None:
+            heartbeat.set()
+            queue.release(worker)
+        if fetcher is not None:
+            fetcher.close()
+        if shared is not None:
+            shared.close()
+            print(f"\n✓ '{output}' 저장 완료 (전체 사이트)")
+        if LOG_JSON:
+            print(json.dumps({'ts': round(time.time(), 3), 'event': 'metrics', **METRICS.to_dict()},
+                             ensure_ascii=False))
+        else:
+            print()
+            for line in METRICS.summary():
+                print(line)
+        if server is not None:
+            server.shutdown()
+        print("\n완료!")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="병원 질병정보 크롤러 (여러 사이트 동시 실행)")
+    parser.add_argument('sites', nargs='*', default=list(SITES),
+                        help=f"크롤링할 사이트 (기본: 전체, 가능: {', '.join(SITES)})")
+    parser.add_argument('--profile',
+                        help="설정 프로필 (내장: default, polite, fast-local-mirror, reparse-only; "
+                             "python profiles.py로 목록)")
+    parser.add_argument('--config',
+                        help="프로필·공통 설정 파일 (.toml / .json, 기본: 있으면 crawler.toml)")
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help="프로필 설정 하나를 바꿈 (예: --set flush_every=500, 여러 번 가능)")
+    parser.add_argument('--reparse', action='store_true',
+                        help="네트워크 없이 캐시된 HTML로 결과를 다시 생성")
+    parser.add_argument('--resume', action='store_true',
+                        help="중단된 지난 실행을 이어서 (끝난 URL은 건너뛰고 실패·남은 URL만 처리)")
+    parser.add_argument('--output',
+                        help="모든 사이트 결과를 함께 기록할 파일 (.csv / .jsonl / .parquet / .idx 검색 색인)")
+    parser.add_argument('--metrics-port', type=int,
+                        help="측정값을 Prometheus 텍스트 형식으로 내보낼 포트 (/metrics)")
+    parser.add_argument('--log-json', action='store_true',
+                        help="진행 로그를 JSON 한 줄씩 출력")
+    parser.add_argument('--queue',
+                        help="분산 크롤링 작업 대기열 ('postgres'면 SNUH DB, 아니면 SQLite 파일 경로)")
+    role = parser.add_mutually_exclusive_group()
+    role.add_argument('--coordinator', action='store_const', const='coordinator', dest='role',
+                      help="목록만 탐색해 대기열에 넣음 (--queue 필요)")
+    role.add_argument('--worker', action='store_const', const='worker', dest='role',
+                      help="대기열의 URL을 처리 (--queue 필요, 여러 노드에서 동시에 실행)")
+    parser.add_argument('--worker-id', help="워커 이름 (기본: 호스트-PID)")
+    parser.add_argument('--nodes', type=int,
+                        help="함께 도는 워커 노드 수 (호스트별 요청 속도를 나눔)")
+    parser.add_argument('--seen', choices=('memory', 'disk', 'bloom'),
+                        help="목록 중복 제거용 본 URL 집합 (disk: 목록이 아주 커도 메모리 일정)")
+    args = parser.parse_args(argv)
+    if args.role and not args.queue:
+        parser.error("--coordinator/--worker는 --queue가 필요합니다")
+    return args
+
+
+def main(argv=None):
+    """명령줄 실행: 프로필(--profile, --config, --set)에 명령줄 옵션을 덮어써 run()"""
+    args = parse_args(argv)
+    try:
+        overrides = dict(parse_override(text) for text in args.set)
+        # 명령줄 옵션은 프로필보다 우선 (같은 이름의 설정으로 넘겨 측정값에도 그대로 남김)
+        for key, value in (('metrics_port', args.metrics_port), ('log_json', args.log_json or None),
+                           ('worker_nodes', args.nodes), ('seen_urls', args.seen)):
+            if value is not None:
+                overrides[key] = value
+        profile = load_profile(args.profile, args.config, overrides)
+        sites = [load_site(name) for name in args.sites]
+    except (ProfileError, ValueError) as e:
+        raise SystemExit(f"설정 오류: {e}")
+
+    options = profile.run_options()
+    # 대기열(--queue postgres)이 설정 파일의 db를 쓰도록 열기 전에 적용 (run()에서 다시 적용해도 같음)
+    profile.apply(sites)
+    queue = open_work_queue(args.queue) if args.role else None
+    try:
+        run(sites, resume=args.resume, reparse=args.reparse or options.get('reparse', False),
+            output=args.output or options.get('output'), queue=queue, role=args.role,
+            worker=args.worker_id, profile=profile)
+    finally:
+        if queue is not None:
+            queue.close()
+
+
+if __name__ == "__main__":
+    # 사이트 어댑터(asan, uni)가 import하는 crawler 모듈과 같은 설정을 쓰도록 그 모듈로 실행
+    import crawler
+
+    crawler.main()
@@ -0,0 +1,288 @@
+import io
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from metrics import METRICS
+from records import SEPARATOR
+
+
+def _copy_value(value):
+    # COPY text 형식: NULL은 \N, 역슬래시·탭·줄바꿈은 이스케이프. 목록은 ', '로 연결 (빈 목록은 NULL)
+    if isinstance(value, (list, tuple)):
+        value = SEPARATOR.join(value) or None
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class BulkWriter:
+    """COPY 기반 PostgreSQL 일괄 저장기
+
+    배치를 COPY로 임시 테이블에 적재한 뒤 INSERT ... SELECT ... ON CONFLICT 한 번으로
+    대상 테이블에 병합한다. 연결은 작은 연결 풀에서 빌려 쓰므로 submit()으로 넘긴
+    배치는 크롤링과 동시에 저장된다. 배치 크기는 한 배치가 target_seconds 안팎에
+    끝나도록 저장 속도에 맞춰 조정된다.
+    """
+
+    def __init__(self, db_config, table, columns, key='url', touch_column='created_at',
+                 pool_size=2, batch_size=100, min_batch=20, max_batch=5000, target_seconds=1.0):
+        self.table = table
+        self.columns = list(columns)
+        self.key = key
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.target_seconds = target_seconds
+
+        self.pool = ThreadedConnectionPool(1, pool_size, **db_config)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size)
+        self.pending = set()  # 아직 끝나지 않은 submit() Future
+        self.lock = threading.Lock()
+
+        stage = f'{table}_stage'
+        column_list = ', '.join(self.columns)
+        updates = [c for c in self.columns if c != key]
+        self.create_stage_sql = (
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage} "
+            f"(seq serial, {', '.join(f'{c} text' for c in self.columns)}) ON COMMIT DELETE ROWS"
+        )
+        self.copy_sql = f"COPY {stage} ({column_list}) FROM STDIN"
+        # 같은 배치에 같은 키가 여러 번 있으면 마지막 것만 반영
+        self.merge_sql = f"""
+            INSERT INTO {table} ({column_list}, {touch_column})
+            SELECT DISTINCT ON ({key}) {column_list}, NOW() FROM {stage}
+            ORDER BY {key}, seq DESC
+            ON CONFLICT ({key}) DO UPDATE SET
+                {', '.join(f'{c} = EXCLUDED.{c}' for c in updates)},
+                {touch_column} = NOW()
+            WHERE ({', '.join(f'{table}.{c}' for c in updates)})
+                IS DISTINCT FROM ({', '.join(f'EXCLUDED.{c}' for c in updates)})
+        """
+
+    def write(self, rows):
+        """rows(dict 목록)를 한 트랜잭션으로 저장. 실패하면 롤백하고 예외를 그대로 올린다"""
+        start = time.monotonic()
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(_copy_value(row.get(c)) for c in self.columns))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        conn = self.pool.getconn()
+        broken = False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(self.create_stage_sql)
+                cursor.copy_expert(self.copy_sql, buffer)
+                cursor.execute(self.merge_sql)
+            conn.commit()
+        except Exception:
+            broken = conn.closed != 0
+            if not broken:
+                conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn, close=broken)
+
+        elapsed = time.monotonic() - start
+        METRICS.observe('db_batch_seconds', elapsed, table=self.table)
+        self._adapt(len(rows), elapsed)
+
+    def _adapt(self, count, elapsed):
+        # 이번 배치의 초당 저장 건수로 target_seconds에 맞는 크기를 구하고 절반씩 반영
+        if count < self.min_batch or elapsed <= 0:
+            return
+        wanted = count / elapsed * self.target_seconds
+        with self.lock:
+            size = int((self.batch_size + wanted) / 2)
+            self.batch_size = max(self.min_batch, min(self.max_batch, size))
+
+    def submit(self, rows):
+        """백그라운드에서 write(rows) 실행 → Future"""
+        future = self.executor.submit(self.write, rows)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self.lock:
+            self.pending.discard(future)
+
+    def flush(self):
+        """submit()한 저장이 모두 끝날 때까지 대기"""
+        with self.lock:
+            pending = list(self.pending)
+        wait(pending)
+
+    def close(self):
+        """진행 중인 저장을 기다린 뒤 연결 풀 종료"""
+        self.executor.shutdown(wait=True)
+        self.pool.closeall()
+
+
+# 잠깐 끊긴 연결·교착 등 다시 시도하면 성공할 수 있는 오류
+TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+_STOP = object()
+
+
+class _Flush:
+    # 대기열에 넣으면 그때까지 들어온 행을 모두 저장한 뒤 done이 설정됨
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class DbSink:
+    """백그라운드 DB 저장 단계
+
+    put()으로 넣은 행은 크기가 정해진 대기열을 거쳐 저장 스레드가 배치로 모으고,
+    배치는 writer의 연결 수(pool_size)만큼 동시에 저장된다. writer.batch_size만큼
+    모이거나 첫 행이 들어온 지 flush_seconds가 지나면 저장하고, 일시적인 오류는 retries번까지 backoff초부터 두 배씩 늘려 기다리며 다시 시도한다.
+    그 밖의 오류가 난 배치는 반으로 나눠 다시 저장해 문제 행만 골라내고, 끝내 저장하지
+    못한 행은 dead_letter 파일(JSON Lines)에 남긴다.
+
+    on_flush(rows, failed)는 배치 저장이 끝날 때마다 호출된다 (failed는 저장하지 못한 행).
+    대기열이 가득 차면 put()이 기다리므로 DB가 크롤링보다 느려도 메모리는 일정하다.
+    close()는 대기열에 남은 행을 모두 저장한 뒤 연결을 닫는다.
+    """
+
+    confirms_writes = True  # 저장 결과는 on_flush로 알려 줌 (sinks.RecordSink 참고)
+
+    def __init__(self, writer, max_queue=1000, flush_seconds=5.0, retries=3, backoff=1.0,
+                 dead_letter='db_dead_letter.jsonl', on_flush=None):
+        self.writer = writer
+        self.flush_seconds = flush_seconds
+        self.retries = retries
+        self.backoff = backoff
+        self.dead_letter = dead_letter
+        self.on_flush = on_flush
+        self.dead_count = 0
+        self.closed = False
+        self.lock = threading.Lock()
+
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.slots = threading.Semaphore(writer.pool_size)  # 동시에 저장 중인 배치 수 제한
+        self.thread = threading.Thread(target=self._run, name='db-sink', daemon=True)
+        self.thread.start()
+
+    def put(self, row):
+        """행 하나를 저장 대기열에 넣음 (대기열이 가득 차면 자리가 날 때까지 대기)"""
+        self.queue.put(row)
+
+    # sinks.RecordSink와 같은 이름으로도 쓸 수 있게
+    write = put
+
+    def flush(self):
+        """지금까지 넣은 행이 모두 저장될 때까지 대기"""
+        marker = _Flush()
+        self.queue.put(marker)
+        marker.done.wait()
+
+    def close(self):
+        """남은 행을 모두 저장하고 저장 스레드와 연결 풀 종료 (여러 번 불러도 됨)"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+        self.writer.close()
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # flush_seconds 경과
+
+            if item is _STOP:
+                break
+            if isinstance(item, _Flush):
+                self._flush(batch)
+                batch, deadline = [], None
+                self._wait_idle()
+                item.done.set()
+                continue
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_seconds
+
+            if batch and (len(batch) >= self.writer.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch, deadline = [], None
+
+        self._flush(batch)
+        self._wait_idle()
+
+    def _wait_idle(self):
+        # 모든 자리를 잡았다 놓으면 진행 중인 배치가 모두 끝난 것
+        for _ in range(self.writer.pool_size):
+            self.slots.acquire()
+        for _ in range(self.writer.pool_size):
+            self.slots.release()
+
+    def _flush(self, rows):
+        if not rows:
+            return
+        self.slots.acquire()
+        future = self.writer.executor.submit(self._save, rows)
+        future.add_done_callback(lambda _: self.slots.release())
+
+    def _save(self, rows):
+        failed = self._write(rows)
+        if self.on_flush is not None:
+            try:
+                self.on_flush(rows, failed)
+            except Exception as e:
+                print(f"  DB 저장 콜백 오류: {e}")
+
+    def _write(self, rows):
+        # 저장하지 못한 행 목록을 돌려준다
+        for attempt in range(self.retries + 1):
+            try:
+                self.writer.write(rows)
+                return []
+            except TRANSIENT_ERRORS as e:
+                error = e
+                METRICS.error('write', e, table=self.writer.table)
+                if attempt < self.retries:
+                    delay = self.backoff * 2 ** attempt
+                    print(f"\n  DB 저장 재시도 {attempt + 1}/{self.retries} ({delay:.0f}초 후): {e}")
+                    time.sleep(delay)
+            except Exception as e:
+                error = e
+                METRICS.error('write', e, table=self.writer.table)
+                break
+        else:
+            # 재시도해도 연결이 돌아오지 않으면 나눠 봐야 소용없음
+            self._dead_letter(rows, error)
+            return rows
+
+        if len(rows) > 1:
+            middle = len(rows) // 2
+            return self._write(rows[:middle]) + self._write(rows[middle:])
+        self._dead_letter(rows, error)
+        return rows
+
+    def _dead_letter(self, rows, error):
+        with self.lock:
+            with open(self.dead_letter, 'a', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps({'error': str(error), 'row': dict(row)}, ensure_ascii=False) + '\n')
+            self.dead_count += len(rows)
+        METRICS.inc('dead_letter_rows_total', len(rows), table=self.writer.table)
+        reason = str(error).strip().splitlines()[0] if str(error).strip() else type(error).__name__
+        print(f"\n  DB 저장 실패 {len(rows)}개 ({reason}) → {self.dead_letter}")
@@ -0,0 +1,252 @@
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import time
+
+from scheduler import map_ordered
+
+
+class DiscoveryError(Exception):
+    """목록 페이지를 가져오지 못해 마지막 페이지를 정할 수 없음"""
+
+
+def read_last_page(root, param='pageIndex'):
+    """페이저 링크에 나온 페이지 번호 중 가장 큰 값 (페이저가 없으면 None)
+
+    root는 extract.parse_html()로 파싱한 문서. 페이저가 일부 구간만 보여주는
+    경우도 있으므로 탐색의 출발점으로만 쓴다.
+    """
+    pattern = re.compile(rf'{param}=(\d+)')
+    pages = [
+        int(page)
+        for link in root.iter('a')
+        for page in pattern.findall(link.get('href') or '')
+    ]
+    return max(pages) if pages else None
+
+
+def _url_key(url, size=8):
+    # URL → 고정 길이 해시 (URL 문자열 대신 보관해 항목당 크기를 줄임)
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=size).digest()
+
+
+class DiskUrlSet:
+    """디스크(SQLite)에 두는 본 URL 집합 (set처럼 in / add)
+
+    URL 대신 8바이트 해시를 정수 키로 저장하므로 항목당 수십 바이트이고, 메모리에는
+    SQLite 페이지 캐시(cache_kb)만 올라온다. 해시가 겹칠 확률은 URL 2백만 개에서도
+    1e-7 수준이라 무시한다. 파일은 임시 파일이며 close() 때 지운다.
+    """
+
+    def __init__(self, directory=None, cache_kb=2048):
+        fd, self.path = tempfile.mkstemp(prefix='seen_urls_', suffix='.db', dir=directory)
+        os.close(fd)
+        # 실행이 끝나면 버리는 파일이므로 저널·동기화 없이
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute(f"PRAGMA cache_size = -{cache_kb}")
+        self.conn.execute("CREATE TABLE seen (key INTEGER PRIMARY KEY)")
+        self.count = 0
+
+    @staticmethod
+    def _key(url):
+        return int.from_bytes(_url_key(url), 'big', signed=True)
+
+    def __contains__(self, url):
+        return self.conn.execute("SELECT 1 FROM seen WHERE key = ?", (self._key(url),)).fetchone() is not None
+
+    def add(self, url):
+        self.count += self.conn.execute("INSERT OR IGNORE INTO seen VALUES (?)", (self._key(url),)).rowcount
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.conn.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class BloomUrlSet:
+    """확률적 본 URL 집합 (Bloom 필터, set처럼 in / add)
+
+    capacity개를 넣었을 때 처음 보는 URL을 본 것으로 잘못 판단할 확률이 error_rate가
+    되도록 비트 수와 해시 수를 정한다 (2백만 개, 1e-6이면 약 7MB). 잘못 판단한 URL은
+    중복으로 보고 건너뛰므로 빠뜨려도 되는 경우(미리 보기, 대략적인 재수집)에만 쓴다.
+    """
+
+    def __init__(self, capacity=2_000_000, error_rate=1e-6):
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, url):
+        # 해시 두 개로 hashes개의 위치를 만듦 (Kirsch-Mitzenmacher)
+        digest = _url_key(url, 16)
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, url):
+        return all(self.array[p >> 3] & (1 << (p & 7)) for p in self._positions(url))
+
+    def add(self, url):
+        new = False
+        for p in self._positions(url):
+            if not self.array[p >> 3] & (1 << (p & 7)):
+                self.array[p >> 3] |= 1 << (p & 7)
+                new = True
+        self.count += new
+
+    def __len__(self):
+        return self.count
+
+
+class ListDiscovery:
+    """목록 페이지 탐색기
+
+    load_page(page_index)는 (질병 목록, 페이저의 마지막 페이지 번호)를 반환해야 하고,
+    페이지를 가져오지 못했으면 (None, None)을 반환한다. 가져오지 못한 페이지는 빈 페이지로
+    보지 않고 retry_delay초씩 늘려 가며 retries번 다시 시도한다.
+    마지막 페이지를 먼저 찾은 뒤(페이저 값 확인, 실패 시 지수 탐색 + 이진 탐색)
+    나머지 페이지를 병렬로 가져오면서 중복 제거된 레코드를 순서대로 내보낸다.
+    끝내 가져오지 못한 목록 페이지는 맨 끝에 한 번 더 시도하고, 그래도 실패하면
+    failed에 남겨 complete가 False가 된다.
+    seen은 중복 제거에 쓸 본 URL 집합을 만드는 함수로, 기본은 set이다. 목록이 아주 크면
+    DiskUrlSet(디스크)이나 BloomUrlSet(확률적)처럼 in / add를 지원하는 것으로 바꾼다.
+    """
+
+    def __init__(self, load_page, max_pages=200, workers=4, retries=2, retry_delay=5.0, seen=set):
+        self.load_page = load_page
+        self.seen = seen
+        self.max_pages = max_pages
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.pages = {}  # 탐색 중 이미 가져온 페이지 -> 질병 목록
+        self.failed = set()  # 끝내 가져오지 못한 목록 페이지
+        self.last_page = None
+        self.first = []  # 첫 페이지 질병 목록 (미리 보기용)
+        self.expected = 0  # 예상 질병 수 (중복 제거 전)
+        self.count = 0  # 지금까지 내보낸 (중복 제거 후) 레코드 수
+
+    @property
+    def complete(self):
+        """모든 목록 페이지를 빠짐없이 가져왔는지"""
+        return self.last_page is not None and not self.failed
+
+    def _fetch(self, page_index):
+        # 가져오지 못하면 retry_delay초씩 늘려 가며 다시 시도 (끝내 실패하면 (None, None))
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay * attempt)
+            disease_list, hint = self.load_page(page_index)
+            if disease_list is not None:
+                return disease_list, hint
+        return None, None
+
+    def _has_page(self, page_index):
+        if page_index not in self.pages:
+            disease_list, _ = self._fetch(page_index)
+            if disease_list is None:
+                raise DiscoveryError(f"목록 페이지 {page_index}를 가져오지 못했습니다")
+            self.pages[page_index] = disease_list
+        return len(self.pages[page_index]) > 0
+
+    def find_last_page(self):
+        """데이터가 있는 마지막 페이지 번호 (데이터가 전혀 없으면 0)"""
+        if self.last_page is not None:
+            return self.last_page
+
+        first, hint = self._fetch(1)
+        if first is None:
+            raise DiscoveryError("첫 목록 페이지를 가져오지 못했습니다")
+        self.pages[1] = self.first = first
+        if not first:
+            self.last_page = 0
+            return 0
+
+        # lo: 데이터가 있는 것으로 확인된 페이지, hi: 데이터가 없는 것으로 확인된 페이지
+        lo, hi = 1, None
+        if hint and hint > 1:
+            hint = min(hint, self.max_pages)
+            if self._has_page(hint):
+                lo = hint
+            else:
+                hi = hint
+
+        # 지수 탐색: 빈 페이지가 나올 때까지 간격을 두 배씩 늘림
+        step = 1
+        while hi is None:
+            if lo >= self.max_pages:
+                hi = self.max_pages + 1
+                break
+            probe = min(lo + step, self.max_pages)
+            if self._has_page(probe):
+                lo = probe
+                step *= 2
+            else:
+                hi = probe
+
+        # 이진 탐색
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self._has_page(mid):
+                lo = mid
+            else:
+                hi = mid
+
+        self.last_page = lo
+        # 마지막 페이지 외에는 꽉 찬 페이지라고 보고 계산
+        self.expected = len(first) * (lo - 1) + len(self.pages[lo])
+        print(f"[목록] 마지막 페이지: {lo} (확인한 페이지 {len(self.pages)}개)")
+        return lo
+
+    def peek(self, n):
+        """첫 페이지에서 n개 미리 보기"""
+        self.find_last_page()
+        return self.first[:n]
+
+    def _load(self, page_index):
+        if page_index in self.pages:
+            return self.pages.pop(page_index)
+        disease_list, _ = self._fetch(page_index)
+        if disease_list is None:
+            self.failed.add(page_index)
+            return []
+        return disease_list
+
+    def __iter__(self):
+        last_page = self.find_last_page()
+        seen_urls = self.seen()
+
+        def new(disease_list):
+            for disease in disease_list:
+                if disease['url'] not in seen_urls:
+                    seen_urls.add(disease['url'])
+                    self.count += 1
+                    yield disease
+
+        try:
+            pages = range(1, last_page + 1)
+            for _, disease_list in map_ordered(self._load, pages, workers=self.workers):
+                yield from new(disease_list)
+
+            # 가져오지 못한 목록 페이지는 다른 페이지를 다 돈 뒤 한 번 더
+            for page_index in sorted(self.failed):
+                disease_list, _ = self._fetch(page_index)
+                if disease_list is not None:
+                    self.failed.discard(page_index)
+                    yield from new(disease_list)
+            if self.failed:
+                print(f"[목록] 가져오지 못한 목록 페이지: {sorted(self.failed)}")
+        finally:
+            if hasattr(seen_urls, 'close'):
+                seen_urls.close()
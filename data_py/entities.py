@@ -0,0 +1,316 @@
+"""병원 간 질병 대조: 같은 질병을 하나로 묶은 대표 질병 표 만들기
+
+AMC와 SNUH는 같은 질병을 다른 URL, 다른 표기("이름(English)", "이름[English]")로 보여 준다.
+이름을 정규화한 뒤 블로킹 키(한글명, 영문명, 영문 낱말 집합, 서로를 동의어로 가리키는 이름)가
+같은 레코드끼리 묶고(union-find), 영문명이 조금 다른 경우는 영문명 순으로 정렬해 가까운 이웃끼리만 비교한다.
+모든 쌍을 비교하지 않으므로 레코드 수에 거의 비례하는 시간에 끝난다.
+한쪽만 다른 질병의 이름을 동의어로 적은 경우('편두통'의 동의어 '두통')는 묶으면 넓은 이름을 거쳐
+여러 질병이 한데 이어지므로, 묶지 않고 관련 질병(related)으로만 남긴다.
+
+결과는 대표 질병 표(canonical_id, 이름, 동의어, 진료과, 출처 사이트·URL, 관련 질병)와
+레코드별 연결 표(canonical_id, site, url, 묶인 이유)다.
+
+    python entities.py amc_diseases_20250101_120000.csv --snuh-db -o canonical.csv --links links.csv
+    python entities.py all.jsonl -o canonical.jsonl
+"""
+import argparse
+import hashlib
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+from records import MISSING
+from sinks import create_sink, read_records
+
+# 대표 이름을 고를 때 먼저 보는 사이트 순서
+SITE_PRIORITY = ('amc', 'snuh')
+
+# 영문명 낱말 집합 키에서 뺄 낱말 (두 글자 이상 기능어만. 한 글자·숫자는 'hepatitis a',
+# 'vitamin a deficiency', 'type 1'처럼 질병을 가르는 낱말이라 남김)
+STOPWORDS = {'the', 'of', 'and', 'an', 'in', 'with', 'or', 'to'}
+
+# 영문명이 조금 다른 경우 (철자, 하이픈 등) 같은 질병으로 볼 유사도, 정렬 후 비교할 이웃 수
+FUZZY_RATIO = 0.92
+WINDOW = 4
+
+CANONICAL_COLUMNS = ('canonical_id', 'disease_name_kr', 'disease_name_eng', 'synonyms', 'department',
+                     'sites', 'source_count', 'source_urls', 'related')
+LINK_COLUMNS = ('canonical_id', 'site', 'url', 'disease_name_kr', 'disease_name_eng', 'matched_by')
+
+_PAREN = re.compile(r'\s*[(\[]([^)\]]*)[)\]]\s*')
+_NAME = re.compile(r'^\s*(.*?)\s*[(\[]\s*([^)\]]*?)\s*[)\]]\s*$')
+_PUNCT = re.compile(r'[\W_]+')
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def split_name(value):
+    """'이름(English)' (AMC) / '이름[English]' (SNUH) → (한글명, 영문명 또는 None)"""
+    match = _NAME.match(value or '')
+    if match and match.group(1):
+        return match.group(1), match.group(2) or None
+    return (value or '').strip(), None
+
+
+def normalize_kr(value):
+    """한글명 비교 키: 괄호 부분, 공백, 문장 부호를 빼고 소문자로"""
+    value = unicodedata.normalize('NFKC', value)
+    if '(' in value or '[' in value:
+        value = _PAREN.sub('', value)
+    return _PUNCT.sub('', value.lower())
+
+
+def normalize_eng(value):
+    """영문명 비교 키: 소문자, 's 제거, 문장 부호 → 공백"""
+    value = unicodedata.normalize('NFKC', value).lower().replace("'s", 's').replace('’s', 's')
+    return ' '.join(_WORD.findall(value))
+
+
+def token_key(eng):
+    """영문명 낱말 집합 키 (낱말 순서가 다른 표기 대응: 'disease, crohns' = 'crohns disease')"""
+    tokens = sorted(set(eng.split()) - STOPWORDS)
+    return ' '.join(tokens)
+
+
+def _values(value):
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if value in MISSING:
+        return []
+    return [item.strip() for item in str(value).split(',') if item.strip() not in MISSING]
+
+
+def _close(a, b):
+    """철자만 조금 다른 영문명인지 ('type 1'/'type 2', 'hepatitis a'/'hepatitis b'는 다른 질병)"""
+    if 2 * min(len(a), len(b)) < FUZZY_RATIO * (len(a) + len(b)):
+        return False
+    ta, tb = a.split(), b.split()
+    if len(ta) != len(tb):
+        return False
+    for x, y in zip(ta, tb):
+        if x != y and (x.isdigit() or y.isdigit() or min(len(x), len(y)) < 4):
+            return False
+    matcher = SequenceMatcher(None, a, b)
+    return matcher.quick_ratio() >= FUZZY_RATIO and matcher.ratio() >= FUZZY_RATIO
+
+
+class _UnionFind:
+    __slots__ = ('parent',)
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:  # 경로 압축
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if b < a:
+            a, b = b, a
+        self.parent[b] = a
+        return True
+
+
+class _Entry:
+    """대조에 쓰는 레코드 요약 (정규화한 이름)"""
+
+    __slots__ = ('record', 'site', 'kr', 'eng', 'kr_key', 'eng_key', 'token_key', 'synonyms')
+
+    def __init__(self, record):
+        self.record = record
+        self.site = record.get('site') or ''
+        kr = record.get('disease_name_kr')
+        eng = record.get('disease_name_eng')
+        if kr in MISSING:
+            kr, eng = split_name(record.get('disease_name') or '')
+        elif eng in MISSING:
+            kr, eng = split_name(kr)
+        self.kr = kr or ''
+        self.eng = eng if eng not in MISSING else None
+        self.kr_key = normalize_kr(self.kr)
+        self.eng_key = normalize_eng(self.eng) if self.eng else ''
+        self.token_key = token_key(self.eng_key) if self.eng_key else ''
+        self.synonyms = [s for s in (normalize_kr(v) for v in _values(record.get('synonyms'))) if s]
+
+
+def resolve(records, fuzzy=True):
+    """레코드를 같은 질병끼리 묶음 → [(대표 레코드 dict, [(레코드, 묶인 이유)])]
+
+    레코드에는 site(출처 사이트)와 url이 있어야 하며, 이름은 disease_name_kr /
+    disease_name_eng (없으면 목록의 disease_name을 나눠서) 를 쓴다.
+    """
+    entries = [_Entry(record) for record in records]
+    groups = _UnionFind(len(entries))
+    reasons = {}  # 레코드 번호 -> 처음 묶인 이유
+
+    def link(keys, reason):
+        # 같은 키를 가진 레코드를 첫 레코드에 묶음 (블록 안에서 쌍 비교 없음)
+        for members in keys.values():
+            first = members[0]
+            for other in members[1:]:
+                if groups.union(first, other):
+                    reasons.setdefault(other, reason)
+                    reasons.setdefault(first, reason)
+
+    # 1. 정확히 같은 이름: 한글명, 영문명, 영문 낱말 집합
+    for reason, attr in (('name_kr', 'kr_key'), ('name_eng', 'eng_key'), ('eng_tokens', 'token_key')):
+        keys = defaultdict(list)
+        for i, entry in enumerate(entries):
+            key = getattr(entry, attr)
+            if key:
+                keys[key].append(i)
+        link(keys, reason)
+
+    # 2. 동의어가 다른 레코드의 이름(한글/영문)과 같음 (동의어끼리만 같은 것은 묶지 않음, 너무 넓음).
+    #    서로의 이름을 동의어로 적은 경우만 묶고, 한쪽만 가리키면 관련 질병으로만 기록
+    #    (묶음은 전이되므로 '두통' 같은 넓은 동의어가 편두통·긴장성 두통·두통을 하나로 잇지 않게)
+    names = [{key for key in (entry.kr_key, entry.eng_key.replace(' ', '')) if key} for entry in entries]
+    by_name = defaultdict(list)
+    for i, keys in enumerate(names):
+        for key in keys:
+            by_name[key].append(i)
+    related = set()  # 한쪽만 동의어로 가리키는 (i, j)
+    for i, entry in enumerate(entries):
+        for synonym in entry.synonyms:
+            for j in by_name.get(synonym, ()):
+                if j == i:
+                    continue
+                if names[i].isdisjoint(entries[j].synonyms):
+                    related.add((i, j))
+                elif groups.union(i, j):
+                    reasons.setdefault(i, 'synonym')
+                    reasons.setdefault(j, 'synonym')
+
+    # 3. 영문명이 조금 다른 경우 (철자, 하이픈): 영문명으로 정렬해 가까운 WINDOW개와만 비교
+    #    앞부분이 다른 경우를 위해 뒤집은 영문명 순서로도 한 번 더 (sorted neighbourhood)
+    if fuzzy:
+        first = {}  # 같은 영문명은 1단계에서 이미 묶였으므로 하나만 비교
+        for i, entry in enumerate(entries):
+            if entry.eng_key:
+                first.setdefault(entry.eng_key, i)
+        names = list(first)
+        for order in (None, lambda name: name[::-1]):
+            names.sort(key=order)
+            for a, name in enumerate(names):
+                i = first[name]
+                for other in names[a + 1:a + 1 + WINDOW]:
+                    j = first[other]
+                    if groups.find(i) != groups.find(j) and _close(name, other):
+                        groups.union(i, j)
+                        reasons.setdefault(i, 'fuzzy_eng')
+                        reasons.setdefault(j, 'fuzzy_eng')
+
+    clusters = defaultdict(list)
+    for i in range(len(entries)):
+        clusters[groups.find(i)].append(i)
+
+    results = {}  # 묶음 대표 번호 -> (대표 레코드, 연결)
+    for root, members in clusters.items():
+        cluster = [entries[i] for i in members]
+        links = [(entries[i].record, reasons.get(i, 'single')) for i in members]
+        results[root] = (_canonical(cluster), links)
+
+    # 관련 질병: 다른 묶음으로 남은 한쪽 방향 동의어 (양쪽 대표 질병에 서로의 번호)
+    for i, j in related:
+        a, b = groups.find(i), groups.find(j)
+        if a != b:
+            results[a][0]['related'].append(results[b][0]['canonical_id'])
+            results[b][0]['related'].append(results[a][0]['canonical_id'])
+    for canonical, _ in results.values():
+        canonical['related'] = sorted(set(canonical['related']))
+    return sorted(results.values(), key=lambda item: item[0]['canonical_id'])
+
+
+def _canonical(cluster):
+    # 대표 레코드: 우선순위 사이트의 이름, 동의어·진료과·출처는 합침
+    def rank(entry):
+        site = SITE_PRIORITY.index(entry.site) if entry.site in SITE_PRIORITY else len(SITE_PRIORITY)
+        return site, entry.eng is None, entry.record.get('url') or ''
+
+    if len(cluster) > 1:
+        cluster = sorted(cluster, key=rank)
+    head = cluster[0]
+    eng = head.eng or next((entry.eng for entry in cluster if entry.eng), None)
+    names = {head.kr}
+    synonyms = []
+    departments = []
+    for entry in cluster:
+        for value in [entry.kr] + _values(entry.record.get('synonyms')):
+            if value and value not in names:
+                names.add(value)
+                synonyms.append(value)
+        departments.extend(_values(entry.record.get('department')))
+
+    # 묶인 이름 중 사전순으로 가장 앞선 키로 만들어, 같은 묶음이면 실행마다 같은 번호
+    key = min(entry.kr_key or entry.eng_key or (entry.record.get('url') or '') for entry in cluster)
+    sites = sorted({entry.site for entry in cluster if entry.site})
+    return {
+        'canonical_id': 'D' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:12],
+        'disease_name_kr': head.kr,
+        'disease_name_eng': eng,
+        'synonyms': synonyms,
+        'department': list(dict.fromkeys(departments)),
+        'sites': sites,
+        'source_count': len(cluster),
+        'source_urls': [entry.record.get('url') or '' for entry in cluster],
+        'related': [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="병원 간 같은 질병 묶기 (대표 질병 표 만들기)")
+    parser.add_argument('inputs', nargs='*', help="결과 파일 (.csv / .jsonl / .parquet, site 필드가 없으면 --site)")
+    parser.add_argument('--site', action='append', default=[],
+                        help="입력 파일별 사이트 이름 (입력 순서대로, 예: --site amc)")
+    parser.add_argument('--snuh-db', action='store_true', help="SNUH DB(uni.DB_CONFIG)의 레코드도 포함")
+    parser.add_argument('-o', '--output', default='canonical_diseases.csv', help="대표 질병 표")
+    parser.add_argument('--links', help="레코드별 연결 표 (canonical_id, site, url)")
+    parser.add_argument('--no-fuzzy', action='store_true', help="영문명 유사도 비교 생략")
+    args = parser.parse_args()
+
+    records = []
+    for i, path in enumerate(args.inputs):
+        site = args.site[i] if i < len(args.site) else None
+        for record in read_records(path):
+            if site and not record.get('site'):
+                record['site'] = site
+            records.append(record)
+    if args.snuh_db:
+        import uni
+        records.extend({'site': 'snuh', **record} for record in uni.read_db_records())
+
+    start = time.perf_counter()
+    results = resolve(records, fuzzy=not args.no_fuzzy)
+    elapsed = time.perf_counter() - start
+
+    with create_sink([args.output], CANONICAL_COLUMNS) as sink:
+        for canonical, _ in results:
+            sink.write(canonical)
+    if args.links:
+        with create_sink([args.links], LINK_COLUMNS) as sink:
+            for canonical, links in results:
+                for record, reason in links:
+                    sink.write({'canonical_id': canonical['canonical_id'], 'site': record.get('site'),
+                                'url': record.get('url'), 'disease_name_kr': record.get('disease_name_kr'),
+                                'disease_name_eng': record.get('disease_name_eng'), 'matched_by': reason})
+
+    merged = sum(1 for canonical, _ in results if canonical['source_count'] > 1)
+    cross = sum(1 for canonical, _ in results if len(canonical['sites']) > 1)
+    reasons = Counter(reason for _, links in results for _, reason in links)
+    print(f"[대조] 레코드 {len(records)}개 → 대표 질병 {len(results)}개 ({elapsed:.2f}초)")
+    related = sum(len(canonical['related']) for canonical, _ in results) // 2
+    print(f"  여러 레코드가 묶인 질병 {merged}개, 여러 병원에 걸친 질병 {cross}개, 관련 질병 연결 {related}개")
+    print("  묶인 이유: " + ', '.join(f"{reason} {count}" for reason, count in reasons.most_common()))
+    print(f"✓ '{args.output}' 저장" + (f", '{args.links}' 저장" if args.links else ''))
+
+
+if __name__ == "__main__":
+    main()
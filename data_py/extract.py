@@ -0,0 +1,74 @@
+import lxml.html
+from lxml import etree
+
+
+# script/style 안의 글자는 제외한 텍스트 노드 (BeautifulSoup get_text와 같은 범위)
+_TEXT_NODES = etree.XPath('.//text()[not(parent::script or parent::style)]')
+
+
+def parse_html(html, start=None, end=None):
+    """HTML을 lxml로 파싱해 루트 요소 반환
+
+    start(/end) 문자열을 주면 처음 나오는 start부터 마지막 end까지만 잘라서 파싱한다.
+    머리말·메뉴·스크립트 등 필요 없는 부분을 건너뛰기 위한 것으로,
+    start가 없으면 문서 전체를 파싱한다.
+    """
+    if start:
+        begin = html.find(start)
+        if begin != -1:
+            stop = html.rfind(end) if end else -1
+            html = html[begin:stop + len(end)] if stop > begin else html[begin:]
+
+    # lxml은 인코딩 선언이 있는 유니코드 문자열을 받지 않으므로 XML 선언 제거
+    if html.lstrip().startswith('<?xml'):
+        html = html[html.index('?>') + 2:]
+    if not html.strip():
+        html = '<html></html>'
+    return lxml.html.document_fromstring(html)
+
+
+def text(element):
+    """요소의 텍스트 (각 텍스트 조각의 앞뒤 공백을 없애고 이어 붙임)"""
+    return ''.join(part.strip() for part in _TEXT_NODES(element))
+
+
+def has_class(element, name):
+    return name in (element.get('class') or '').split()
+
+
+def first(element, tag):
+    """element 아래에서 처음 나오는 tag 요소 (없으면 None)"""
+    return next(element.iterdescendants(tag), None)
+
+
+def next_sibling(element, tag):
+    """element 뒤에 오는 형제 중 처음 나오는 tag 요소 (없으면 None)"""
+    return next(element.itersiblings(tag), None)
+
+
+def texts(element, tag):
+    """element 안의 tag 요소들의 텍스트 목록"""
+    return [text(item) for item in element.iterdescendants(tag)]
+
+
+def item_texts(element, tag):
+    """element 안의 tag 요소 텍스트 목록. tag가 없으면 element 전체 텍스트 하나"""
+    items = texts(element, tag)
+    if items:
+        return items
+    content = text(element)
+    return [content] if content else []
+
+
+def definition_sections(root, labels):
+    """dt 라벨 → 그 뒤의 dd 요소 (라벨마다 처음 나온 것만, 문서를 한 번만 순회)"""
+    found = {}
+    for dt in root.iter('dt'):
+        label = text(dt)
+        if label in labels and label not in found:
+            dd = next_sibling(dt, 'dd')
+            if dd is not None:
+                found[label] = dd
+                if len(found) == len(labels):
+                    break
+    return found
@@ -0,0 +1,605 @@
+import random
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit, urlunsplit
+
+from metrics import METRICS
+
+# requests와 selenium은 import만으로도 시간이 걸리므로 실제로 페처를 만들 때 import 한다
+# (파서만 가져다 쓰는 경우 브라우저나 HTTP 라이브러리를 불러오지 않도록)
+
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# headless Chrome 실행 옵션 (백그라운드 실행, 컨테이너에서 샌드박스·/dev/shm 없이)
+CHROME_ARGS = ('--headless', '--no-sandbox', '--disable-dev-shm-usage')
+
+# 페이지 준비 조건
+# marker: HTTP 응답 HTML에 있어야 하는 문자열 (없으면 브라우저 폴백)
+# css: 브라우저에서 렌더링 완료를 기다릴 요소의 CSS 선택자
+Ready = namedtuple('Ready', ['marker', 'css'])
+
+# 가져온 페이지. status가 304(변경 없음)이면 html은 None
+# etag, last_modified: 다음 조건부 요청에 쓸 HTTP 검증자
+Page = namedtuple('Page', ['html', 'status', 'etag', 'last_modified'])
+
+# 다시 시도할 HTTP 상태 (요청 과다, 서버 일시 오류)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 미러로 보내는 요청의 원래 호스트 (MirrorFetcher가 요청하는 동안 스레드별로 설정)
+_origin = threading.local()
+
+
+def fetch_labels(url):
+    """측정값 라벨: host는 원래 사이트 호스트, 미러로 보낸 요청이면 mirror에 실제 요청한 주소"""
+    netloc = urlsplit(url).netloc
+    origin = getattr(_origin, 'host', None)
+    if origin is None or origin == netloc:
+        return {'host': netloc}
+    return {'host': origin, 'mirror': netloc}
+
+
+def http_status(error):
+    """예외에 담긴 HTTP 응답 상태 코드 (없으면 None)"""
+    return getattr(getattr(error, 'response', None), 'status_code', None)
+
+
+def retry_after(error):
+    """서버가 Retry-After 헤더로 알려 준 대기 시간(초, 없으면 None)"""
+    response = getattr(error, 'response', None)
+    value = response.headers.get('Retry-After') if response is not None else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient(error):
+    """다시 시도하면 성공할 수 있는 오류인지 (429·5xx, 연결 오류, 시간 초과, 브라우저 오류)"""
+    status = http_status(error)
+    if status is not None:
+        return status in RETRY_STATUS
+    # requests 예외는 OSError를 상속한다 (연결 실패, 시간 초과 등)
+    return isinstance(error, OSError) or type(error).__module__.startswith('selenium')
+
+
+def build_chrome_options():
+    """headless Chrome 옵션 생성"""
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    for arg in CHROME_ARGS:
+        chrome_options.add_argument(arg)
+    chrome_options.add_argument(f'user-agent={USER_AGENT}')
+    return chrome_options
+
+
+class Fetcher:
+    """페처 공통 인터페이스: fetch_page()를 구현하면 fetch()는 HTML만 돌려준다"""
+
+    def fetch_page(self, url, ready=None, validators=None):
+        raise NotImplementedError
+
+    def fetch(self, url, ready=None):
+        """URL의 HTML 반환"""
+        return self.fetch_page(url, ready).html
+
+    def close(self):
+        pass
+
+
+class HttpFetcher(Fetcher):
+    """requests 세션 기반 페처 (keep-alive 커넥션 풀 + gzip)"""
+
+    def __init__(self, pool_size=10, timeout=15):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+            'Connection': 'keep-alive',
+        })
+
+    def fetch_page(self, url, ready=None, validators=None):
+        """URL 요청 (ready는 HTTP 경로에서는 사용하지 않음)
+
+        validators=(etag, last_modified)를 주면 조건부 요청을 보내고,
+        서버가 304로 응답하면 html 없이 Page(status=304)를 반환한다.
+        """
+        headers = {}
+        if validators:
+            etag, last_modified = validators
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        with METRICS.timer('fetch_seconds', backend='http', **fetch_labels(url)):
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 304:
+            if validators:
+                etag, last_modified = etag or validators[0], last_modified or validators[1]
+            return Page(None, 304, etag, last_modified)
+        
+        response.raise_for_status()
+        # charset 헤더가 없으면 requests가 ISO-8859-1로 가정하므로 본문에서 추정
+        if not response.encoding or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = response.apparent_encoding
+        return Page(response.text, response.status_code, etag, last_modified)
+
+    def close(self):
+        self.session.close()
+
+
+class _Browser:
+    __slots__ = ('driver', 'pages')
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0  # 이 브라우저로 연 페이지 수
+
+
+class BrowserPool:
+    """재사용하는 headless Chrome 풀
+
+    브라우저는 처음 필요할 때 만들고 최대 size개까지 여러 워커가 나눠 쓴다.
+    max_pages개 페이지를 열었거나 브라우저 프로세스들의 메모리(RSS)가 max_memory_mb를
+    넘으면 닫고 새로 만든다 (오래 띄워 둔 Chrome의 메모리 증가 방지).
+    메모리 확인에는 psutil이 필요하며, 없으면 페이지 수로만 교체한다.
+    """
+
+    def __init__(self, size=2, max_pages=200, max_memory_mb=1024, check_every=10):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.check_every = check_every
+        self.idle = []
+        self.created = 0  # 만들어서 아직 닫지 않은 브라우저 수 (사용 중 포함)
+        self.recycled = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """쉬고 있는 브라우저를 빌림 (없으면 새로 만들거나, size개가 모두 사용 중이면 대기)"""
+        with self.condition:
+            while not self.idle and self.created >= self.size:
+                self.condition.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.created += 1
+
+        try:
+            from selenium import webdriver
+            return _Browser(webdriver.Chrome(options=build_chrome_options()))
+        except Exception:
+            self._forget()
+            raise
+
+    def release(self, browser):
+        """다 쓴 브라우저 반납 (교체할 때가 됐으면 닫음)"""
+        browser.pages += 1
+        if self._worn_out(browser):
+            self.recycled += 1
+            self.discard(browser)
+            return
+        with self.condition:
+            self.idle.append(browser)
+            self.condition.notify()
+
+    def discard(self, browser):
+        """오류가 난 브라우저 닫기 (다음 acquire에서 새로 만듦)"""
+        try:
+            browser.driver.quit()
+        except Exception:
+            pass
+        self._forget()
+
+    def _forget(self):
+        with self.condition:
+            self.created -= 1
+            self.condition.notify()
+
+    def _worn_out(self, browser):
+        if browser.pages >= self.max_pages:
+            return True
+        if browser.pages % self.check_every == 0:
+            return self._memory(browser.driver) > self.max_memory
+        return False
+
+    def _memory(self, driver):
+        # chromedriver와 그 아래 Chrome 프로세스들의 RSS 합계
+        try:
+            import psutil
+            process = psutil.Process(driver.service.process.pid)
+            return sum(p.memory_info().rss for p in [process, *process.children(recursive=True)])
+        except Exception:
+            return 0
+
+    def close(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+        for browser in idle:
+            self.discard(browser)
+
+
+class SeleniumFetcher(Fetcher):
+    """headless Chrome 기반 페처 (JavaScript 렌더링이 필요한 페이지용)
+
+    브라우저는 BrowserPool에서 빌려 쓰므로 최대 browsers개 페이지를 동시에 연다.
+    """
+
+    def __init__(self, timeout=10, browsers=2, max_pages=200, max_memory_mb=1024):
+        self.timeout = timeout
+        self.pool = BrowserPool(size=browsers, max_pages=max_pages, max_memory_mb=max_memory_mb)
+
+    def fetch_page(self, url, ready=None, validators=None):
+        """브라우저로 페이지를 열고, ready.css 요소가 나타날 때까지 기다린 뒤 반환
+
+        브라우저 경로는 조건부 요청을 지원하지 않으므로 validators는 무시한다. 요소가 timeout초
+        안에 나타나지 않으면 렌더링이 덜 된 페이지를 돌려주지 않고 TimeoutException을 낸다
+        (일시 오류로 다시 시도되고, 끝내 실패하면 실패로 집계됨).
+        """
+        from selenium.common.exceptions import TimeoutException, WebDriverException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        browser = self.pool.acquire()
+        timed_out = False
+        try:
+            driver = browser.driver
+            labels = fetch_labels(url)
+            with METRICS.timer('fetch_seconds', backend='selenium', **labels):
+                driver.get(url)
+            
+            if ready is not None:
+                start = time.monotonic()
+                try:
+                    WebDriverWait(driver, self.timeout).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, ready.css))
+                    )
+                    print(f"  [대기 {time.monotonic() - start:.2f}초] {url}")
+                except TimeoutException:
+                    timed_out = True
+                METRICS.observe('wait_seconds', time.monotonic() - start, host=labels['host'], reason='render')
+            
+            html = None if timed_out else driver.page_source
+        except WebDriverException:
+            # 브라우저가 죽었거나 응답하지 않으면 버리고 다음에 새로 띄움
+            self.pool.discard(browser)
+            raise
+        
+        # 시간 초과는 페이지 문제이므로 브라우저는 그대로 돌려놓음
+        self.pool.release(browser)
+        if timed_out:
+            raise TimeoutException(f"'{ready.css}' 요소가 {self.timeout}초 안에 나타나지 않음: {url}")
+        return Page(html, 200, None, None)
+
+    def close(self):
+        self.pool.close()
+
+
+class FallbackFetcher(Fetcher):
+    """HTTP 우선 페처. ready.marker가 없는 응답(JS 렌더링 페이지)만 브라우저로 재요청
+
+    HTTP 응답에는 없던 marker가 브라우저 결과에는 있는 경우가 연속 max_misses번
+    나오면, 그 사이트는 JavaScript가 필요한 것으로 보고 이후 바로 브라우저로 요청한다.
+    """
+
+    def __init__(self, primary, fallback, max_misses=3):
+        self.primary = primary
+        self.fallback = fallback
+        self.max_misses = max_misses
+        self.misses = {}  # host -> 연속 실패 횟수
+
+    def fetch_page(self, url, ready=None, validators=None):
+        import requests
+
+        host = urlsplit(url).netloc
+        if self.misses.get(host, 0) >= self.max_misses:
+            return self.fallback.fetch_page(url, ready)
+        
+        try:
+            page = self.primary.fetch_page(url, ready, validators)
+            if page.status == 304 or ready is None or ready.marker in page.html:
+                self.misses[host] = 0
+                return page
+        except requests.RequestException as e:
+            status = http_status(e)
+            if status in RETRY_STATUS:
+                raise  # 서버가 바쁘거나 일시 오류: 브라우저로 다시 요청해도 같으므로 재시도에 맡김
+            if status is not None and 400 <= status < 500:
+                raise  # 없는 페이지(404 등): 브라우저로 요청해도 같은 결과
+            print(f"  [HTTP 실패 → 브라우저] {e}")
+        
+        page = self.fallback.fetch_page(url, ready)
+        if ready is not None and ready.marker in page.html:
+            self.misses[host] = self.misses.get(host, 0) + 1
+            if self.misses[host] == self.max_misses:
+                print(f"  [{host}] JavaScript 렌더링이 필요한 사이트로 판단, 이후 브라우저로 요청합니다.")
+        return page
+
+    def close(self):
+        self.primary.close()
+        self.fallback.close()
+
+
+class TokenBucket:
+    """토큰 버킷 (초당 rate개, 최대 burst개까지 몰아서 허용)"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 예약하고, 사용 가능한 시점까지 대기 → 기다린 시간(초)"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # 토큰을 미리 차감해 두면 대기 중인 워커들이 순서대로 간격을 두고 깨어난다
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def set_rate(self, rate):
+        """속도 변경 (지금까지 쌓인 토큰은 이전 속도로 계산)"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = rate
+
+
+class CircuitBreaker:
+    """호스트 하나의 회로 차단기
+
+    일시 오류가 연속 threshold번 나오면 cooldown초 동안 그 호스트로 요청을 보내지 않고
+    기다리게 한 뒤, 요청 하나만 시험으로 보낸다. 시험이 성공하면 다시 열고, 실패하면
+    막아 두는 시간을 두 배로 늘린다 (최대 max_cooldown초).
+    """
+
+    def __init__(self, threshold=5, cooldown=10.0, max_cooldown=300.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = 0  # 연속 실패 수
+        self.trips = 0  # 시험이 실패해 연속으로 막힌 횟수
+        self.open_until = 0.0
+        self.probing = False  # 시험 요청이 진행 중인지
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """요청 전 호출: 막혀 있으면 풀릴 때까지 대기 → (기다린 시간, 시험 요청인지)"""
+        with self.condition:
+            if self.failures < self.threshold:
+                return 0.0, False
+            start = time.monotonic()
+            while self.failures >= self.threshold:
+                now = time.monotonic()
+                if now < self.open_until:
+                    self.condition.wait(self.open_until - now)
+                elif not self.probing:
+                    self.probing = True
+                    return time.monotonic() - start, True
+                else:
+                    self.condition.wait()  # 시험 결과를 기다림
+            return time.monotonic() - start, False
+
+    def success(self, probe=False):
+        with self.condition:
+            self.failures = 0
+            self.trips = 0
+            if probe:
+                self.probing = False
+            self.condition.notify_all()
+
+    def failure(self, probe=False):
+        """일시 오류 기록 → 이번 실패로 막혔으면 막아 두는 시간(초), 아니면 None"""
+        with self.condition:
+            self.failures += 1
+            if probe:
+                self.probing = False
+            # 막히는 순간(연속 실패가 처음 threshold에 닿을 때)과 시험 실패 때만 새로 막음
+            if not probe and self.failures != self.threshold:
+                return None
+            if probe:
+                self.trips += 1
+            cooldown = min(self.cooldown * 2 ** self.trips, self.max_cooldown)
+            self.open_until = time.monotonic() + cooldown
+            self.condition.notify_all()
+            return cooldown
+
+
+class _Host:
+    """RateLimitedFetcher가 호스트마다 두는 상태"""
+
+    __slots__ = ('bucket', 'breaker', 'ceiling')
+
+    def __init__(self, rate, burst, breaker):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.breaker = breaker
+        self.ceiling = rate  # 설정한 최대 속도 (적응 속도는 이 값을 넘지 않음)
+
+
+class RateLimitedFetcher(Fetcher):
+    """호스트별 토큰 버킷으로 요청 속도를 제한하고 실패하는 호스트를 잠시 멈추는 페처 래퍼
+
+    host_rates에 있는 호스트는 그 속도로, 나머지는 rate로 제한한다 (None이면 제한 없음).
+    adaptive면 429·5xx 응답에 속도를 절반으로, 응답이 slow_seconds보다 느리면 20% 줄이고,
+    정상 응답마다 설정한 속도의 5%씩 되돌린다 (AIMD). 일시 오류가 연속되면
+    호스트별 CircuitBreaker가 그 호스트로 가는 요청을 잠시 멈춘다.
+    """
+
+    def __init__(self, fetcher, rate=2.0, burst=1, host_rates=None, adaptive=True, slow_seconds=5.0,
+                 breaker_threshold=5, breaker_cooldown=10.0):
+        self.fetcher = fetcher
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self.adaptive = adaptive
+        self.slow_seconds = slow_seconds
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.hosts = {}  # host -> _Host
+        self.lock = threading.Lock()
+
+    def _host(self, host):
+        with self.lock:
+            if host not in self.hosts:
+                breaker = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+                self.hosts[host] = _Host(self.host_rates.get(host, self.rate), self.burst, breaker)
+            return self.hosts[host]
+
+    def _adapt(self, host, state, factor=None):
+        # factor가 있으면 곱해서 줄이고, 없으면 설정한 속도의 5%만큼 되돌림
+        bucket = state.bucket
+        if not self.adaptive or bucket is None:
+            return
+        if factor is None:
+            if bucket.rate >= state.ceiling:
+                return
+            rate = min(state.ceiling, bucket.rate + state.ceiling * 0.05)
+        else:
+            rate = max(state.ceiling * 0.05, bucket.rate * factor)
+        bucket.set_rate(rate)
+        METRICS.set('request_rate', round(rate, 3), host=host)
+
+    def fetch_page(self, url, ready=None, validators=None):
+        host = urlsplit(url).netloc
+        state = self._host(host)
+
+        waited, probe = state.breaker.acquire()
+        if waited:
+            METRICS.observe('wait_seconds', waited, host=host, reason='circuit')
+        if state.bucket is not None:
+            METRICS.observe('wait_seconds', state.bucket.acquire(), host=host, reason='rate_limit')
+
+        start = time.monotonic()
+        try:
+            page = self.fetcher.fetch_page(url, ready, validators)
+        except Exception as e:
+            if not is_transient(e):
+                state.breaker.success(probe)  # 404 등: 호스트는 응답하고 있음
+                raise
+            if http_status(e) is not None:
+                self._adapt(host, state, 0.5)
+            cooldown = state.breaker.failure(probe)
+            if cooldown is not None:
+                METRICS.inc('circuit_open_total', host=host)
+                print(f"  [{host}] 연속 오류 → {cooldown:.1f}초 동안 요청 중지")
+            raise
+
+        state.breaker.success(probe)
+        self._adapt(host, state, 0.8 if time.monotonic() - start > self.slow_seconds else None)
+        return page
+
+    def close(self):
+        self.fetcher.close()
+
+
+class RetryingFetcher(Fetcher):
+    """일시 오류(429·5xx, 연결 오류, 시간 초과)를 지수 백오프로 다시 시도하는 페처 래퍼
+
+    n번째 재시도 전에는 0 ~ min(max_backoff, backoff * 2^n)초 중 무작위로 기다리고
+    (full jitter, 여러 워커가 한꺼번에 다시 몰리지 않도록), 서버가 Retry-After를 보내면
+    그보다 짧게 기다리지 않는다. 404 같은 영구 오류는 다시 시도하지 않는다.
+    """
+
+    def __init__(self, fetcher, retries=4, backoff=0.5, max_backoff=30.0):
+        self.fetcher = fetcher
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def fetch_page(self, url, ready=None, validators=None):
+        for attempt in range(self.retries + 1):
+            try:
+                return self.fetcher.fetch_page(url, ready, validators)
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    raise
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                delay = max(delay, min(retry_after(e) or 0, self.max_backoff * 4))
+                host = urlsplit(url).netloc
+                METRICS.inc('retries_total', host=host, reason=http_status(e) or type(e).__name__)
+                METRICS.observe('wait_seconds', delay, host=host, reason='backoff')
+                time.sleep(delay)
+
+    def close(self):
+        self.fetcher.close()
+
+
+class MirrorFetcher(Fetcher):
+    """요청을 원래 호스트 대신 미러 주소로 보내는 페처 래퍼 (로컬 미러, 벤치마크용 가짜 사이트)
+
+    mirrors: {원래 호스트: 'http://127.0.0.1:8765'}. 경로와 쿼리는 그대로 두고 scheme과
+    호스트만 바꾸므로, 캐시·증분 상태·출력에는 원래 URL이 남는다.
+    """
+
+    def __init__(self, fetcher, mirrors):
+        self.fetcher = fetcher
+        self.mirrors = {host: urlsplit(base) for host, base in mirrors.items()}
+
+    def rewrite(self, url):
+        parts = urlsplit(url)
+        base = self.mirrors.get(parts.netloc)
+        if base is None:
+            return url
+        return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+    def fetch_page(self, url, ready=None, validators=None):
+        # 아래 페처의 측정값이 미러 주소가 아닌 원래 사이트 호스트로 묶이도록
+        _origin.host = urlsplit(url).netloc
+        try:
+            return self.fetcher.fetch_page(self.rewrite(url), ready, validators)
+        finally:
+            _origin.host = None
+
+    def close(self):
+        self.fetcher.close()
+
+
+def create_fetcher(backend='auto', rate=None, burst=1, host_rates=None, browsers=2, mirrors=None,
+                   retries=4, adaptive=True):
+    """페처 생성
+
+    backend: 'http' (브라우저 없음), 'selenium' (기존 방식), 'auto' (HTTP 우선 + Selenium 폴백)
+    rate: 호스트별 초당 최대 요청 수 (None이면 제한 없음)
+    host_rates: 호스트마다 따로 정한 초당 최대 요청 수 ({호스트: 속도})
+    browsers: 동시에 띄울 수 있는 브라우저 수 (브라우저는 실제로 필요할 때 띄움)
+    mirrors: 호스트별 미러 주소 ({호스트: 'http://...'}, 속도 제한은 원래 호스트 기준)
+    retries: 일시 오류를 다시 시도할 횟수 (지수 백오프)
+    adaptive: 429·5xx 응답과 응답 지연에 맞춰 호스트별 속도를 자동 조절할지
+    """
+    if backend == 'http':
+        fetcher = HttpFetcher()
+    elif backend == 'selenium':
+        fetcher = SeleniumFetcher(browsers=browsers)
+    elif backend == 'auto':
+        fetcher = FallbackFetcher(HttpFetcher(), SeleniumFetcher(browsers=browsers))
+    else:
+        raise ValueError(f"알 수 없는 fetch backend: {backend}")
+    
+    if mirrors:
+        fetcher = MirrorFetcher(fetcher, mirrors)
+    # 속도 제한이 없어도 회로 차단은 항상 적용
+    fetcher = RateLimitedFetcher(fetcher, rate=rate, burst=burst, host_rates=host_rates, adaptive=adaptive)
+    if retries:
+        fetcher = RetryingFetcher(fetcher, retries=retries)
+    return fetcher
@@ -0,0 +1,346 @@
+"""질병 레코드 변경 피드와 버전 기록 (SQLite, 추가만 하는 구조)
+
+크롤링(또는 재파싱) 한 번을 번호 붙은 crawl로 기록하고, 레코드가 처음 나오거나(insert)
+바뀌었거나(update) 목록에서 사라졌을 때(delete)만 versions에 한 줄을 덧붙인다.
+바뀌지 않은 레코드는 아무것도 쓰지 않으므로 크롤링 횟수가 늘어도 크기는 변경 수에 비례한다.
+지난 줄은 고치거나 지우지 않는다.
+
+- changes(since): since번 크롤링 뒤의 변경을 필드 단위 차이와 함께 흘려보냄 (변경 피드)
+- as_of(crawl): crawl번 크롤링 시점의 전체 목록 (그 뒤 버전은 무시)
+- latest(): 변경 피드를 어디까지 읽어도 되는지 (그 번호까지의 크롤링이 모두 끝남)
+
+크롤링과 재파싱, 분산 모드의 워커들은 저마다 crawl 번호를 받아 동시에 기록할 수 있다.
+번호가 작은 크롤링이 늦게 끝날 수 있으므로 변경 피드는 끝나지 않은 크롤링 앞까지만 내보낸다.
+
+삭제는 목록을 빠짐없이 가져온 크롤링에서만 판단한다 (실패한 목록 페이지가 있으면
+못 본 URL이 사라진 것인지 알 수 없음). 상세 페이지를 가져오지 못한 URL도 본 것으로 친다.
+분산 모드의 워커는 목록의 일부만 처리하므로 삭제를 판단하지 않는다.
+
+    python history.py crawls amc_history.db
+    python history.py changes snuh_history.db --since 3 -o snuh_changes.jsonl
+    python history.py as-of amc_history.db --crawl 3 -o amc_crawl3.csv --missing "정보 없음"
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+from records import FIELDS, DiseaseRecord, is_missing
+
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+
+CRAWL = 'crawl'
+REPARSE = 'reparse'
+
+
+def record_digest(record):
+    """레코드 내용 해시 (필드 순서·목록/tuple 차이와 무관)"""
+    data = json.dumps(dict(record), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def field_changes(old, new):
+    """{필드: [이전 값, 새 값]} — 값이 없으면 None, 목록은 list"""
+    def value(record, field):
+        item = record.get(field) if record is not None else None
+        if is_missing(item):
+            return None
+        return list(item) if isinstance(item, (list, tuple)) else item
+
+    changes = {}
+    for field in FIELDS:
+        before, after = value(old, field), value(new, field)
+        if before != after:
+            changes[field] = [before, after]
+    return changes
+
+
+class RecordHistory:
+    """사이트 하나의 레코드 버전 기록 (여러 스레드에서 함께 사용할 수 있음)
+
+    begin()으로 크롤링을 시작하고, 처리한 URL마다 observe(url, record)를 부른 뒤
+    finish(complete)로 끝낸다. live는 URL별 최신 내용 해시와 마지막으로 본 crawl 번호를
+    두는 색인이고, versions가 추가만 하는 기록이다.
+    """
+
+    def __init__(self, path, commit_every=50):
+        # 같은 호스트의 워커들, 크롤링 중에 시작한 재파싱이 한 파일을 함께 씀
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawls (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                worker TEXT,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                complete INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        if 'worker' not in {row[1] for row in self.conn.execute("PRAGMA table_info(crawls)")}:
+            # 워커 열이 없던 기록 파일
+            self.conn.execute("ALTER TABLE crawls ADD COLUMN worker TEXT")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS versions (
+                url TEXT NOT NULL,
+                crawl INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                record TEXT,
+                PRIMARY KEY (url, crawl)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS versions_crawl ON versions (crawl, url)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS live (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                seen INTEGER NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.commit_every = commit_every
+        self.pending = 0
+        self.crawl = None
+        # 이어서 할 크롤링이 없어 새로 시작한 --resume: 지난 실행에서 끝낸 URL을 이번 크롤링에서
+        # 보지 못하므로 삭제를 판단하지 않음
+        self.partial = False
+
+    def _maybe_commit(self):
+        # 호출하는 쪽에서 lock을 잡고 있어야 함
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.conn.commit()
+            self.pending = 0
+
+    def begin(self, kind=CRAWL, resume=False, worker=None):
+        """크롤링 시작 → crawl 번호. resume이면 끝나지 않은 지난 크롤링을 이어서 씀
+
+        분산 모드의 워커는 worker 이름으로 저마다 크롤링 번호를 받는다. 끝나지 않은 채 남은
+        크롤링 중 종류와 워커가 같은 것만 닫는다 (크롤링 중에 시작한 재파싱이나 다른 워커가
+        진행 중인 크롤링을 끝내 버리지 않도록).
+        """
+        with self.lock:
+            # 찾기와 닫기·만들기 사이에 다른 프로세스가 끼어들지 않도록 쓰기 잠금부터 잡음
+            self.conn.commit()
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute(
+                "SELECT id FROM crawls WHERE finished_at IS NULL AND kind = ? AND worker IS ? "
+                "ORDER BY id DESC LIMIT 1", (kind, worker)
+            ).fetchone()
+            self.partial = resume and row is None
+            if resume and row is not None:
+                self.crawl = row[0]
+            else:
+                # 중단된 채 남은 같은 종류·같은 워커의 크롤링은 불완전한 것으로 닫음
+                self.conn.execute(
+                    "UPDATE crawls SET finished_at = ? WHERE finished_at IS NULL AND kind = ? AND worker IS ?",
+                    (datetime.now().isoformat(), kind, worker),
+                )
+                self.crawl = self.conn.execute(
+                    "INSERT INTO crawls (kind, worker, started_at) VALUES (?, ?, ?)",
+                    (kind, worker, datetime.now().isoformat()),
+                ).lastrowid
+            self.conn.commit()
+        return self.crawl
+
+    def observe(self, url, record):
+        """이번 크롤링에서 처리한 URL 기록 → 'insert' | 'update' | None(변경 없음)
+
+        record가 None이면(가져오지 못함) 본 것으로만 표시해 삭제로 판단되지 않게 한다.
+        """
+        with self.lock:
+            digest = record_digest(record) if record is not None else None
+            row = self.conn.execute("SELECT digest FROM live WHERE url = ?", (url,)).fetchone()
+            if record is None or (row is not None and row[0] == digest):
+                if row is not None:
+                    self.conn.execute("UPDATE live SET seen = ? WHERE url = ?", (self.crawl, url))
+                    self._maybe_commit()
+                return None
+
+            op = INSERT if row is None else UPDATE
+            # 같은 크롤링 안에서 다시 바뀌면(재시도, --resume) 내용만 바꾸고 처음 판단(insert/update)은 유지
+            self.conn.execute(
+                "INSERT INTO versions VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (url, crawl) DO UPDATE SET record = excluded.record",
+                (url, self.crawl, op, json.dumps(dict(record), ensure_ascii=False)),
+            )
+            self.conn.execute("INSERT OR REPLACE INTO live VALUES (?, ?, ?)", (url, digest, self.crawl))
+            self._maybe_commit()
+        return op
+
+    def commit(self):
+        """지금까지 기록한 것을 반영 (다른 프로세스가 쓰기를 오래 기다리지 않도록)"""
+        with self.lock:
+            self.conn.commit()
+            self.pending = 0
+
+    def finish(self, complete=False):
+        """크롤링 끝: complete(목록을 빠짐없이 가져옴)면 이번에 못 본 URL을 삭제로 기록
+
+        {'insert': n, 'update': n, 'delete': n} 반환
+        """
+        complete = complete and not self.partial
+        with self.lock:
+            if complete:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO versions SELECT url, ?, ?, NULL FROM live WHERE seen < ?",
+                    (self.crawl, DELETE, self.crawl),
+                )
+                self.conn.execute("DELETE FROM live WHERE seen < ?", (self.crawl,))
+            self.conn.execute("UPDATE crawls SET finished_at = ?, complete = ? WHERE id = ?",
+                              (datetime.now().isoformat(), int(complete), self.crawl))
+            self.conn.commit()
+            self.pending = 0
+            counts = dict.fromkeys((INSERT, UPDATE, DELETE), 0)
+            counts.update(self.conn.execute(
+                "SELECT op, COUNT(*) FROM versions WHERE crawl = ? GROUP BY op", (self.crawl,)
+            ).fetchall())
+        return counts
+
+    def crawls(self):
+        """[(번호, 종류, 워커, 시작, 끝, 완전한지, {op: 수})] (오래된 순)"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, kind, worker, started_at, finished_at, complete FROM crawls ORDER BY id"
+            ).fetchall()
+            counts = {}
+            for crawl, op, count in self.conn.execute("SELECT crawl, op, COUNT(*) FROM versions GROUP BY crawl, op"):
+                counts.setdefault(crawl, {})[op] = count
+        return [(*row, counts.get(row[0], {})) for row in rows]
+
+    def _previous(self, url, crawl):
+        # crawl 직전 버전의 레코드 (없거나 삭제됐으면 None)
+        row = self.conn.execute(
+            "SELECT record FROM versions WHERE url = ? AND crawl < ? ORDER BY crawl DESC LIMIT 1", (url, crawl)
+        ).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def changes(self, since=0, until=None, batch=500):
+        """since번 크롤링 뒤의 변경을 (crawl, url) 순서로 흘려보냄
+
+        {'crawl', 'op', 'url', 'changes': {필드: [이전, 새 값]}, 'record': 새 레코드(삭제면 None)}
+        until을 주지 않으면 latest()까지 (진행 중인 크롤링과 그 뒤 번호의 변경은 제외)
+        """
+        key = (since + 1, '')
+        last = until if until is not None else self.latest()
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT crawl, url, op, record FROM versions WHERE (crawl, url) > (?, ?) AND crawl <= ? "
+                    "ORDER BY crawl, url LIMIT ?", (*key, last, batch)
+                ).fetchall()
+                entries = []
+                for crawl, url, op, data in rows:
+                    record = json.loads(data) if data is not None else None
+                    old = self._previous(url, crawl)
+                    entries.append({'crawl': crawl, 'op': op, 'url': url,
+                                    'changes': field_changes(old, record), 'record': record})
+            yield from entries
+            if len(rows) < batch:
+                return
+            key = rows[-1][:2]
+
+    def as_of(self, crawl, batch=2000):
+        """crawl번 크롤링 시점의 목록 (URL 순서로 DiseaseRecord를 흘려보냄, 삭제된 것은 제외)"""
+        url = ''
+        while True:
+            with self.lock:
+                # URL마다 crawl 이하의 마지막 버전
+                rows = self.conn.execute("""
+                    SELECT v.url, v.record FROM versions v
+                    WHERE v.url > ? AND v.crawl = (
+                        SELECT MAX(crawl) FROM versions WHERE url = v.url AND crawl <= ?
+                    )
+                    ORDER BY v.url LIMIT ?
+                """, (url, crawl, batch)).fetchall()
+            for url, data in rows:
+                if data is not None:
+                    yield DiseaseRecord.from_dict(json.loads(data))
+            if len(rows) < batch:
+                return
+
+    def latest(self):
+        """그 번호까지의 크롤링이 모두 끝난 가장 큰 crawl 번호 (없으면 0)
+
+        끝나지 않은 크롤링이 있으면 그 바로 앞까지다. 그 뒤 번호의 크롤링이 먼저 끝났더라도
+        진행 중인 크롤링이 나중에 쓰는 버전을 변경 피드가 건너뛰지 않도록.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COALESCE((SELECT MIN(id) - 1 FROM crawls WHERE finished_at IS NULL), "
+                "(SELECT MAX(id) FROM crawls))"
+            ).fetchone()
+        return row[0] or 0
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="질병 레코드 변경 피드와 시점별 목록")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    crawls = commands.add_parser('crawls', help="크롤링 기록과 변경 수")
+    crawls.add_argument('history', help="버전 기록 파일 (예: amc_history.db)")
+
+    changes = commands.add_parser('changes', help="변경 피드 (JSON 한 줄씩)")
+    changes.add_argument('history')
+    changes.add_argument('--since', type=int, default=0, help="이 크롤링 뒤의 변경만 (기본: 전부)")
+    changes.add_argument('--until', type=int, help="이 크롤링까지 (기본: 앞선 크롤링이 모두 끝난 마지막 크롤링)")
+    changes.add_argument('-o', '--output', help="JSONL 파일 (기본: 표준 출력)")
+
+    as_of = commands.add_parser('as-of', help="특정 크롤링 시점의 전체 목록")
+    as_of.add_argument('history')
+    as_of.add_argument('--crawl', type=int, help="크롤링 번호 (기본: 마지막으로 끝난 크롤링)")
+    as_of.add_argument('-o', '--output', nargs='+', required=True,
+                       help="출력 파일 (.csv / .jsonl / .parquet / .idx, 여러 개 가능)")
+    as_of.add_argument('--missing', help="CSV에서 값이 없는 목록 필드 표기 (예: 정보 없음)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    history = RecordHistory(args.history)
+    try:
+        if args.command == 'crawls':
+            for crawl, kind, worker, started, finished, complete, counts in history.crawls():
+                state = ('완전' if complete else '불완전') if finished else '진행 중'
+                print(f"{crawl:>5}  {kind:<8}{started[:19]}  {state:<6}"
+                      f"추가 {counts.get(INSERT, 0)}, 수정 {counts.get(UPDATE, 0)}, 삭제 {counts.get(DELETE, 0)}"
+                      + (f"  (워커 {worker})" if worker else ""))
+
+        elif args.command == 'changes':
+            out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+            count = 0
+            for change in history.changes(args.since, args.until):
+                out.write(json.dumps(change, ensure_ascii=False) + '\n')
+                count += 1
+            if args.output:
+                out.close()
+                print(f"✓ 변경 {count}개 → '{args.output}'")
+
+        else:
+            from sinks import create_sink
+
+            crawl = args.crawl or history.latest()
+            sink = create_sink(args.output, FIELDS, missing=args.missing)
+            count = 0
+            for record in history.as_of(crawl):
+                sink.write(record)
+                count += 1
+            sink.close()
+            print(f"✓ 크롤링 {crawl} 시점 {count}개 → {', '.join(args.output)}")
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# 히스토그램 구간 상한 (초)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """구간별 개수로 지연 시간 분포를 기록 (마지막 칸은 +Inf)"""
+
+    __slots__ = ('counts', 'sum', 'count', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """구간 안은 고르게 분포한다고 보고 추정한 분위수 (관측한 최댓값을 넘지 않음)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = min(BUCKETS[i] if i < len(BUCKETS) else self.max, self.max)
+                return lower + max(upper - lower, 0.0) * (rank - seen) / n
+            seen += n
+        return self.max
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape(value):
+    # Prometheus 텍스트 형식: 라벨 값의 \, ", 줄바꿈은 이스케이프해야 함
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+class Metrics:
+    """크롤링 측정값 모음 (히스토그램, 카운터, 게이지)
+
+    모든 값은 이름과 라벨(site, stage 등)로 구분하며, 여러 스레드에서 함께 기록할 수 있다.
+    render()는 Prometheus 텍스트 형식, summary()는 실행 후 요약 줄 목록을 만든다.
+    게이지 값으로 함수를 주면 읽을 때마다 불러서 현재 값(대기열 길이 등)을 얻는다.
+    """
+
+    def __init__(self, prefix='crawler'):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}  # (이름, 라벨) -> Histogram
+            self.counters = {}
+            self.gauges = {}
+            self.info = {}  # 실행 정보 (summary/render에 함께 표시)
+            self.settings = {}  # 실행 설정 값 (프로필, to_dict에만 포함)
+            self.started = time.monotonic()
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, _labels(labels))] = value
+
+    def error(self, stage, error, **labels):
+        """예외 종류별 오류 수"""
+        self.inc('errors_total', stage=stage, type=type(error).__name__, **labels)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def _snapshot(self):
+        with self.lock:
+            histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        values = {}
+        for key, value in gauges.items():
+            try:
+                values[key] = value() if callable(value) else value
+            except Exception:
+                continue
+        return histograms, counters, values
+
+    def render(self):
+        """Prometheus 텍스트 형식"""
+        histograms, counters, gauges = self._snapshot()
+        lines = []
+        p = self.prefix
+
+        if self.info:
+            lines.append(f"# TYPE {p}_run_info gauge")
+            lines.append(f"{p}_run_info{_format_labels(sorted(self.info.items()))} 1")
+        lines.append(f"# TYPE {p}_uptime_seconds gauge")
+        lines.append(f"{p}_uptime_seconds {time.monotonic() - self.started:.3f}")
+
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {p}_{name} histogram")
+            for (n, labels), (counts, total, count) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, c in zip(list(BUCKETS) + ['+Inf'], counts):
+                    cumulative += c
+                    lines.append(f"{p}_{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{p}_{name}_sum{_format_labels(labels)} {total:.6f}")
+                lines.append(f"{p}_{name}_count{_format_labels(labels)} {count}")
+
+        for kind, values in (('counter', counters), ('gauge', gauges)):
+            for name in sorted({name for name, _ in values}):
+                lines.append(f"# TYPE {p}_{name} {kind}")
+                for (n, labels), value in sorted(values.items()):
+                    if n == name:
+                        lines.append(f"{p}_{name}{_format_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def to_dict(self):
+        """요약을 JSON으로 내보낼 수 있는 dict로 (JSON 로그, 벤치마크 결과 저장용)"""
+        histograms, counters, gauges = self._snapshot()
+        with self.lock:
+            stages = [
+                {'name': name, 'labels': dict(labels), 'count': h.count, 'sum': round(h.sum, 6),
+                 'p50': round(h.quantile(0.5), 6), 'p95': round(h.quantile(0.95), 6), 'max': round(h.max, 6)}
+                for (name, labels), h in sorted(self.histograms.items())
+            ]
+        return {
+            'info': dict(self.info),
+            'settings': dict(self.settings),
+            'elapsed': round(time.monotonic() - self.started, 3),
+            'stages': stages,
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                         for (name, labels), value in sorted(counters.items())],
+            'gauges': [{'name': name, 'labels': dict(labels), 'value': value}
+                       for (name, labels), value in sorted(gauges.items())],
+        }
+
+    def summary(self):
+        """실행 후 요약 (단계별 지연 시간, 처리량, 오류)"""
+        elapsed = time.monotonic() - self.started
+        lines = [f"[측정 결과] 실행 시간 {elapsed:.1f}초"]
+        if self.info:
+            lines.append("  " + ", ".join(f"{k}={v}" for k, v in sorted(self.info.items())))
+
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        if histograms:
+            lines.append(f"  {'단계':<16}{'구분':<30}{'횟수':>7}{'평균ms':>9}{'p50ms':>9}{'p95ms':>9}{'합계s':>9}")
+            for (name, labels), h in histograms:
+                label = ','.join(v for _, v in labels) or '-'
+                average = h.sum / h.count if h.count else 0
+                lines.append(
+                    f"  {name.replace('_seconds', ''):<16}{label[:29]:<30}{h.count:>7}"
+                    f"{average * 1000:>9.1f}{h.quantile(0.5) * 1000:>9.1f}{h.quantile(0.95) * 1000:>9.1f}{h.sum:>9.2f}"
+                )
+
+        for (name, labels), value in counters:
+            label = ', '.join(f"{k}={v}" for k, v in labels) or '-'
+            rate = f" ({value / elapsed:.1f}/초)" if name != 'errors_total' and elapsed > 0 else ''
+            lines.append(f"  {name}: {label} → {value}{rate}")
+        return lines
+
+    def serve(self, port, host='127.0.0.1'):
+        """/metrics로 render() 결과를 내보내는 HTTP 서버를 백그라운드에서 시작"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        return server
+
+
+# 프로세스 전체에서 함께 쓰는 기본 측정값 모음
+METRICS = Metrics()
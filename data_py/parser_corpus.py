@@ -0,0 +1,352 @@
+"""파서 스냅숏 회귀 검사 + 처리량 측정 (고정 코퍼스)
+
+corpus/<사이트>/ 아래에 저장해 둔 목록·상세 페이지 HTML과 golden.jsonl(페이지마다 파일,
+종류, URL, 목록의 질병명, 기대 추출 결과)을 두고, 파서를 바꿀 때마다 다시 파싱해서
+필드 단위로 비교한다. 파서 백엔드(현재 lxml, 변경 전 bs4)마다 별도 프로세스에서
+처리량(pages/sec)과 파이썬 힙 최대를 재고, 필드별로 값이 채워진 페이지 수가 기대보다
+줄었으면 따로 알린다. 파싱을 빠르게 바꾸면서 필드가 조용히 빠지는 것을 막기 위한 것으로,
+차이가 하나라도 있으면 종료 코드 1로 끝난다. 변경 전 bs4 파서도 같은 기대 결과와 비교해서
+종료 코드에 넣고, 변경 전 파서가 원래 놓치던 것은 KNOWN_LEGACY_DIFFS에 이유와 함께 적어 둔다.
+
+코퍼스 페이지는 선택자마다 대체 경로(목록 없는 섹션, tooltipRow 없는 진료과, 정의 섹션으로
+대신하는 증상 등)를 한 페이지씩 담고 있다. 이 페이지들의 기대 결과는 HTML을 직접 읽고
+변경 전 파서의 규칙(get_text(strip=True)처럼 텍스트 조각의 앞뒤 공백만 없애고 이어 붙임)대로
+적은 것으로, "checked": "hand"가 붙어 있어 update가 덮어쓰지 않는다. 실제 크롤링 캐시에서
+페이지를 더 고정하거나, 파서 동작을 일부러 바꾼 뒤 기대 결과를 다시 만들 때는
+freeze / add / update를 쓴다.
+
+    python parser_corpus.py check
+    python parser_corpus.py check --site snuh --backend lxml --rounds 20
+    python parser_corpus.py freeze --site amc --cache cache/amc --limit 50
+    python parser_corpus.py add --site snuh saved.html --url "https://www.snuh.org/...nView.do?medid=..."
+    python parser_corpus.py update --site amc
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from records import FIELDS, DiseaseRecord, flatten, is_missing
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+GOLDEN_FILE = 'golden.jsonl'
+
+# 파서 백엔드: lxml은 현재 사이트 어댑터, bs4는 bench_parse의 변경 전 파서 (상세 페이지만)
+BACKENDS = ('lxml', 'bs4')
+# 변경 전 bs4 파서가 원래 놓치는 것: (사이트, 파일, 필드) → 이유. 출력만 하고 종료 코드에는 넣지 않음
+KNOWN_LEGACY_DIFFS = {
+    ('amc', 'detail_nested_markup.html', 'symptoms'):
+        "soup.find('dt', string='증상')은 앞뒤 공백이 섞인 dt 라벨을 찾지 못함",
+}
+ROUNDS = 10
+
+
+def site_adapter(site):
+    if site == 'amc':
+        import asan
+        return asan.AmcSite()
+    import uni
+    return uni.SnuhSite()
+
+
+def load_backend(site, backend):
+    """(상세 파서, 결과의 빈 목록 표기) — 표기가 None이 아니면 결과가 예전 문자열 형식"""
+    if backend == 'lxml':
+        return site_adapter(site).parse_detail, None
+    from bench_parse import SITES  # bs4는 비교할 때만 필요
+    _, legacy, missing = SITES[site]
+    return legacy, missing
+
+
+def available_backends():
+    try:
+        import bs4  # noqa: F401
+    except ImportError:
+        return ('lxml',)
+    return BACKENDS
+
+
+# ---------------------------------------------------------------------------
+# 코퍼스 읽기·쓰기
+
+def corpus_sites(corpus):
+    return sorted(name for name in os.listdir(corpus)
+                  if os.path.exists(os.path.join(corpus, name, GOLDEN_FILE)))
+
+
+def load_entries(corpus, site):
+    path = os.path.join(corpus, site, GOLDEN_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_entries(corpus, site, entries):
+    os.makedirs(os.path.join(corpus, site), exist_ok=True)
+    path = os.path.join(corpus, site, GOLDEN_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        for entry in sorted(entries, key=lambda e: (e['kind'], e['file'])):
+            f.write(json.dumps(entry, ensure_ascii=False, sort_keys=True) + '\n')
+    os.replace(path + '.tmp', path)
+
+
+def read_page(corpus, site, entry):
+    with open(os.path.join(corpus, site, entry['file']), encoding='utf-8') as f:
+        return f.read()
+
+
+def page_kind(url):
+    return 'list' if 'List.do' in url else 'detail'
+
+
+def extract(site, entry, html):
+    """현재 파서로 뽑은 기대 결과 (JSON으로 저장할 수 있는 모양)"""
+    from discovery import read_last_page
+    from extract import parse_html
+
+    adapter = site_adapter(site)
+    if entry['kind'] == 'list':
+        root = parse_html(html)
+        return {'last_page': read_last_page(root), 'diseases': adapter.parse_list(root)}
+    return as_json(adapter.parse_detail(html, entry['url'], entry['disease_name']))
+
+
+def as_json(record):
+    # tuple → list (golden.jsonl에서 읽은 값과 바로 비교)
+    return {key: list(value) if isinstance(value, tuple) else value for key, value in dict(record).items()}
+
+
+# ---------------------------------------------------------------------------
+# 비교
+
+def record_diffs(expected, actual, missing=None):
+    """[(필드, 기대값, 실제값)] — missing이 있으면 기대값을 예전 문자열 형식으로 바꿔 비교"""
+    if missing is not None or not isinstance(actual, DiseaseRecord):
+        expected = flatten(DiseaseRecord.from_dict(expected), missing)
+        actual = dict(actual)
+    else:
+        actual = as_json(actual)
+    return [(field, expected.get(field), actual.get(field))
+            for field in FIELDS if expected.get(field) != actual.get(field)]
+
+
+def coverage(records):
+    """필드별로 값이 채워진 레코드 수"""
+    return {field: sum(not is_missing(record.get(field)) for record in records) for field in FIELDS}
+
+
+def check_lists(site, entries, corpus):
+    """목록 페이지: 질병 목록과 페이저 마지막 번호 비교. 차이 수 반환"""
+    diffs = 0
+    for entry in entries:
+        actual = extract(site, entry, read_page(corpus, site, entry))
+        for key in ('last_page', 'diseases'):
+            if actual[key] != entry['expected'][key]:
+                diffs += 1
+                print(f"  [차이] {entry['file']} {key}: {entry['expected'][key]!r} → {actual[key]!r}")
+    return diffs
+
+
+def measure(site, backend, corpus, rounds):
+    """(별도 프로세스) 상세 페이지를 rounds번 파싱: 처리량, 파이썬 힙 최대, 결과 목록
+
+    파이썬 힙 최대는 tracemalloc으로 한 번 더 파싱해서 잰다 (tracemalloc은 느리므로
+    처리량 측정과 따로). 코퍼스가 작아서 프로세스 최대 RSS는 import 직후 값에서 움직이지
+    않으므로 재지 않는다 (큰 목록의 메모리는 bench_crawl.py --max-rss로 잰다).
+    """
+    parse, missing = load_backend(site, backend)
+    entries = [entry for entry in load_entries(corpus, site) if entry['kind'] == 'detail']
+    pages = [(entry['url'], entry['disease_name'], read_page(corpus, site, entry)) for entry in entries]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = [parse(html, url, name) for url, name, html in pages]
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for url, name, html in pages:
+        parse(html, url, name)
+    heap = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'rate': len(pages) * rounds / elapsed if elapsed else 0.0,
+        'heap_kb': heap / 1024,
+        'results': results,
+        'missing': missing,
+    }
+
+
+def check_site(site, corpus, backends, rounds):
+    """사이트 하나 검사: 목록·상세 필드 차이와 백엔드별 처리량 출력. 차이 수 반환"""
+    entries = load_entries(corpus, site)
+    lists = [entry for entry in entries if entry['kind'] == 'list']
+    details = [entry for entry in entries if entry['kind'] == 'detail']
+    print(f"[{site}] 목록 {len(lists)}개, 상세 {len(details)}개 ({os.path.join(corpus, site)})")
+
+    diffs = check_lists(site, lists, corpus)
+    print(f"- 목록 파싱: 필드 차이 {diffs}개")
+
+    expected_coverage = coverage([entry['expected'] for entry in details])
+    context = multiprocessing.get_context('spawn')
+    for backend in backends:
+        # 백엔드마다 새 프로세스 (힙 측정과 import가 앞 백엔드의 영향을 받지 않도록)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(measure, site, backend, corpus, rounds).result()
+
+        backend_diffs = 0
+        for entry, actual in zip(details, result['results']):
+            for field, old, new in record_diffs(entry['expected'], actual, result['missing']):
+                reason = KNOWN_LEGACY_DIFFS.get((site, entry['file'], field)) if backend == 'bs4' else None
+                if reason:
+                    print(f"  [{backend} 알려진 차이] {entry['file']} {field}: {old!r} → {new!r} ({reason})")
+                    continue
+                backend_diffs += 1
+                print(f"  [{backend} 차이] {entry['file']} {field}: {old!r} → {new!r}")
+
+        print(f"- {backend:<4}: {result['rate']:8.1f} pages/sec, "
+              f"파이썬 힙 최대 {result['heap_kb']:,.0f}KB, 필드 차이 {backend_diffs}개")
+
+        actual_coverage = coverage([DiseaseRecord.from_dict(record) for record in result['results']])
+        for field in FIELDS:
+            if actual_coverage[field] < expected_coverage[field]:
+                print(f"  [{backend} 커버리지 감소] {field}: {actual_coverage[field]}/{len(details)}개 "
+                      f"(기대 {expected_coverage[field]}개)")
+        diffs += backend_diffs
+    return diffs
+
+
+# ---------------------------------------------------------------------------
+# 코퍼스 만들기
+
+def add_page(corpus, site, entries, html, url, disease_name, file=None):
+    """페이지 하나를 코퍼스에 저장하고 현재 파서 결과를 기대값으로 기록"""
+    file = file or f"{page_kind(url)}_{hashlib.sha1(url.encode()).hexdigest()[:12]}.html"
+    entry = {'file': file, 'kind': page_kind(url), 'url': url, 'disease_name': disease_name}
+    path = os.path.join(corpus, site, file)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    entry['expected'] = extract(site, entry, html)
+    entries[:] = [e for e in entries if e['file'] != file] + [entry]
+    return entry
+
+
+def freeze(corpus, site, cache_dir, limit):
+    """HtmlCache(지난 크롤링)에서 목록 페이지 전부와 상세 페이지 limit개를 골라 코퍼스에 추가"""
+    from cache import HtmlCache
+    from extract import parse_html
+
+    cache = HtmlCache(cache_dir)
+    adapter = site_adapter(site)
+    urls = sorted(cache.urls())
+    list_urls = [url for url in urls if page_kind(url) == 'list']
+    detail_urls = [url for url in urls if page_kind(url) == 'detail']
+
+    # 상세 파서가 받는 질병명은 목록 페이지에 나온 이름
+    names = {}
+    for url in list_urls:
+        html = cache.get(url)
+        if html is not None:
+            for disease in adapter.parse_list(parse_html(html)):
+                names.setdefault(disease['url'], disease['disease_name'])
+
+    # 상세 페이지는 전체에서 고르게 골라 다양한 모양이 들어가도록
+    step = max(1, len(detail_urls) // limit) if limit else 1
+    chosen = list_urls + detail_urls[::step][:limit or None]
+
+    entries = load_entries(corpus, site)
+    added = 0
+    for url in chosen:
+        html = cache.get(url)
+        if html is not None:
+            add_page(corpus, site, entries, html, url, names.get(url, url))
+            added += 1
+    cache.close()
+    save_entries(corpus, site, entries)
+    print(f"[{site}] {added}개 페이지를 고정했습니다 ({os.path.join(corpus, site)})")
+
+
+def update(corpus, site):
+    """파서 동작을 일부러 바꾼 뒤 기대 결과를 현재 파서로 다시 생성 (바뀐 필드 출력)
+
+    직접 확인한 기대 결과("checked")는 덮어쓰지 않고 차이만 출력한다 — 바꿔야 하면
+    golden.jsonl을 손으로 고친다.
+    """
+    entries = load_entries(corpus, site)
+    changed = kept = 0
+    for entry in entries:
+        expected = extract(site, entry, read_page(corpus, site, entry))
+        if expected != entry['expected']:
+            tag = '유지' if entry.get('checked') else '갱신'
+            keys = expected if entry['kind'] == 'list' else FIELDS
+            for key in keys:
+                if expected.get(key) != entry['expected'].get(key):
+                    print(f"  [{tag}] {entry['file']} {key}: {entry['expected'].get(key)!r} → {expected.get(key)!r}")
+            if entry.get('checked'):
+                kept += 1
+                continue
+            changed += 1
+            entry['expected'] = expected
+    save_entries(corpus, site, entries)
+    print(f"[{site}] 기대 결과 {changed}개 갱신, 직접 확인한 {kept}개는 유지 (전체 {len(entries)}개)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="파서 스냅숏 회귀 검사와 처리량 측정")
+    parser.add_argument('--corpus', default=CORPUS_DIR, help="코퍼스 디렉터리")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    check = commands.add_parser('check', help="기대 결과와 필드 단위 비교 + 백엔드별 처리량")
+    check.add_argument('--site', action='append', choices=('amc', 'snuh'),
+                       help="검사할 사이트 (여러 번 지정 가능, 기본: 코퍼스 전체)")
+    check.add_argument('--backend', action='append', choices=BACKENDS,
+                       help="측정할 파서 백엔드 (기본: 설치된 것 전부)")
+    check.add_argument('--rounds', type=int, default=ROUNDS, help="처리량 측정 반복 횟수")
+
+    frozen = commands.add_parser('freeze', help="HtmlCache의 페이지를 코퍼스에 고정")
+    frozen.add_argument('--site', choices=('amc', 'snuh'), required=True)
+    frozen.add_argument('--cache', required=True, help="HtmlCache 디렉터리 (예: cache/amc)")
+    frozen.add_argument('--limit', type=int, default=50, help="고정할 상세 페이지 수 (0이면 전부)")
+
+    add = commands.add_parser('add', help="저장된 HTML 파일 하나를 코퍼스에 추가")
+    add.add_argument('--site', choices=('amc', 'snuh'), required=True)
+    add.add_argument('path', help="HTML 파일")
+    add.add_argument('--url', required=True, help="페이지 URL (목록 페이지는 *List.do)")
+    add.add_argument('--name', help="목록에 나온 질병명 (기본: URL)")
+    add.add_argument('--file', help="코퍼스 안의 파일 이름 (기본: URL 해시)")
+
+    updated = commands.add_parser('update', help="현재 파서로 기대 결과 다시 생성")
+    updated.add_argument('--site', choices=('amc', 'snuh'), required=True)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == 'freeze':
+        freeze(args.corpus, args.site, args.cache, args.limit)
+    elif args.command == 'add':
+        entries = load_entries(args.corpus, args.site)
+        with open(args.path, encoding='utf-8') as f:
+            entry = add_page(args.corpus, args.site, entries, f.read(), args.url,
+                             args.name or args.url, args.file)
+        save_entries(args.corpus, args.site, entries)
+        print(f"[{args.site}] {entry['file']} 추가 ({entry['kind']})")
+    elif args.command == 'update':
+        update(args.corpus, args.site)
+    else:
+        backends = args.backend or available_backends()
+        diffs = sum(check_site(site, args.corpus, backends, args.rounds)
+                    for site in args.site or corpus_sites(args.corpus))
+        print(f"\n필드 차이 합계: {diffs}개")
+        sys.exit(1 if diffs else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import METRICS
+from scheduler import map_ordered
+
+
+def fetch_detail_page(fetcher, url, ready, state=None):
+    """상세 페이지 요청 → (page, 지난번 결과)
+
+    state(CrawlState)가 있으면 조건부 요청을 보내고, 페이지가 바뀌지 않았으면
+    지난번 결과를 함께 돌려준다 (이 경우 다시 파싱할 필요 없음).
+    """
+    validators = state.validators(url) if state else None
+    page = fetcher.fetch_page(url, ready, validators)
+    previous = state.previous_record(url, page) if state else None
+    return page, previous
+
+
+def parse_pool(max_workers=None):
+    """파싱 프로세스 풀 (forkserver, 없는 플랫폼은 spawn)
+
+    기본 fork로 만든 풀은 첫 submit 때 프로세스를 만드는데, 그때 목록 탐색 스레드가 lxml로
+    파싱 중이면 libxml2 잠금이 잡힌 채로 복제되어 자식이 멈춘다 (부모는 결과를 끝없이 기다림).
+    스레드 상태를 물려받지 않는 방식으로 만든다.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+
+
+def _parse(parse, html, url, disease_name):
+    # 파싱 프로세스에서 실행 → (결과, 오류, 걸린 시간). 예외는 객체 대신 (종류, 메시지)로 돌려준다
+    start = time.perf_counter()
+    try:
+        return parse(html, url, disease_name), None, time.perf_counter() - start
+    except Exception as e:
+        return None, (type(e).__name__, str(e)), time.perf_counter() - start
+
+
+def _is_ready(entry):
+    future = entry[3]
+    return future is None or future.done()
+
+
+def _finish(entry, state, label, confirm_writes=False):
+    disease, page, previous, future = entry
+    if page is None:
+        return disease, None, False
+    if previous is not None:
+        return disease, previous, False
+
+    result, error, seconds = future.result()
+    METRICS.observe('parse_seconds', seconds, site=label)
+    if error is not None:
+        print(f"  ✗ 오류: {error[1]}")
+        METRICS.inc('errors_total', site=label, stage='parse', type=error[0])
+        return disease, None, False
+    if state is not None:
+        if confirm_writes:
+            state.stage(disease['url'], page, result)
+        else:
+            state.update(disease['url'], page, result)
+    return disease, result, True
+
+
+def detail_pipeline(disease_list, fetcher, parse, ready, state=None,
+                    fetch_workers=4, parse_workers=None, max_pending=32, executor=None, label=None,
+                    confirm_writes=False):
+    """상세 페이지 파이프라인: 스레드에서 가져오고, 프로세스 풀에서 파싱
+
+    parse(html, url, disease_name)는 모듈 최상위 함수여야 한다 (프로세스 간 전달).
+    가져온 HTML은 최대 max_pending개까지 파싱 대기열에 쌓이고, 대기열이 차면
+    맨 앞 페이지의 파싱이 끝날 때까지 더 가져오지 않는다 (backpressure).
+    결과는 목록 순서대로 (질병, 결과 또는 None, 새로 파싱했는지 여부)로 나온다.
+    executor를 주면 새 프로세스 풀 대신 그 풀을 쓴다 (여러 사이트가 함께 쓰는 경우).
+    label은 측정값(파싱 시간, 오류, 대기열 길이)에 붙는 사이트 이름이다.
+    confirm_writes면 새로 파싱한 결과의 상태를 바로 기록하지 않고 state.stage()로 두므로,
+    출력이 저장을 확인한 뒤 state.confirm()을 불러야 한다 (비동기 출력, DbSink).
+    """
+    if executor is None:
+        with parse_pool(parse_workers) as executor:
+            yield from detail_pipeline(disease_list, fetcher, parse, ready, state,
+                                       fetch_workers, parse_workers, max_pending, executor, label,
+                                       confirm_writes)
+        return
+
+    def fetch(disease):
+        try:
+            return fetch_detail_page(fetcher, disease['url'], ready, state)
+        except Exception as e:
+            print(f"  ✗ 오류: {e}")
+            METRICS.error('fetch', e, site=label)
+            return None, None
+
+    pending = deque()  # (질병, page, 지난번 결과, 파싱 future)
+    for disease, (page, previous) in map_ordered(fetch, disease_list, workers=fetch_workers):
+        future = None
+        if page is not None and previous is None:
+            future = executor.submit(_parse, parse, page.html, disease['url'], disease['disease_name'])
+        pending.append((disease, page, previous, future))
+        METRICS.set('parse_queue_depth', len(pending), site=label)
+
+        while pending and (len(pending) >= max_pending or _is_ready(pending[0])):
+            yield _finish(pending.popleft(), state, label, confirm_writes)
+
+    while pending:
+        yield _finish(pending.popleft(), state, label, confirm_writes)
+    METRICS.set('parse_queue_depth', 0, site=label)
@@ -0,0 +1,310 @@
+"""크롤링 프로필: 성능 설정 묶음을 이름으로 골라 실행
+
+동시 요청 수, 요청 속도, 배치 크기, 페처, 출력 같은 설정은 각 모듈 상수(crawler.FLUSH_EVERY,
+uni.DB_CONFIG 등)와 사이트 어댑터 속성(workers, rate_limit, max_pages)에 흩어져 있다.
+프로필은 이 값들을 설정 이름 하나로 묶어 한 번에 바꾼다. 내장 프로필(PROFILES) 외에
+설정 파일(TOML 또는 JSON)에서 프로필을 새로 만들거나 내장 프로필을 이어받아 고칠 수 있다.
+
+    # crawler.toml
+    profile = "polite"                 # --profile이 없을 때 쓸 프로필
+
+    [settings]                         # 모든 프로필에 공통 (프로필 값이 우선)
+    db = { host = "localhost", database = "testdb", user = "test01", password = "..." }
+
+    [profiles.mirror-lab]
+    extends = "fast-local-mirror"
+    mirror = "http://10.0.0.5:8765"
+    workers = 32
+    per_site = { snuh = { rate_limit = 20 } }
+
+적용 순서는 [settings] → 프로필(extends 순서대로) → 명령줄 값(--set, --metrics-port 등)이다.
+실행할 때는 적용한 뒤의 실제 값 전체를 settings()로 모아 측정값(METRICS.info의 profile,
+profile_digest와 to_dict()의 settings)에 남기므로, 처리량 결과를 같은 설정으로 다시 재거나
+설정이 다른 실행끼리 구분할 수 있다.
+
+    python crawler.py --profile polite
+    python crawler.py --config crawler.toml --profile mirror-lab --set flush_every=500
+    python profiles.py                    # 프로필 목록
+    python profiles.py fast-local-mirror  # 프로필을 적용했을 때의 설정 값
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+
+
+# 기본 설정 파일 (있으면 --config 없이도 읽음)
+CONFIG_FILE = 'crawler.toml'
+
+# 설정 이름 -> (모듈, 상수)
+MODULE_SETTINGS = {
+    'fetch_backend': ('crawler', 'FETCH_BACKEND'),
+    'mirrors': ('crawler', 'MIRRORS'),
+    'browsers': ('crawler', 'BROWSERS'),
+    'chrome_args': ('fetcher', 'CHROME_ARGS'),
+    'retries': ('crawler', 'RETRIES'),
+    'adaptive_rate': ('crawler', 'ADAPTIVE_RATE'),
+    'failed_retry_rounds': ('crawler', 'FAILED_RETRY_ROUNDS'),
+    'list_retries': ('crawler', 'LIST_RETRIES'),
+    'list_retry_delay': ('crawler', 'LIST_RETRY_DELAY'),
+    'parse_workers': ('crawler', 'PARSE_WORKERS'),
+    'parse_queue': ('crawler', 'PARSE_QUEUE'),
+    'flush_every': ('crawler', 'FLUSH_EVERY'),
+    'incremental': ('crawler', 'INCREMENTAL'),
+    'cache_max_mb': ('crawler', 'CACHE_MAX_MB'),
+    'cache_max_age_days': ('crawler', 'CACHE_MAX_AGE_DAYS'),
+    'history': ('crawler', 'HISTORY'),
+    'seen_urls': ('crawler', 'SEEN_URLS'),
+    'seen_capacity': ('crawler', 'SEEN_CAPACITY'),
+    'seen_error_rate': ('crawler', 'SEEN_ERROR_RATE'),
+    'metrics_port': ('crawler', 'METRICS_PORT'),
+    'log_json': ('crawler', 'LOG_JSON'),
+    'claim_batch': ('crawler', 'CLAIM_BATCH'),
+    'queue_poll_seconds': ('crawler', 'QUEUE_POLL_SECONDS'),
+    'worker_nodes': ('crawler', 'WORKER_NODES'),
+    'output_formats': ('asan', 'OUTPUT_FORMATS'),
+    'db': ('uni', 'DB_CONFIG'),
+    'db_pool_size': ('uni', 'DB_POOL_SIZE'),
+    'db_queue': ('uni', 'DB_QUEUE'),
+    'db_flush_seconds': ('uni', 'DB_FLUSH_SECONDS'),
+    'db_retries': ('uni', 'DB_RETRIES'),
+}
+
+# 사이트 어댑터 속성 (per_site = {사이트: {속성: 값}}으로 사이트마다 다르게 줄 수 있음)
+SITE_SETTINGS = ('workers', 'rate_limit', 'max_pages')
+
+# crawler.run() 인자 (명령줄 --reparse, --output이 없을 때 기본값)
+RUN_SETTINGS = ('reparse', 'output')
+
+# 그 밖의 설정: mirror(선택한 사이트의 호스트를 모두 이 주소로), per_site, extends(이어받을 프로필)
+OTHER_SETTINGS = ('mirror', 'per_site', 'extends')
+
+# 기록할 때 값을 가리는 DB 설정 키
+SECRET_KEYS = ('password', 'dsn')
+
+# 내장 프로필 (빈 값은 모듈 상수 그대로)
+PROFILES = {
+    'default': {},
+    # 실제 병원 사이트: 적은 동시 요청, 호스트당 초당 0.5회, 일시 오류는 넉넉히 재시도
+    'polite': {
+        'workers': 2,
+        'rate_limit': 0.5,
+        'fetch_backend': 'auto',
+        'browsers': 1,
+        'retries': 6,
+        'adaptive_rate': True,
+        'failed_retry_rounds': 2,
+        'list_retry_delay': 10.0,
+    },
+    # 로컬 미러(bench_crawl.py의 가짜 사이트, 기록된 페이지 서버): 브라우저 없이 속도 제한 없이,
+    # 배치를 크게 잡아 디스크·DB 왕복을 줄임
+    'fast-local-mirror': {
+        'mirror': 'http://127.0.0.1:8765',
+        'fetch_backend': 'http',
+        'workers': 16,
+        'rate_limit': 0,
+        'adaptive_rate': False,
+        'retries': 2,
+        'list_retry_delay': 0.5,
+        'max_pages': 100_000,
+        'parse_queue': 128,
+        'flush_every': 500,
+        'db_queue': 10_000,
+        'db_flush_seconds': 1.0,
+    },
+    # 네트워크 없이 캐시된 HTML만 다시 파싱: 파싱 대기열과 출력 배치를 크게
+    'reparse-only': {
+        'reparse': True,
+        'parse_queue': 128,
+        'flush_every': 500,
+        'db_queue': 10_000,
+    },
+}
+
+
+class ProfileError(ValueError):
+    """알 수 없는 프로필이나 설정, 읽을 수 없는 설정 파일"""
+
+
+def _check_keys(settings, where):
+    known = set(MODULE_SETTINGS) | set(SITE_SETTINGS) | set(RUN_SETTINGS) | set(OTHER_SETTINGS)
+    unknown = sorted(set(settings) - known)
+    if unknown:
+        raise ProfileError(f"{where}: 알 수 없는 설정 {', '.join(unknown)} (가능: {', '.join(sorted(known))})")
+    for site, values in settings.get('per_site', {}).items():
+        unknown = sorted(set(values) - set(SITE_SETTINGS))
+        if unknown:
+            raise ProfileError(f"{where}: per_site.{site}에는 {', '.join(SITE_SETTINGS)}만 줄 수 있습니다 "
+                               f"({', '.join(unknown)})")
+
+
+def load_config(path=None):
+    """설정 파일 읽기 (.toml 또는 .json). path가 없으면 CONFIG_FILE이 있을 때만 읽음"""
+    if path is None:
+        if not os.path.exists(CONFIG_FILE):
+            return {}
+        path = CONFIG_FILE
+    if path.endswith('.json'):
+        load = json.load  # 바이트로 열어도 UTF-8로 읽음
+    else:
+        try:
+            import tomllib  # Python 3.11+
+        except ImportError:
+            raise ProfileError(f"{path}: TOML 설정 파일은 Python 3.11 이상이 필요합니다 (.json을 쓰세요)")
+        load = tomllib.load
+    try:
+        with open(path, 'rb') as f:
+            config = load(f)
+    except (OSError, ValueError) as e:
+        raise ProfileError(f"설정 파일을 읽을 수 없습니다: {path} ({e})")
+
+    unknown = sorted(set(config) - {'profile', 'settings', 'profiles'})
+    if unknown:
+        raise ProfileError(f"{path}: 알 수 없는 항목 {', '.join(unknown)} (가능: profile, settings, profiles)")
+    _check_keys(config.get('settings', {}), f"{path} [settings]")
+    for name, settings in config.get('profiles', {}).items():
+        _check_keys(settings, f"{path} [profiles.{name}]")
+    config['path'] = path
+    return config
+
+
+def all_profiles(config):
+    """내장 프로필 + 설정 파일 프로필 (내장과 같은 이름은 extends가 없으면 내장 값 위에 덮어씀)"""
+    profiles = dict(PROFILES)
+    for name, settings in config.get('profiles', {}).items():
+        if name in PROFILES and 'extends' not in settings:
+            settings = _merge(PROFILES[name], settings)
+        profiles[name] = settings
+    return profiles
+
+
+def _merge(base, settings):
+    merged = {**base, **settings}
+    if 'per_site' in base and 'per_site' in settings:
+        per_site = {site: dict(values) for site, values in base['per_site'].items()}
+        for site, values in settings['per_site'].items():
+            per_site.setdefault(site, {}).update(values)
+        merged['per_site'] = per_site
+    return merged
+
+
+def _resolve(name, profiles, chain=()):
+    # extends를 따라가며 이어받은 설정을 먼저 합침
+    if name in chain:
+        raise ProfileError(f"프로필 extends가 순환합니다: {' -> '.join(chain + (name,))}")
+    if name not in profiles:
+        raise ProfileError(f"알 수 없는 프로필: {name} (가능: {', '.join(profiles)})")
+    settings = dict(profiles[name])
+    parent = settings.pop('extends', None)
+    if parent is None:
+        return settings
+    return _merge(_resolve(parent, profiles, chain + (name,)), settings)
+
+
+def parse_override(text):
+    """'이름=값' → (이름, 값). 값은 JSON으로 읽고 (숫자, true, null, 목록 등) 안 되면 문자열"""
+    if '=' not in text:
+        raise ProfileError(f"--set은 이름=값 형식이어야 합니다: {text}")
+    key, value = text.split('=', 1)
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return key.strip(), value
+
+
+def load_profile(name=None, config_path=None, overrides=None):
+    """설정 파일과 명령줄 값을 합친 프로필 (name이 없으면 설정 파일의 profile, 그것도 없으면 default)"""
+    config = load_config(config_path)
+    name = name or config.get('profile') or 'default'
+    settings = _merge(config.get('settings', {}), _resolve(name, all_profiles(config)))
+    overrides = dict(overrides or {})
+    _check_keys(overrides, "명령줄")
+    return Profile(name, _merge(settings, overrides), source=config.get('path'))
+
+
+def _public(key, value):
+    # 측정값·벤치마크 결과에 남길 값 (DB 비밀번호는 가림)
+    if key == 'db' and isinstance(value, dict):
+        return {k: '***' if k in SECRET_KEYS else v for k, v in value.items()}
+    if isinstance(value, (tuple, list)):
+        return list(value)
+    return value
+
+
+class Profile:
+    """이름 붙은 설정 묶음
+
+    apply(sites)로 모듈 상수와 사이트 어댑터 속성에 반영하고, settings(sites)로 반영된
+    실제 값을 모은다 (프로필에 없는 설정은 모듈 상수·어댑터 기본값 그대로).
+    """
+
+    def __init__(self, name, values, source=None):
+        self.name = name
+        self.values = values  # 프로필이 정한 값만
+        self.source = source  # 설정 파일 경로 (내장 프로필만 쓰면 None)
+
+    def run_options(self):
+        """crawler.run() 인자 기본값 {'reparse', 'output'} 중 프로필이 정한 것"""
+        return {key: self.values[key] for key in RUN_SETTINGS if key in self.values}
+
+    def apply(self, sites):
+        """모듈 상수와 사이트 어댑터 속성에 반영"""
+        for key, (module, attr) in MODULE_SETTINGS.items():
+            if key in self.values:
+                value = self.values[key]
+                setattr(importlib.import_module(module), attr, tuple(value) if isinstance(value, list) else value)
+
+        if 'mirror' in self.values:
+            # 호스트별로 따로 준 mirrors가 우선
+            mirrors = {site.host: self.values['mirror'] for site in sites}
+            importlib.import_module('crawler').MIRRORS = {**mirrors, **self.values.get('mirrors', {})}
+
+        per_site = self.values.get('per_site', {})
+        for site in sites:
+            for key in SITE_SETTINGS:
+                if key in per_site.get(site.name, {}):
+                    setattr(site, key, per_site[site.name][key])
+                elif key in self.values:
+                    setattr(site, key, self.values[key])
+
+    def settings(self, sites=()):
+        """현재 적용된 실제 설정 값 전체 (모듈 상수 + 사이트별 속성, DB 비밀번호는 가림)"""
+        values = {}
+        for key, (module, attr) in MODULE_SETTINGS.items():
+            values[key] = _public(key, getattr(importlib.import_module(module), attr))
+        values['per_site'] = {site.name: {key: getattr(site, key) for key in SITE_SETTINGS} for site in sites}
+        return values
+
+    def digest(self, sites=()):
+        """실제 설정 값의 짧은 해시 (같은 값이면 같은 해시, 결과 비교용)"""
+        text = json.dumps(self.settings(sites), sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="크롤링 프로필 목록과 적용했을 때의 설정 값")
+    parser.add_argument('profile', nargs='?', help="설정 값을 볼 프로필 (없으면 목록)")
+    parser.add_argument('--config', help=f"설정 파일 (.toml / .json, 기본: 있으면 {CONFIG_FILE})")
+    parser.add_argument('--sites', nargs='*', default=['amc', 'snuh'], help="사이트별 설정을 볼 사이트")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    config = load_config(args.config)
+    if args.profile is None:
+        default = config.get('profile') or 'default'
+        for name, values in all_profiles(config).items():
+            source = config['path'] if name in config.get('profiles', {}) else "내장"
+            mark = " (기본)" if name == default else ""
+            print(f"{name}{mark} [{source}]: " + (', '.join(f"{k}={v}" for k, v in values.items()) or "모듈 기본값"))
+    else:
+        import crawler
+
+        profile = load_profile(args.profile, args.config)
+        sites = [crawler.load_site(name) for name in args.sites]
+        profile.apply(sites)
+        print(json.dumps({'profile': profile.name, 'digest': profile.digest(sites), **profile.run_options(),
+                          'settings': profile.settings(sites)}, ensure_ascii=False, indent=2))
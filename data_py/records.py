@@ -0,0 +1,142 @@
+"""질병 레코드 모델
+
+파서가 만드는 상세 결과는 DiseaseRecord 하나로 통일한다. 증상·진료과·동의어·관련질환은
+문자열로 이어 붙이지 않고 목록(tuple) 그대로 두고, 진료과 이름은 수천 행에 반복되므로
+intern해 같은 문자열 객체를 함께 쓴다. __slots__와 tuple(빈 목록은 모두 같은 ())이라
+dict·list보다 레코드당 메모리가 적다.
+
+Mapping이라 record['url'], record.get(...), {**record}처럼 dict 자리에 그대로 쓸 수 있다.
+CSV·DB처럼 문자열 열만 받는 출력은 flatten()으로 예전 형식(', '로 연결, 빈 목록은
+'정보 없음' 또는 None)으로 바꾸고, Parquet은 to_arrow()로 목록 열 그대로 기록한다.
+"""
+import sys
+from collections.abc import Mapping
+
+FIELDS = ('disease_name_kr', 'disease_name_eng', 'symptoms', 'department',
+          'synonyms', 'related_diseases', 'url')
+
+# 목록 필드 (문자열 출력에서는 SEPARATOR로 연결)
+LIST_FIELDS = ('symptoms', 'department', 'synonyms', 'related_diseases')
+SEPARATOR = ', '
+
+# 값이 없는 것으로 보는 값 (예전 형식: AMC는 '정보 없음', 영문명은 빈 문자열, SNUH는 None)
+MISSING = ('정보 없음', '', None)
+
+
+def _items(value):
+    # 목록 필드 값 → tuple (예전 형식의 연결된 문자열은 나눔)
+    if isinstance(value, tuple):
+        return value
+    if value in MISSING:
+        return ()
+    if isinstance(value, str):
+        return tuple(item.strip() for item in value.split(',') if item.strip())
+    return tuple(value)
+
+
+class DiseaseRecord(Mapping):
+    """질병 상세 결과 한 건 (목록 필드는 tuple, 진료과는 intern한 문자열)"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, disease_name_kr='', disease_name_eng='', symptoms=(), department=(),
+                 synonyms=(), related_diseases=(), url=None):
+        self.disease_name_kr = disease_name_kr
+        self.disease_name_eng = disease_name_eng
+        self.symptoms = _items(symptoms)
+        self.department = tuple(sys.intern(name) for name in _items(department))
+        self.synonyms = _items(synonyms)
+        self.related_diseases = _items(related_diseases)
+        self.url = url
+
+    @classmethod
+    def from_dict(cls, data, joined=LIST_FIELDS):
+        """dict(예전 형식의 연결된 문자열 포함) → DiseaseRecord. 모르는 키는 버림
+
+        joined는 예전 형식에서 여러 항목을 ', '로 이어 붙인 목록 필드다. 여기 없는 목록 필드의
+        문자열(SNUH 증상처럼 쉼표가 든 문단 하나)은 나누지 않고 항목 하나로 읽는다.
+        """
+        if isinstance(data, cls):
+            return data
+        values = {field: data[field] for field in FIELDS if field in data}
+        for field in LIST_FIELDS:
+            value = values.get(field)
+            if field not in joined and isinstance(value, str) and value not in MISSING:
+                values[field] = (value,)
+        return cls(**values)
+
+    # 프로세스 간 전달(파싱 프로세스 → 본 프로세스): 받는 쪽에서 진료과를 다시 intern
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, field) for field in FIELDS)
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        # Mapping.get은 __getitem__과 KeyError를 거치므로, 열 단위 변환에서 자주 쓰는 경로는 직접
+        return getattr(self, key) if key in FIELDS else default
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return f"DiseaseRecord({self.disease_name_kr!r}, url={self.url!r})"
+
+
+def is_missing(value):
+    """값이 없는지 (빈 목록, '정보 없음', 빈 문자열, None)"""
+    return value in MISSING or (isinstance(value, (list, tuple)) and not value)
+
+
+def flatten(record, missing=None):
+    """문자열 열만 받는 출력(CSV, DB)용 dict: 목록은 ', '로 연결하고 빈 목록은 missing"""
+    row = {}
+    for key, value in record.items():
+        if isinstance(value, (list, tuple)):
+            value = SEPARATOR.join(value) if value else missing
+        row[key] = value
+    return row
+
+
+def to_columns(records, columns):
+    """레코드 목록 → 열 이름별 값 목록 (열 단위 배치)"""
+    return {column: [record.get(column) for record in records] for column in columns}
+
+
+def arrow_schema(columns, records=()):
+    """열 타입: 목록 필드(또는 값이 목록인 열)는 list<string>, 정수 열은 int64, 나머지는 string"""
+    import pyarrow
+
+    fields = []
+    for column in columns:
+        sample = next((record.get(column) for record in records if record.get(column) is not None), None)
+        if column in LIST_FIELDS or isinstance(sample, (list, tuple)):
+            kind = pyarrow.list_(pyarrow.string())
+        elif isinstance(sample, int) and not isinstance(sample, bool):
+            kind = pyarrow.int64()
+        else:
+            kind = pyarrow.string()
+        fields.append((column, kind))
+    return pyarrow.schema(fields)
+
+
+def to_arrow(records, columns=FIELDS, schema=None):
+    """레코드 목록 → pyarrow.RecordBatch (목록 필드는 list 열 그대로)"""
+    import pyarrow
+
+    schema = schema or arrow_schema(columns, records)
+    data = to_columns(records, schema.names)
+    for field in schema:
+        # DiseaseRecord 값은 이미 맞는 타입이므로 그대로, 예전 형식 문자열 등만 바꿈
+        values = data[field.name]
+        if pyarrow.types.is_list(field.type):
+            data[field.name] = [value if value is None or type(value) in (tuple, list) else _items(value)
+                                for value in values]
+        elif pyarrow.types.is_string(field.type):
+            data[field.name] = [value if value is None or type(value) is str else str(value) for value in values]
+    return pyarrow.RecordBatch.from_pydict(data, schema=schema)
@@ -0,0 +1,23 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def map_ordered(func, items, workers=4, window=None):
+    """items 각각에 func를 스레드 풀에서 병렬 적용하고 입력 순서대로 (item, 결과) 반환
+
+    동시에 진행 중인 작업은 window개(기본 workers*2)로 제한되므로
+    items가 제너레이터여도 한꺼번에 읽어 들이지 않는다.
+    """
+    window = window or workers * 2
+    pending = deque()
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= window:
+                item, future = pending.popleft()
+                yield item, future.result()
+        
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
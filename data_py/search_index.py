@@ -0,0 +1,480 @@
+"""질병 검색 색인: 이름·영문명·동의어·증상 역색인과 관련질환 그래프
+
+크롤링 결과(AMC 파일, SNUH DB, --output으로 모은 파일)로 색인 파일 하나를 만들고,
+그 파일을 mmap으로 열어 검색한다. 한글은 글자 2-gram, 영문·숫자는 단어 단위로 색인하며
+관련질환(related_diseases)은 질병 사이의 인접 리스트로 저장한다.
+
+    python search_index.py build amc_diseases_20250101_120000.csv --snuh-db -o diseases.idx
+    python search_index.py search diseases.idx 두통 발열
+    python search_index.py related diseases.idx 편두통 --depth 2
+
+파일 형식 (정수는 little-endian, 각 구역은 8바이트 정렬):
+    MAGIC(8) | 헤더 길이(Q) | 헤더 JSON (구역별 위치와 길이) | 구역들
+    docs        레코드 JSON을 이어 붙인 것, doc_offsets(Q, 문서 수+1)로 나눔
+    terms       사전순 정렬한 색인어, term_offsets(Q)로 나눔
+    postings    색인어·필드별 문서 번호 목록(I, 문서 번호 순), post_offsets(Q, 색인어 수×필드 수+1)
+    names       정규화한 이름(사전순) → name_docs(I), 정확한 이름 찾기용
+    graph       문서별 관련 문서 번호(I), graph_offsets(Q)
+"""
+import argparse
+import heapq
+import itertools
+import json
+import mmap
+import os
+import re
+import sys
+import time
+import unicodedata
+from array import array
+from collections import defaultdict
+
+from records import MISSING, is_missing
+
+MAGIC = b'DISIDX01'
+
+# 색인할 필드와 점수 가중치 (필드 비트는 이 순서)
+FIELDS = ('disease_name_kr', 'disease_name_eng', 'synonyms', 'symptoms')
+WEIGHTS = (8, 6, 4, 1)
+FIELD_BITS = 4
+
+# 후보가 이보다 적으면 모든 후보의 점수를 바로 계산 (많으면 점수 구간별로 필요한 만큼만)
+EXACT_SCORING = 2000
+
+# 이름 찾기·관련질환 연결에 쓰는 필드
+NAME_FIELDS = ('disease_name_kr', 'disease_name_eng', 'synonyms')
+
+_TOKEN = re.compile(r'[가-힣]+|[a-z0-9]+')
+_PAREN = re.compile(r'\s*[(\[].*?[)\]]\s*')
+
+
+def normalize(value):
+    """비교용 문자열: 유니코드 정규화(NFKC), 소문자, 공백 제거"""
+    return re.sub(r'\s+', '', unicodedata.normalize('NFKC', value).lower())
+
+
+def tokenize(value):
+    """색인어 목록: 한글은 글자 2-gram(한 글자 단어는 그대로), 영문·숫자는 단어"""
+    tokens = []
+    for word in _TOKEN.findall(unicodedata.normalize('NFKC', value).lower()):
+        if '가' <= word[0] <= '힣' and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def split_list(value):
+    """목록 필드(동의어, 관련질환, 진료과) → list (쉼표로 이어 붙인 예전 형식은 나눔)"""
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if value in MISSING:
+        return []
+    return [item.strip() for item in str(value).split(',') if item.strip()]
+
+
+def _name_keys(record):
+    # 정확한 이름 찾기에 쓰는 키: 이름 그대로, 괄호 부분을 뺀 이름
+    keys = set()
+    for field in NAME_FIELDS:
+        values = split_list(record.get(field)) if field == 'synonyms' else [record.get(field)]
+        for value in values:
+            if value in MISSING:
+                continue
+            keys.add(normalize(value))
+            stripped = _PAREN.sub('', value)
+            if stripped:
+                keys.add(normalize(stripped))
+    keys.discard('')
+    return keys
+
+
+class IndexBuilder:
+    """레코드를 하나씩 받아 색인을 만들고 write()로 파일에 저장"""
+
+    def __init__(self, columns=None):
+        self.columns = list(columns) if columns else None
+        self.docs = []  # 레코드 JSON (UTF-8)
+        self.postings = defaultdict(lambda: array('I'))  # 색인어 -> 문서 번호 순 목록
+        self.names = defaultdict(list)  # 정규화한 이름 -> 문서 번호
+        self.related = []  # (문서 번호, 관련질환 이름 목록)
+
+    def add(self, record):
+        """레코드 추가 → 문서 번호"""
+        doc = len(self.docs)
+        if doc >= 1 << (32 - FIELD_BITS):
+            raise ValueError("색인할 수 있는 문서 수를 넘었습니다")
+        record = {c: record.get(c) for c in self.columns} if self.columns else dict(record)
+        self.docs.append(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+
+        masks = {}
+        for bit, field in enumerate(FIELDS):
+            value = record.get(field)
+            if is_missing(value):
+                continue
+            if isinstance(value, (list, tuple)):
+                value = ' '.join(value)
+            for token in tokenize(str(value)):
+                masks[token] = masks.get(token, 0) | (1 << bit)
+        for token, mask in masks.items():
+            self.postings[token].append(doc << FIELD_BITS | mask)
+
+        for key in _name_keys(record):
+            self.names[key].append(doc)
+        related = split_list(record.get('related_diseases'))
+        if related:
+            self.related.append((doc, related))
+        return doc
+
+    def _graph(self):
+        # 관련질환 이름을 문서 번호로 연결 (양방향, 찾지 못한 이름은 버림)
+        edges = defaultdict(set)
+        for doc, names in self.related:
+            for name in names:
+                targets = self.names.get(normalize(name)) or self.names.get(normalize(_PAREN.sub('', name)))
+                for target in targets or ():
+                    if target != doc:
+                        edges[doc].add(target)
+                        edges[target].add(doc)
+        offsets = array('Q', [0])
+        neighbors = array('I')
+        for doc in range(len(self.docs)):
+            neighbors.extend(sorted(edges.get(doc, ())))
+            offsets.append(len(neighbors))
+        return offsets, neighbors
+
+    def write(self, path):
+        """색인 파일 저장 (임시 파일에 쓴 뒤 바꿔치기)"""
+        terms = sorted(self.postings, key=lambda t: t.encode('utf-8'))
+        names = sorted(self.names, key=lambda t: t.encode('utf-8'))
+
+        doc_offsets, docs = _pack_strings(self.docs)
+        term_offsets, term_blob = _pack_strings(t.encode('utf-8') for t in terms)
+        # 색인어마다 필드별로 나눠 문서 번호만 저장 (색인어 i, 필드 f의 범위는 post_offsets[i*4+f] ~ 그다음)
+        post_offsets = array('Q', [0])
+        postings = array('I')
+        for term in terms:
+            values = self.postings[term]
+            for bit in range(len(FIELDS)):
+                postings.extend(value >> FIELD_BITS for value in values if value & (1 << bit))
+                post_offsets.append(len(postings))
+        name_offsets, name_blob = _pack_strings(n.encode('utf-8') for n in names)
+        name_docs = array('I', (self.names[n][0] for n in names))
+        graph_offsets, graph = self._graph()
+
+        sections = [
+            ('doc_offsets', doc_offsets), ('docs', docs),
+            ('term_offsets', term_offsets), ('terms', term_blob),
+            ('post_offsets', post_offsets), ('postings', postings),
+            ('name_offsets', name_offsets), ('names', name_blob), ('name_docs', name_docs),
+            ('graph_offsets', graph_offsets), ('graph', graph),
+        ]
+        header = {
+            'version': 1,
+            'fields': FIELDS,
+            'weights': WEIGHTS,
+            'documents': len(self.docs),
+            'terms': len(terms),
+            'edges': len(graph) // 2,
+            'built_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'sections': {},
+        }
+        # 헤더 길이가 구역 위치에 영향을 주므로 위치를 채운 헤더 길이가 바뀌지 않을 때까지 계산
+        header_size = 0
+        while True:
+            offset = _align(len(MAGIC) + 8 + header_size)
+            for name, data in sections:
+                size = len(data) * data.itemsize if isinstance(data, array) else len(data)
+                header['sections'][name] = [offset, size]
+                offset = _align(offset + size)
+            encoded = json.dumps(header, ensure_ascii=False).encode('utf-8')
+            if len(encoded) == header_size:
+                break
+            header_size = len(encoded)
+
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(encoded).to_bytes(8, 'little'))
+            f.write(encoded)
+            for name, data in sections:
+                f.write(b'\0' * (header['sections'][name][0] - f.tell()))
+                if isinstance(data, array):
+                    if sys.byteorder != 'little':
+                        data = array(data.typecode, data)
+                        data.byteswap()
+                    data.tofile(f)
+                else:
+                    f.write(data)
+        os.replace(tmp_path, path)
+        return header
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _pack_strings(items):
+    # 바이트 문자열 목록 → (경계 위치 Q 배열, 이어 붙인 바이트)
+    offsets = array('Q', [0])
+    parts = []
+    total = 0
+    for item in items:
+        parts.append(item)
+        total += len(item)
+        offsets.append(total)
+    return offsets, b''.join(parts)
+
+
+class SearchIndex:
+    """mmap으로 연 색인 파일 (여러 스레드·프로세스가 같은 파일을 함께 읽을 수 있음)"""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"검색 색인 파일이 아닙니다: {path}")
+        header_size = int.from_bytes(self.mm[len(MAGIC):len(MAGIC) + 8], 'little')
+        start = len(MAGIC) + 8
+        self.header = json.loads(self.mm[start:start + header_size])
+        if sys.byteorder != 'little':
+            raise ValueError("little-endian 시스템에서만 읽을 수 있습니다")
+
+        view = memoryview(self.mm)
+        self.views = [view]
+        for name, (offset, size) in self.header['sections'].items():
+            section = view[offset:offset + size]
+            if name.endswith('offsets'):
+                section = section.cast('Q')
+            elif name in ('postings', 'name_docs', 'graph'):
+                section = section.cast('I')
+            setattr(self, name, section)
+            self.views.append(section)
+
+    def __len__(self):
+        return self.header['documents']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        try:
+            self.mm.close()
+        except BufferError:
+            pass  # 검색 결과 등에서 아직 참조 중인 조각이 있으면 그것이 사라질 때 닫힘
+        self.file.close()
+
+    def record(self, doc):
+        """문서 번호의 레코드"""
+        return json.loads(bytes(self.docs[self.doc_offsets[doc]:self.doc_offsets[doc + 1]]))
+
+    def _string(self, blob, offsets, i):
+        return bytes(blob[offsets[i]:offsets[i + 1]])
+
+    def _find(self, blob, offsets, key):
+        # 정렬된 문자열 표에서 key 이상인 첫 위치 (이진 탐색)
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(blob, offsets, mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _term_ids(self, token, prefix=False):
+        # 색인어 번호 목록 (prefix면 token으로 시작하는 모든 색인어)
+        key = token.encode('utf-8')
+        i = self._find(self.terms, self.term_offsets, key)
+        count = len(self.term_offsets) - 1
+        ids = []
+        while i < count:
+            term = self._string(self.terms, self.term_offsets, i)
+            if term == key or (prefix and term.startswith(key)):
+                ids.append(i)
+                i += 1
+                if not prefix:
+                    break
+            else:
+                break
+        return ids
+
+    def _field_sets(self, token, prefix, allowed):
+        # 검색어 하나가 필드별로 나오는 문서 번호 집합 [필드 0, 필드 1, ...]
+        sets = [set() for _ in FIELDS]
+        for term_id in self._term_ids(token, prefix):
+            base = term_id * len(FIELDS)
+            for bit in allowed:
+                sets[bit].update(self.postings[self.post_offsets[base + bit]:self.post_offsets[base + bit + 1]])
+        return sets
+
+    def search(self, query, limit=20, fields=None):
+        """검색어의 모든 낱말이 들어 있는 질병을 점수 순으로 → [(점수, 문서 번호, 레코드)]
+
+        한글은 글자 2-gram이 모두 맞아야 하고, 한 글자 낱말과 마지막 영문 낱말은 앞부분 일치로
+        찾는다 (입력 중 자동 완성). 점수는 낱말마다 그 낱말이 나온 필드 중 가장 높은 가중치의 합이다.
+        fields를 주면 그 필드에서만 찾는다. 모든 낱말이 맞는 질병이 없으면 맞는 낱말이 많은 순.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        allowed = [FIELDS.index(field) for field in fields] if fields else range(len(FIELDS))
+
+        # 낱말마다 필드별 문서 집합 → 가장 높은 가중치 필드 기준으로 나눈 집합 (집합 연산은 C에서)
+        tiers = []
+        for i, token in enumerate(tokens):
+            prefix = len(token) == 1 or (i == len(tokens) - 1 and token.isascii())
+            seen = set()
+            best = []
+            for docs in self._field_sets(token, prefix, allowed):
+                best.append(docs - seen)
+                seen |= docs
+            tiers.append((best, seen))
+
+        candidates = set.intersection(*(seen for _, seen in tiers))
+        if not candidates:
+            return self._search_any(tiers, limit)
+
+        if len(candidates) <= EXACT_SCORING or len(tokens) > 4:
+            scores = dict.fromkeys(candidates, 0)
+            for best, _ in tiers:
+                for bit, docs in enumerate(best):
+                    for doc in candidates.intersection(docs):
+                        scores[doc] += WEIGHTS[bit]
+            top = heapq.nsmallest(limit, scores, key=lambda doc: (-scores[doc], doc))
+            return [(scores[doc], doc, self.record(doc)) for doc in top]
+
+        # 후보가 많으면 (낱말별 최고 필드) 조합을 점수 높은 순으로 훑어 limit개만 채움
+        combos = sorted(itertools.product(range(len(FIELDS)), repeat=len(tokens)),
+                        key=lambda combo: -sum(WEIGHTS[bit] for bit in combo))
+        results = []
+        for total, group in itertools.groupby(combos, key=lambda combo: sum(WEIGHTS[bit] for bit in combo)):
+            docs = set()
+            for combo in group:
+                sets = [tiers[i][0][bit] for i, bit in enumerate(combo)]
+                if all(sets):
+                    docs |= candidates.intersection(*sets)
+            results.extend((total, doc) for doc in sorted(docs))
+            if len(results) >= limit:
+                break
+        return [(total, doc, self.record(doc)) for total, doc in results[:limit]]
+
+    def _search_any(self, tiers, limit):
+        # 모든 낱말이 맞는 질병이 없을 때: 맞는 낱말 수, 점수 순
+        hits = defaultdict(int)
+        scores = defaultdict(int)
+        for best, _ in tiers:
+            for bit, docs in enumerate(best):
+                for doc in docs:
+                    hits[doc] += 1
+                    scores[doc] += WEIGHTS[bit]
+        top = heapq.nsmallest(limit, hits, key=lambda doc: (-hits[doc], -scores[doc], doc))
+        return [(scores[doc], doc, self.record(doc)) for doc in top]
+
+    def lookup(self, name):
+        """이름(한글명, 영문명, 동의어)이 정확히 같은 질병의 문서 번호 (없으면 None)"""
+        for key in (normalize(name), normalize(_PAREN.sub('', name))):
+            if not key:
+                continue
+            encoded = key.encode('utf-8')
+            i = self._find(self.names, self.name_offsets, encoded)
+            if i < len(self.name_offsets) - 1 and self._string(self.names, self.name_offsets, i) == encoded:
+                return self.name_docs[i]
+        return None
+
+    def neighbors(self, doc):
+        """관련질환 문서 번호 목록"""
+        return list(self.graph[self.graph_offsets[doc]:self.graph_offsets[doc + 1]])
+
+    def related(self, doc, depth=1):
+        """관련질환 그래프에서 depth 단계 안에 있는 질병 → [(거리, 문서 번호)] (가까운 순)"""
+        seen = {doc: 0}
+        frontier = [doc]
+        for distance in range(1, depth + 1):
+            next_frontier = []
+            for current in frontier:
+                for neighbor in self.neighbors(current):
+                    if neighbor not in seen:
+                        seen[neighbor] = distance
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return sorted((distance, d) for d, distance in seen.items() if d != doc)
+
+
+def build_index(records, path, columns=None):
+    """레코드 목록으로 색인 파일 만들기 → 헤더(문서·색인어·관련 연결 수)"""
+    builder = IndexBuilder(columns)
+    for record in records:
+        builder.add(record)
+    return builder.write(path)
+
+
+def _label(record):
+    return ' / '.join(str(record.get(f)) for f in ('disease_name_kr', 'disease_name_eng') if record.get(f) not in MISSING)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="질병 검색 색인 만들기·검색")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="크롤링 결과로 색인 만들기")
+    build.add_argument('inputs', nargs='*', help="결과 파일 (.csv / .jsonl / .parquet)")
+    build.add_argument('--snuh-db', action='store_true', help="SNUH DB(uni.DB_CONFIG)의 레코드도 포함")
+    build.add_argument('-o', '--output', default='diseases.idx')
+
+    search = commands.add_parser('search', help="이름·증상으로 찾기")
+    search.add_argument('index')
+    search.add_argument('query', nargs='+')
+    search.add_argument('--field', action='append', choices=FIELDS, help="이 필드에서만 찾기 (여러 번 가능)")
+    search.add_argument('--limit', type=int, default=10)
+
+    related = commands.add_parser('related', help="관련질환 찾기")
+    related.add_argument('index')
+    related.add_argument('name')
+    related.add_argument('--depth', type=int, default=1)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        from sinks import read_records
+
+        def records():
+            for path in args.inputs:
+                yield from read_records(path)
+            if args.snuh_db:
+                import uni
+                for record in uni.read_db_records():
+                    yield {'site': 'snuh', **record}
+
+        start = time.perf_counter()
+        header = build_index(records(), args.output)
+        print(f"✓ '{args.output}' 저장: 질병 {header['documents']}개, 색인어 {header['terms']}개, "
+              f"관련질환 연결 {header['edges']}개 ({time.perf_counter() - start:.2f}초)")
+        return
+
+    with SearchIndex(args.index) as index:
+        if args.command == 'search':
+            start = time.perf_counter()
+            results = index.search(' '.join(args.query), limit=args.limit, fields=args.field)
+            elapsed = time.perf_counter() - start
+            for score, doc, record in results:
+                print(f"  {score:>4}  {_label(record)}  {record.get('url', '')}")
+            print(f"[검색] {len(results)}개 ({elapsed * 1000:.2f}ms)")
+        else:
+            doc = index.lookup(args.name)
+            if doc is None:
+                print(f"'{args.name}' 질병을 찾을 수 없습니다.")
+                return
+            print(f"[{_label(index.record(doc))}]")
+            for distance, neighbor in index.related(doc, args.depth):
+                print(f"  {'  ' * (distance - 1)}- {_label(index.record(neighbor))}")
+
+
+if __name__ == "__main__":
+    main()
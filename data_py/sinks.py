@@ -0,0 +1,233 @@
+import csv
+import json
+import os
+import threading
+
+from records import arrow_schema, flatten, is_missing, to_arrow
+
+
+class RecordSink:
+    """레코드를 하나씩 받아 바로 기록하는 출력 (추가 전용)"""
+
+    confirms_writes = False  # True면 저장 완료를 콜백으로 따로 알려 줌 (DbSink)
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvSink(RecordSink):
+    """CSV 출력. 첫 레코드의 키(또는 columns)로 헤더를 쓰고 이후 행을 이어 붙인다
+
+    목록 필드는 ', '로 연결하고, 빈 목록은 missing으로 쓴다 (AMC는 '정보 없음').
+    """
+
+    def __init__(self, path, columns=None, missing=None, encoding='utf-8-sig'):
+        self.path = path
+        self.columns = list(columns) if columns else None
+        self.missing = missing
+        self.file = open(path, 'w', newline='', encoding=encoding)
+        self.writer = None
+
+    def write(self, record):
+        if self.writer is None:
+            self.columns = self.columns or list(record)
+            self.writer = csv.DictWriter(self.file, fieldnames=self.columns, extrasaction='ignore')
+            self.writer.writeheader()
+        self.writer.writerow(flatten(record, self.missing))
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesSink(RecordSink):
+    """JSON Lines 출력 (한 줄에 레코드 하나, columns를 주면 그 필드만, 목록 필드는 JSON 배열)"""
+
+    def __init__(self, path, columns=None):
+        self.path = path
+        self.columns = list(columns) if columns else None
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        if self.columns:
+            record = {c: record.get(c) for c in self.columns}
+        self.file.write(json.dumps(dict(record), ensure_ascii=False))
+        self.file.write('\n')
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink(RecordSink):
+    """Parquet 출력. row_group_size개씩 모아 행 그룹 단위로 기록 (pyarrow 필요)
+
+    열 이름은 첫 레코드의 키(또는 columns)로 정하고, 목록 필드는 list<string> 열로,
+    나머지는 문자열 열로 저장한다 (records.arrow_schema).
+    Parquet 파일은 close() 때 꼬리말이 써져야 읽을 수 있으므로, flush()로 작은 행 그룹을
+    만들지 않고 row_group_size개가 모일 때만 기록한다.
+    """
+
+    def __init__(self, path, columns=None, row_group_size=1000):
+        import pyarrow.parquet
+
+        self.pq = pyarrow.parquet
+        self.path = path
+        self.columns = list(columns) if columns else None
+        self.row_group_size = row_group_size
+        self.buffer = []
+        self.writer = None
+
+    def write(self, record):
+        if self.columns is None:
+            self.columns = list(record)
+        self.buffer.append(record)
+        if len(self.buffer) >= self.row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        # 모인 레코드를 행 그룹 하나로 기록
+        if not self.buffer:
+            return
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, arrow_schema(self.columns, self.buffer))
+        self.writer.write_batch(to_arrow(self.buffer, schema=self.writer.schema))
+        self.buffer = []
+
+    def close(self):
+        self._write_row_group()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class SearchIndexSink(RecordSink):
+    """검색 색인 출력 (search_index). 레코드를 모아 두었다가 close() 때 색인 파일로 기록"""
+
+    def __init__(self, path, columns=None):
+        from search_index import IndexBuilder
+
+        self.path = path
+        self.builder = IndexBuilder(columns)
+
+    def write(self, record):
+        self.builder.add(record)
+
+    def close(self):
+        if self.builder is not None:
+            self.builder.write(self.path)
+            self.builder = None
+
+
+class MultiSink(RecordSink):
+    """여러 출력에 같은 레코드를 기록"""
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    def write(self, record):
+        for sink in self.sinks:
+            sink.write(record)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class LockedSink(RecordSink):
+    """여러 스레드가 함께 쓰는 출력 (기록을 하나씩 순서대로)"""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        with self.lock:
+            self.sink.write(record)
+
+    def flush(self):
+        with self.lock:
+            self.sink.flush()
+
+    def close(self):
+        with self.lock:
+            self.sink.close()
+
+
+SINKS = {'.csv': CsvSink, '.jsonl': JsonLinesSink, '.parquet': ParquetSink, '.idx': SearchIndexSink}
+
+
+def create_sink(paths, columns=None, missing=None):
+    """확장자(.csv / .jsonl / .parquet / .idx)에 맞는 출력 생성. 경로가 여러 개면 모두에 기록
+
+    missing은 CSV에서 빈 목록 필드를 나타낼 값이다 (다른 형식은 빈 목록 그대로).
+    """
+    sinks = []
+    for path in paths:
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in SINKS:
+            raise ValueError(f"지원하지 않는 출력 형식: {path}")
+        if SINKS[ext] is CsvSink:
+            sinks.append(CsvSink(path, columns, missing))
+        else:
+            sinks.append(SINKS[ext](path, columns))
+    return sinks[0] if len(sinks) == 1 else MultiSink(sinks)
+
+
+def read_records(path):
+    """출력 파일(.csv / .jsonl / .parquet)을 레코드(dict)로 다시 읽기"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            yield from csv.DictReader(f)
+    elif ext == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif ext == '.parquet':
+        import pyarrow.parquet
+
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"읽을 수 없는 형식: {path}")
+
+
+class RecordStats:
+    """레코드를 받을 때마다 갱신하는 요약 통계 (필드별로 값이 있는 레코드 수)"""
+
+    def __init__(self, fields, sample_size=5):
+        self.fields = list(fields)
+        self.sample_size = sample_size
+        self.count = 0
+        self.filled = dict.fromkeys(self.fields, 0)
+        self.samples = []
+
+    def add(self, record):
+        self.count += 1
+        for field in self.fields:
+            if not is_missing(record.get(field)):
+                self.filled[field] += 1
+        if len(self.samples) < self.sample_size:
+            self.samples.append(record)
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from records import LIST_FIELDS, DiseaseRecord
+
+
+def content_hash(html):
+    """HTML 내용의 sha256 해시"""
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+class CrawlState:
+    """증분 크롤링용 로컬 상태 저장소 (SQLite)
+
+    URL마다 ETag/Last-Modified, 내용 해시, 마지막으로 추출한 결과를 보관한다.
+    여러 워커 스레드에서 함께 사용할 수 있다. joined는 예전 형식으로 저장된 결과에서
+    쉼표로 이어 붙인 목록 필드 (DiseaseRecord.from_dict 참고).
+    """
+
+    def __init__(self, path, commit_every=50, joined=LIST_FIELDS):
+        self.joined = joined
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                record TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.commit_every = commit_every
+        self.pending = 0
+        self.staged = {}  # url -> 저장 확인을 기다리는 행 (stage/confirm)
+
+    def _row(self, url):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT etag, last_modified, content_hash, record FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _save(self, url, etag, last_modified, digest, record_json):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, digest, record_json, datetime.now().isoformat()),
+            )
+            self._maybe_commit()
+
+    def _maybe_commit(self):
+        # 호출하는 쪽에서 lock을 잡고 있어야 함
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.conn.commit()
+            self.pending = 0
+
+    def validators(self, url):
+        """조건부 요청에 쓸 (etag, last_modified). 기록이 없으면 None"""
+        row = self._row(url)
+        if row is None or (row[0] is None and row[1] is None):
+            return None
+        return row[0], row[1]
+
+    def previous_record(self, url, page):
+        """page가 지난번과 같으면(304 또는 같은 해시) 저장된 결과, 바뀌었으면 None"""
+        row = self._row(url)
+        if row is None:
+            return None
+
+        etag, last_modified, stored_hash, record_json = row
+        if page.status == 304:
+            return DiseaseRecord.from_dict(json.loads(record_json), self.joined)
+
+        if content_hash(page.html) == stored_hash:
+            # 내용은 같지만 검증자가 새로 발급됐을 수 있으므로 갱신
+            if (page.etag, page.last_modified) != (etag, last_modified):
+                self._save(url, page.etag, page.last_modified, stored_hash, record_json)
+            return DiseaseRecord.from_dict(json.loads(record_json), self.joined)
+        return None
+
+    def update(self, url, page, record):
+        """새로 추출한 결과와 검증자, 해시 기록"""
+        record_json = json.dumps(dict(record), ensure_ascii=False)
+        self._save(url, page.etag, page.last_modified, content_hash(page.html), record_json)
+
+    def stage(self, url, page, record):
+        """update()와 같지만 confirm()할 때까지 기록하지 않음
+
+        출력 저장이 비동기로 끝나는 경우(DB), 저장이 확인되기 전에 상태부터 기록하면 그 사이에
+        프로세스가 죽었을 때 다음 실행이 페이지를 '변경 없음'으로 보고 저장되지 않은 행을
+        다시 쓰지 않는다. 확인되지 않은 행은 기록되지 않아 다음 실행에서 다시 처리된다.
+        """
+        row = (page.etag, page.last_modified, content_hash(page.html), json.dumps(dict(record), ensure_ascii=False))
+        with self.lock:
+            self.staged[url] = row
+
+    def confirm(self, urls):
+        """저장이 확인된 URL의 stage()한 상태를 기록"""
+        now = datetime.now().isoformat()
+        with self.lock:
+            rows = [(url, *self.staged.pop(url), now) for url in urls if url in self.staged]
+            if rows:
+                self.conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self.conn.commit()
+
+    def replace_record(self, url, record):
+        """검증자와 해시는 그대로 두고 저장된 결과만 교체 (--reparse 후 갱신용)"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE pages SET record = ?, updated_at = ? WHERE url = ?",
+                (json.dumps(dict(record), ensure_ascii=False), datetime.now().isoformat(), url),
+            )
+            self._maybe_commit()
+
+    def forget(self, urls):
+        """저장에 실패한 URL의 상태를 지워 다음 실행에서 다시 처리되게 함"""
+        with self.lock:
+            for url in urls:
+                self.staged.pop(url, None)
+            self.conn.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in urls])
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
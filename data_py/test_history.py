@@ -0,0 +1,90 @@
+"""버전 기록(RecordHistory) 테스트: 동시에 진행되는 크롤링·재파싱·워커와 변경 피드
+
+번호가 작은 크롤링이 나중에 끝나도 변경 피드(changes, latest)가 그 크롤링의 버전을
+건너뛰지 않는지, 워커마다 따로 크롤링 번호를 받는지 확인한다.
+
+    python -m pytest data_py/test_history.py
+"""
+from history import REPARSE, RecordHistory
+
+
+def record(url, symptom):
+    return {'url': url, 'disease_name_kr': url, 'symptoms': [symptom]}
+
+
+def read_feed(path, since):
+    # 변경 피드 소비자: since 뒤의 변경과 다음에 이어 읽을 번호
+    history = RecordHistory(path)
+    try:
+        cursor = history.latest()
+        return [change['url'] for change in history.changes(since, cursor)], cursor
+    finally:
+        history.close()
+
+
+def test_interleaved_crawl_and_reparse(tmp_path):
+    path = str(tmp_path / 'amc_history.db')
+    crawl, reparse = RecordHistory(path), RecordHistory(path)
+    try:
+        assert crawl.begin() == 1
+        crawl.observe('u1', record('u1', '두통'))
+        crawl.commit()
+
+        # 크롤링 중에 시작한 재파싱은 진행 중인 크롤링을 닫지 않음
+        assert reparse.begin(kind=REPARSE) == 2
+        reparse.observe('u2', record('u2', '발열'))
+        reparse.finish()
+
+        # 크롤링 1이 끝나지 않았으므로 피드는 아직 아무것도 내보내지 않음
+        assert read_feed(path, 0) == ([], 0)
+        assert list(crawl.changes(0)) == []
+
+        crawl.observe('u3', record('u3', '기침'))
+        counts = crawl.finish(complete=True)
+        assert counts['insert'] == 2
+        assert read_feed(path, 0) == (['u1', 'u3', 'u2'], 2)
+    finally:
+        crawl.close()
+        reparse.close()
+
+
+def test_workers_get_their_own_crawls(tmp_path):
+    path = str(tmp_path / 'snuh_history.db')
+    first, second = RecordHistory(path), RecordHistory(path)
+    try:
+        assert first.begin(worker='w1') == 1
+        assert second.begin(worker='w2') == 2
+        first.observe('u1', record('u1', '두통'))
+        first.commit()  # work_site처럼 배치마다 반영 (다른 워커가 쓰기를 기다리지 않도록)
+        second.observe('u2', record('u2', '발열'))
+        second.commit()
+
+        # 먼저 끝난 워커의 수에는 다른 워커가 쓴 행이 들어가지 않음
+        assert first.finish()['insert'] == 1
+        feed, cursor = read_feed(path, 0)
+        assert (feed, cursor) == (['u1'], 1)
+
+        # 늦게 끝난 워커가 쓴 행도 이어 읽는 피드에 나옴
+        second.observe('u3', record('u3', '기침'))
+        assert second.finish()['insert'] == 2
+        assert read_feed(path, cursor) == (['u2', 'u3'], 2)
+        assert [crawl[:3] for crawl in first.crawls()] == [(1, 'crawl', 'w1'), (2, 'crawl', 'w2')]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_restarted_worker_closes_only_its_own_crawl(tmp_path):
+    path = str(tmp_path / 'amc_history.db')
+    history = RecordHistory(path)
+    try:
+        history.begin(worker='w1')
+        other = RecordHistory(path)
+        other.begin(worker='w2')
+        # w1이 죽은 뒤 같은 이름으로 다시 시작: 지난 w1 크롤링만 불완전한 것으로 닫힘
+        history.begin(worker='w1')
+        states = {crawl: finished is not None for crawl, _, _, _, finished, _, _ in history.crawls()}
+        assert states == {1: True, 2: False, 3: False}
+        other.close()
+    finally:
+        history.close()
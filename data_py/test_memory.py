@@ -0,0 +1,93 @@
+"""큰 목록의 메모리 상한 테스트: 합성 목록 URL 6만 개를 ListDiscovery로 흘려보내며 최대 RSS 확인
+
+--seen disk / bloom 경로는 본 URL을 메모리에 쌓지 않으므로 목록이 커져도 최대 RSS가
+거의 늘지 않아야 한다. 측정이 실제로 늘어난 메모리를 잡는지 보이려고 기본 set으로도
+같은 목록을 돌려 상한을 넘는 것까지 확인한다. 최대 RSS는 되돌릴 수 없으므로 경우마다
+별도 프로세스에서 돌린다 (Linux 전용: /proc/self/status의 VmHWM).
+
+    python -m pytest data_py/test_memory.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+URLS = 60_000
+PER_PAGE = 20
+# 긴 URL (실제 상세 URL에 검색 조건이 붙는 경우) — set이면 URL 하나당 수백 바이트가 남음
+PADDING = 'x' * 200
+LIMIT_MB = 8
+
+pytestmark = pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason="Linux 전용 (VmHWM)")
+
+
+def synthetic_page(page_index, pages):
+    """(질병 목록, 페이저 마지막 번호) — 페이지마다 앞 페이지의 마지막 URL이 한 번 더 나옴"""
+    if page_index > pages:
+        return [], pages
+    start = (page_index - 1) * PER_PAGE
+    ids = range(max(0, start - 1), start + PER_PAGE)
+    return [{'url': f'https://example.invalid/diseaseDetail.do?contentId={i}&q={PADDING}',
+             'disease_name': f'질환{i}'} for i in ids], pages
+
+
+def peak_rss_kb():
+    # getrusage의 ru_maxrss는 fork한 부모(pytest)의 최대값을 이어받으므로 쓰지 않음
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+    raise RuntimeError("VmHWM을 읽을 수 없습니다")
+
+
+def stream(seen):
+    """(자식 프로세스) 목록을 끝까지 흘려보내고 {'count', 'growth_mb'} 출력"""
+    from discovery import BloomUrlSet, DiskUrlSet, ListDiscovery
+
+    factories = {
+        'memory': set,
+        'disk': DiskUrlSet,
+        'bloom': lambda: BloomUrlSet(URLS, 1e-6),
+    }
+    pages = URLS // PER_PAGE
+    discovery = ListDiscovery(lambda page_index: synthetic_page(page_index, pages),
+                              max_pages=pages + 1, workers=2, retries=0, seen=factories[seen])
+    discovery.find_last_page()
+
+    baseline = peak_rss_kb()
+    count = sum(1 for _ in discovery)
+    print(json.dumps({'count': count, 'growth_mb': (peak_rss_kb() - baseline) / 1024}))
+
+
+def run_stream(seen):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), seen],
+                            cwd=HERE, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_disk_seen_stays_bounded():
+    result = run_stream('disk')
+    assert result['count'] == URLS
+    assert result['growth_mb'] < LIMIT_MB, result
+
+
+def test_bloom_seen_stays_bounded():
+    result = run_stream('bloom')
+    # 1e-6 오탐률이면 6만 개에서 잘못 건너뛸 URL은 거의 없음
+    assert result['count'] >= URLS - 1
+    assert result['growth_mb'] < LIMIT_MB, result
+
+
+def test_memory_seen_exceeds_limit():
+    # 대조군: 측정이 URL이 쌓이는 만큼의 증가를 잡아내는지
+    result = run_stream('memory')
+    assert result['count'] == URLS
+    assert result['growth_mb'] > LIMIT_MB, result
+
+
+if __name__ == "__main__":
+    stream(sys.argv[1])
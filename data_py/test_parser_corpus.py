@@ -0,0 +1,15 @@
+"""파서 스냅숏 회귀 검사(parser_corpus.py check)를 pytest로 실행
+
+코퍼스의 기대 결과와 필드가 하나라도 다르면 실패한다. 처리량은 재지 않으므로 한 번만 파싱한다.
+
+    python -m pytest data_py/test_parser_corpus.py
+"""
+import pytest
+
+import parser_corpus
+
+
+@pytest.mark.parametrize('site', parser_corpus.corpus_sites(parser_corpus.CORPUS_DIR))
+def test_corpus_has_no_field_diffs(site, capsys):
+    diffs = parser_corpus.check_site(site, parser_corpus.CORPUS_DIR, parser_corpus.available_backends(), rounds=1)
+    assert diffs == 0, capsys.readouterr().out
@@ -0,0 +1,58 @@
+"""DiseaseRecord 문자열 형식 왕복 테스트: flatten()으로 CSV·DB·지난 상태에 쓴 값을 다시 읽기
+
+SNUH 증상은 쉼표가 든 문단 하나라 다시 읽을 때 나누면 안 되고, AMC 목록 필드와 SNUH
+진료과는 ', '로 이어 붙인 목록이라 나눠야 한다.
+
+    python -m pytest data_py/test_records.py
+"""
+import json
+
+import asan
+import uni
+from records import DiseaseRecord, flatten
+from state import CrawlState
+
+SNUH_HTML = """<html><body><div id="content">
+<h3>C형 간염[Hepatitis C]</h3>
+<div class="viewRow tooltipRow"><em>진료과</em><p><a href="#">소화기내과</a><a href="#">감염내과</a></p></div>
+<div id="section-증상"><p>피로, 식욕 부진, 황달이 나타날 수 있습니다.</p></div>
+</div></body></html>"""
+SNUH_URL = 'https://www.snuh.org/health/nMedInfo/nView.do?medid=AA000433'
+
+
+def snuh_record():
+    return uni.parse_disease_detail(SNUH_HTML, SNUH_URL, 'C형 간염[Hepatitis C]')
+
+
+def test_snuh_symptoms_round_trip():
+    record = snuh_record()
+    assert record['symptoms'] == ('피로, 식욕 부진, 황달이 나타날 수 있습니다.',)
+    assert record['department'] == ('소화기내과', '감염내과')
+
+    # DB·CSV 행처럼 문자열로 바꾼 뒤 다시 읽기
+    back = DiseaseRecord.from_dict(flatten(record), uni.SnuhSite.joined_fields)
+    assert dict(back) == dict(record)
+
+
+def test_amc_joined_fields_split():
+    row = {'disease_name_kr': '당뇨병', 'symptoms': '다음, 다뇨, 다식', 'department': '내분비내과',
+           'synonyms': '정보 없음', 'related_diseases': '당뇨병성 신증, 당뇨병성 망막병증', 'url': 'u'}
+    record = DiseaseRecord.from_dict(row, asan.AmcSite.joined_fields)
+    assert record['symptoms'] == ('다음', '다뇨', '다식')
+    assert record['synonyms'] == ()
+    assert record['related_diseases'] == ('당뇨병성 신증', '당뇨병성 망막병증')
+
+
+def test_legacy_state_keeps_snuh_symptoms(tmp_path):
+    # user-020 이전의 상태 파일: 결과가 문자열 형식으로 저장돼 있음
+    record = snuh_record()
+    state = CrawlState(str(tmp_path / 'snuh_state.db'), joined=uni.SnuhSite.joined_fields)
+    try:
+        state.conn.execute(
+            "INSERT INTO pages VALUES (?, NULL, NULL, ?, ?, '')",
+            (SNUH_URL, 'hash', json.dumps(flatten(record), ensure_ascii=False)),
+        )
+        previous = state.previous_record(SNUH_URL, type('Page', (), {'status': 304})())
+    finally:
+        state.close()
+    assert dict(previous) == dict(record)
@@ -0,0 +1,57 @@
+"""재파싱(--reparse) 경로 테스트: 캐시된 AMC 페이지 600개를 네트워크 없이 다시 파싱
+
+목록 탐색 스레드가 lxml로 목록 페이지를 파싱하는 동안 파싱 프로세스 풀이 처음 만들어지는
+경로다. 풀을 fork로 만들면 libxml2 잠금을 물려받은 자식이 멈춰 끝나지 않으므로,
+크롤러를 별도 프로세스로 돌리고 시간 제한 안에 끝나는지까지 확인한다.
+
+    python -m pytest data_py/test_reparse.py
+"""
+import csv
+import glob
+import os
+import subprocess
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+from bench_crawl import MockCatalogue
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DISEASES = 600
+
+
+def build_cache(workdir, diseases=DISEASES):
+    """가짜 사이트 페이지로 AMC HTML 캐시(cache/amc) 채우기"""
+    import asan
+    from cache import HtmlCache, OfflineFetcher
+    from crawler import get_disease_list_from_page
+
+    site = asan.AmcSite()
+    catalogue = MockCatalogue(diseases, page_kb=40)
+    cache = HtmlCache(os.path.join(workdir, site.cache_dir))
+    try:
+        fetcher = OfflineFetcher(cache)
+        # 실제 크롤링처럼 마지막 페이지 다음의 빈 목록 페이지까지 캐시에 있음
+        for page_index in range(1, catalogue.pages + 2):
+            cache.put(site.list_url(page_index), catalogue.amc_list(page_index))
+            diseases, _ = get_disease_list_from_page(site, fetcher, page_index)
+            for disease in diseases:
+                content_id = int(parse_qs(urlsplit(disease['url']).query)['contentId'][0])
+                cache.put(disease['url'], catalogue.amc_detail(content_id))
+    finally:
+        cache.close()
+
+
+def test_reparse_from_cache(tmp_path):
+    build_cache(str(tmp_path))
+    result = subprocess.run(
+        [sys.executable, os.path.join(HERE, 'crawler.py'), 'amc', '--reparse', '--set', 'parse_workers=4'],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr[-2000:]
+
+    paths = glob.glob(str(tmp_path / 'amc_diseases_*.csv'))
+    assert len(paths) == 1, result.stdout[-2000:]
+    with open(paths[0], encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == DISEASES
+    assert {row['disease_name_kr'] for row in rows} == {f'질환{i}' for i in range(DISEASES)}
@@ -1,23 +1,21 @@
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-import psycopg2
-from datetime import datetime
+import sys
 
+import crawler
+from extract import first, has_class, parse_html, text, texts
+from fetcher import Ready
+from records import DiseaseRecord
 
-# Chrome 옵션 설정
-chrome_options = Options()
-chrome_options.add_argument('--headless')
-chrome_options.add_argument('--no-sandbox')
-chrome_options.add_argument('--disable-dev-shm-usage')
-chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
 
-# 웹드라이버 초기화
-driver = webdriver.Chrome(options=chrome_options)
+# 페이지 준비 조건: 목록은 thumbType04 컨테이너, 상세는 h3 제목이 있어야 렌더링 완료
+LIST_READY = Ready(marker='thumbType04', css='div.thumbType04')
+DETAIL_READY = Ready(marker='<h3', css='h3')
 
+# 동시 크롤링 설정: 목록·상세 페이지 워커 수, 초당 최대 요청 수
+WORKERS = 4
+RATE_LIMIT = 2.0
 
-# PostgreSQL 연결 설정 (본인의 DB 정보로 수정)
+
+# PostgreSQL 연결 설정 (본인의 DB 정보로 수정하거나 crawler.toml [settings]의 db로 지정, profiles.py 참고)
 DB_CONFIG = {
     'host': '193.122.124.108',
     'database': 'testdb',
@@ -26,47 +24,169 @@ DB_CONFIG = {
     'port': 5432
 }
 
+# 저장 설정: 저장할 테이블과 컬럼(url이 키), 동시에 쓰는 DB 연결 수
+DB_TABLE = 'snuh_diseases'
+DB_COLUMNS = ('disease_name_kr', 'disease_name_eng', 'department', 'symptoms', 'url')
+DB_POOL_SIZE = 2
+
+# 백그라운드 저장: 대기열 크기, 최대 대기 시간(초), 일시 오류 재시도 횟수, 저장 실패 행 기록 파일
+DB_QUEUE = 1000
+DB_FLUSH_SECONDS = 5.0
+DB_RETRIES = 3
+DEAD_LETTER_FILE = 'snuh_dead_letter.jsonl'
+
 
-def connect_db():
-    """데이터베이스 연결"""
+def connect_db(on_saved=None):
+    """데이터베이스 연결 풀과 백그라운드 저장기 생성 (크롤링은 저장을 기다리지 않음)
+
+    COPY로 임시 테이블에 적재한 뒤 한 번에 병합한다. 배치마다 on_saved(rows, failed)로
+    저장 결과를 알린다.
+    """
+    from dbwriter import BulkWriter, DbSink  # psycopg2는 DB에 저장할 때만 불러옴
+    
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        return conn
+        writer = BulkWriter(DB_CONFIG, DB_TABLE, DB_COLUMNS, key='url', pool_size=DB_POOL_SIZE)
     except Exception as e:
         print(f"DB 연결 오류: {e}")
         return None
+    
+    return DbSink(writer, max_queue=DB_QUEUE, flush_seconds=DB_FLUSH_SECONDS, retries=DB_RETRIES,
+                  dead_letter=DEAD_LETTER_FILE, on_flush=on_saved)
 
 
-def get_disease_list_from_page(driver, page_index):
-    """특정 페이지에서 질병 목록 추출"""
-    disease_data = []
-    
+def read_db_records():
+    """DB에 저장된 SNUH 레코드 (색인 등 후처리용, 서버 쪽 커서로 나눠 읽음)"""
+    import psycopg2
+
+    conn = psycopg2.connect(**DB_CONFIG)
     try:
-        url = f"https://www.snuh.org/health/nMedInfo/nList.do?pageIndex={page_index}&sortType=&searchNWord=&searchKey="
-        
-        print(f"[페이지 {page_index}] 로딩 중...")
-        driver.get(url)
-        time.sleep(2)
-        
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        thumb_container = soup.find('div', class_='thumbType04')
-        
-        if not thumb_container:
-            print(f"[페이지 {page_index}] thumbType04 div를 찾을 수 없습니다.")
-            return [], False
-        
-        items = thumb_container.find_all('div', class_='item')
-        print(f"[페이지 {page_index}] {len(items)}개 item 발견")
-        
-        for item in items:
-            strong_tag = item.find('strong')
-            if not strong_tag:
+        cursor = conn.cursor(name='snuh_records')
+        cursor.execute(f"SELECT {', '.join(DB_COLUMNS)} FROM {DB_TABLE} ORDER BY url")
+        for row in cursor:
+            yield dict(zip(DB_COLUMNS, row))
+    finally:
+        conn.close()
+
+
+def parse_disease_detail(html, url, disease_name):
+    """상세 페이지 HTML에서 질병 정보 추출 (제목 이후만 파싱하고 필요한 요소는 한 번에 수집)"""
+    root = parse_html(html, start='<h3')
+    
+    # 한 번 순회하며 제목, 진료과 행, 증상/정의 섹션, 증상 소제목 수집
+    title_elem = None
+    tooltip_row = None  # 처음 나온 'viewRow tooltipRow'
+    dept_row = None  # 진료과 em과 p가 있는 첫 viewRow
+    sections = {}
+    symptom_headers = []
+    for elem in root.iter('h3', 'h5', 'div'):
+        if elem.tag == 'h3':
+            if title_elem is None:
+                title_elem = elem
+        elif elem.tag == 'h5':
+            if '증상' in elem.text_content():
+                symptom_headers.append(elem)
+        elif has_class(elem, 'viewRow'):
+            if tooltip_row is None and has_class(elem, 'tooltipRow'):
+                tooltip_row = elem
+            if dept_row is None:
+                em_tag = first(elem, 'em')
+                if em_tag is not None and '진료과' in em_tag.text_content() and first(elem, 'p') is not None:
+                    dept_row = elem
+        elif elem.get('id') in ('section-증상', 'section-정의'):
+            sections.setdefault(elem.get('id'), elem)
+    
+    # 병명 추출
+    disease_name_kr = ""
+    disease_name_eng = ""
+    
+    if title_elem is not None:
+        title_text = text(title_elem)
+        if '[' in title_text and ']' in title_text:
+            disease_name_kr = title_text.split('[')[0].strip()
+            disease_name_eng = title_text.split('[')[1].split(']')[0].strip()
+        else:
+            disease_name_kr = title_text
+    else:
+        disease_name_kr = disease_name
+    
+    # 진료과 추출: tooltipRow 우선, 없으면 진료과 행
+    departments = []
+    if tooltip_row is not None:
+        em_tag = first(tooltip_row, 'em')
+        p_tag = first(tooltip_row, 'p')
+        if em_tag is not None and '진료과' in em_tag.text_content() and p_tag is not None:
+            departments = [text(link) for link in p_tag.iterdescendants('a')]
+    
+    if not departments and dept_row is not None:
+        departments = [text(link) for link in first(dept_row, 'p').iterdescendants('a')]
+    
+    # 증상 추출: 증상 섹션 → 증상 소제목이 있는 div → 정의 섹션 앞 두 문단
+    symptoms = ""
+    if 'section-증상' in sections:
+        symptoms = ' '.join(t for t in texts(sections['section-증상'], 'p') if t)
+    
+    if not symptoms:
+        for header in symptom_headers:
+            parent_div = next(header.iterancestors('div'), None)
+            if parent_div is not None:
+                p_texts = texts(parent_div, 'p')
+                if p_texts:
+                    symptoms = ' '.join(t for t in p_texts if t)
+                    break
+    
+    if not symptoms and 'section-정의' in sections:
+        symptoms = ' '.join(t for t in texts(sections['section-정의'], 'p')[:2] if t)
+    
+    # 증상은 문단을 이어 붙인 글 하나 (목록 필드지만 항목은 하나)
+    return DiseaseRecord(
+        disease_name_kr=disease_name_kr,
+        disease_name_eng=disease_name_eng,
+        department=departments,
+        symptoms=[symptoms] if symptoms else [],
+        url=url,
+    )
+
+
+class SnuhSite(crawler.Site):
+    """서울대학교병원 질병정보 어댑터 (결과는 PostgreSQL에 저장, 바뀐 것만)"""
+
+    name = 'snuh'
+    title = '서울대학교병원 질병정보'
+    host = 'www.snuh.org'
+    list_ready = LIST_READY
+    detail_ready = DETAIL_READY
+    workers = WORKERS
+    rate_limit = RATE_LIMIT
+    snapshot = False
+    # 증상은 문단을 이어 붙인 글 하나라 쉼표에서 나누지 않음
+    joined_fields = ('department',)
+    stat_fields = (
+        ('symptoms', '증상 정보'),
+        ('department', '진료과 정보'),
+        ('disease_name_eng', '영문명'),
+    )
+    parse_detail = staticmethod(parse_disease_detail)
+
+    def list_url(self, page_index):
+        return f"https://www.snuh.org/health/nMedInfo/nList.do?pageIndex={page_index}&sortType=&searchNWord=&searchKey="
+
+    def parse_list(self, root):
+        disease_data = []
+        
+        thumb_container = next((div for div in root.iter('div') if has_class(div, 'thumbType04')), None)
+        if thumb_container is None:
+            return disease_data
+        
+        for item in thumb_container.iterdescendants('div'):
+            if not has_class(item, 'item'):
+                continue
+            strong_tag = first(item, 'strong')
+            if strong_tag is None:
                 continue
             
-            disease_name = strong_tag.get_text(strip=True)
-            link = item.find('a', href=True)
-            if not link:
+            disease_name = text(strong_tag)
+            link = next((a for a in item.iterdescendants('a') if a.get('href') is not None), None)
+            if link is None:
                 continue
             
             href = link.get('href', '')
@@ -84,267 +204,31 @@ def get_disease_list_from_page(driver, page_index):
                 disease_data.append({
                     'disease_name': disease_name,
                     'url': full_url,
-                    'page': page_index
                 })
         
-        print(f"[페이지 {page_index}] {len(disease_data)}개 질병 수집")
-        return disease_data, len(disease_data) > 0
-        
-    except Exception as e:
-        print(f"[페이지 {page_index}] 오류: {e}")
-        return [], False
+        return disease_data
 
+    def open_output(self, on_saved):
+        return connect_db(on_saved)
 
-def get_all_disease_list(driver, max_pages=200):
-    """모든 페이지에서 질병 목록 추출"""
-    all_diseases = []
-    consecutive_empty = 0
-    
-    print("=" * 60)
-    print("전체 페이지 크롤링 시작")
-    print("=" * 60)
-    
-    for page_index in range(1, max_pages + 1):
-        disease_list, has_data = get_disease_list_from_page(driver, page_index)
-        
-        if has_data:
-            all_diseases.extend(disease_list)
-            consecutive_empty = 0
-        else:
-            consecutive_empty += 1
-            print(f"[경고] 페이지 {page_index}에 데이터가 없습니다. ({consecutive_empty}/3)")
-            
-            if consecutive_empty >= 3:
-                print(f"\n연속 3페이지 데이터 없음. 크롤링 종료 (마지막 페이지: {page_index-3})")
-                break
-        
-        time.sleep(1)
-    
-    # 중복 제거
-    unique_diseases = []
-    seen_urls = set()
-    for disease in all_diseases:
-        if disease['url'] not in seen_urls:
-            unique_diseases.append(disease)
-            seen_urls.add(disease['url'])
-    
-    print(f"\n총 {len(unique_diseases)}개의 질병 정보 수집 완료 (중복 제거 후)")
-    return unique_diseases
+    def output_summary(self, sink):
+        lines = []
+        if sink.dead_count:
+            lines.append(f"✗ DB 저장 실패: {sink.dead_count}개 ({DEAD_LETTER_FILE})")
+        lines.append("✅ DB 저장 완료!")
+        return lines
 
 
-def get_disease_detail(driver, url, disease_name):
-    """개별 질병 페이지에서 상세 정보 추출"""
-    try:
-        driver.get(url)
-        time.sleep(2)
-        
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # 병명 추출
-        disease_name_kr = ""
-        disease_name_eng = ""
-        
-        title_elem = soup.find('h3')
-        if title_elem:
-            title_text = title_elem.get_text(strip=True)
-            if '[' in title_text and ']' in title_text:
-                disease_name_kr = title_text.split('[')[0].strip()
-                disease_name_eng = title_text.split('[')[1].split(']')[0].strip()
-            else:
-                disease_name_kr = title_text
-        else:
-            disease_name_kr = disease_name
-        
-        # 진료과 추출
-        department = ""
-        dept_div = soup.find('div', class_='viewRow tooltipRow')
-        if dept_div:
-            em_tag = dept_div.find('em')
-            if em_tag and '진료과' in em_tag.get_text():
-                p_tag = dept_div.find('p')
-                if p_tag:
-                    dept_links = p_tag.find_all('a')
-                    if dept_links:
-                        departments = [link.get_text(strip=True) for link in dept_links]
-                        department = ', '.join(departments)
-        
-        if not department:
-            all_viewrows = soup.find_all('div', class_='viewRow')
-            for viewrow in all_viewrows:
-                em_tag = viewrow.find('em')
-                if em_tag and '진료과' in em_tag.get_text():
-                    p_tag = viewrow.find('p')
-                    if p_tag:
-                        dept_links = p_tag.find_all('a')
-                        if dept_links:
-                            departments = [link.get_text(strip=True) for link in dept_links]
-                            department = ', '.join(departments)
-                        break
-        
-        # 증상 추출
-        symptoms = ""
-        symptom_div = soup.find('div', id='section-증상')
-        if symptom_div:
-            p_tags = symptom_div.find_all('p')
-            if p_tags:
-                symptoms_list = [p.get_text(strip=True) for p in p_tags if p.get_text(strip=True)]
-                symptoms = ' '.join(symptoms_list)
-        
-        if not symptoms:
-            symptom_headers = soup.find_all('h5')
-            for header in symptom_headers:
-                if '증상' in header.get_text():
-                    parent_div = header.find_parent('div')
-                    if parent_div:
-                        p_tags = parent_div.find_all('p')
-                        if p_tags:
-                            symptoms_list = [p.get_text(strip=True) for p in p_tags if p.get_text(strip=True)]
-                            symptoms = ' '.join(symptoms_list)
-                            break
-        
-        if not symptoms:
-            definition_div = soup.find('div', id='section-정의')
-            if definition_div:
-                p_tags = definition_div.find_all('p')
-                if p_tags:
-                    symptoms_list = [p.get_text(strip=True) for p in p_tags[:2] if p.get_text(strip=True)]
-                    symptoms = ' '.join(symptoms_list)
-        
-        result = {
-            'disease_name_kr': disease_name_kr,
-            'disease_name_eng': disease_name_eng,
-            'department': department if department else None,
-            'symptoms': symptoms if symptoms else None,
-            'url': url
-        }
-        
-        return result
-        
-    except Exception as e:
-        print(f"  ✗ 오류: {e}")
-        return None
-
-
-def batch_insert_to_db(conn, data_list):
-    """배치로 데이터 삽입 (20개씩)"""
-    try:
-        cursor = conn.cursor()
-        
-        # 테이블명과 컬럼명은 실제 DB 스키마에 맞게 수정하세요
-        insert_query = """
-            INSERT INTO snuh_diseases 
-            (disease_name_kr, disease_name_eng, department, symptoms, url, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (url) DO UPDATE SET
-                disease_name_kr = EXCLUDED.disease_name_kr,
-                disease_name_eng = EXCLUDED.disease_name_eng,
-                department = EXCLUDED.department,
-                symptoms = EXCLUDED.symptoms,
-                created_at = NOW()
-        """
-        
-        # 데이터 준비
-        values = [
-            (
-                data['disease_name_kr'],
-                data['disease_name_eng'],
-                data['department'],
-                data['symptoms'],
-                data['url'],
-                datetime.now()
-            )
-            for data in data_list
-        ]
-        
-        cursor.executemany(insert_query, values)
-        conn.commit()
-        cursor.close()
-        
-        print(f" → DB 저장: {len(data_list)}개")
-        return True
-        
-    except Exception as e:
-        print(f"\n  DB 배치 삽입 오류: {e}")
-        conn.rollback()
-        return False
+def main(resume=False, argv=()):
+    """crawler.py snuh와 같음 (DB 접속 정보 등은 crawler.toml과 --profile, --config, --set에서 읽음)"""
+    crawler.main(['snuh', *(['--resume'] if resume else []), *argv])
 
 
-def main():
-    print("=" * 60)
-    print("서울대학교병원 질병정보 크롤링 → DB 저장")
-    print("=" * 60)
-    
-    # DB 연결
-    conn = connect_db()
-    if not conn:
-        print("데이터베이스 연결 실패. 프로그램을 종료합니다.")
-        return
-    
-    try:
-        # Step 1: 질병 목록 수집
-        print("\n[Step 1] 질병 목록 수집 중...")
-        disease_list = get_all_disease_list(driver, max_pages=200)
-        
-        if not disease_list:
-            print("\n질병 목록을 찾을 수 없습니다.")
-            return
-        
-        print(f"\n총 {len(disease_list)}개 질병 발견")
-        
-        # Step 2: 상세 정보 크롤링 및 DB 저장
-        print(f"\n[Step 2] 상세 정보 크롤링 및 DB 저장 시작...")
-        print("-" * 60)
-        
-        batch_data = []
-        total = len(disease_list)
-        success_count = 0
-        fail_count = 0
-        
-        for idx, disease in enumerate(disease_list, 1):
-            print(f"[{idx}/{total}] {disease['disease_name'][:40]}...", end=" ")
-            
-            detail = get_disease_detail(driver, disease['url'], disease['disease_name'])
-            
-            if detail:
-                batch_data.append(detail)
-                print("✓", end="")
-                success_count += 1
-                
-                # 20개마다 배치로 DB에 저장
-                if len(batch_data) >= 20:
-                    batch_insert_to_db(conn, batch_data)
-                    batch_data = []  # 초기화
-                
-            else:
-                print("✗")
-                fail_count += 1
-            
-            time.sleep(1.5)
-        
-        # 남은 데이터 저장
-        if batch_data:
-            print()
-            batch_insert_to_db(conn, batch_data)
-        
-        # Step 3: 결과 출력
-        print("\n" + "=" * 60)
-        print("[Step 3] 크롤링 완료")
-        print("=" * 60)
-        print(f"\n✅ 총 수집: {len(disease_list)}개")
-        print(f"✅ 성공: {success_count}개")
-        print(f"✗ 실패: {fail_count}개")
-        print(f"✅ DB 저장 완료!")
-        
-    except Exception as e:
-        print(f"\n오류: {e}")
-        import traceback
-        traceback.print_exc()
-    
-    finally:
-        conn.close()
-        driver.quit()
-        print("\n완료!")
+def reparse(argv=()):
+    """캐시된 HTML만으로 DB 데이터 다시 생성 (네트워크 사용 안 함, 파싱은 여러 프로세스에서)"""
+    crawler.main(['snuh', '--reparse', *argv])
 
 
 if __name__ == "__main__":
-    main()
+    # 옵션(--reparse, --resume, --profile, --config, --set 등)은 crawler.py와 같음
+    crawler.main(['snuh', *sys.argv[1:]])
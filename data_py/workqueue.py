@@ -0,0 +1,354 @@
+"""분산 크롤링용 작업 대기열 (임대·하트비트)
+
+코디네이터가 목록에서 찾은 질병 URL을 대기열에 넣으면, 여러 노드의 워커가 몇 개씩
+임대(lease)해 상세 페이지를 처리하고 결과를 알린다. 워커는 처리 중인 URL의 임대를
+하트비트로 연장하며, 워커가 죽어 임대가 끝나면 그 URL은 다른 워커가 다시 가져간다.
+max_attempts번 임대됐는데도 끝나지 않은 URL은 실패로 남는다.
+complete/fail은 자기 임대가 아직 유효한 URL에만 반영되고, 임대가 끝나 다른 워커에게
+넘어간 URL은 돌려준다 (늦게 끝난 워커가 다른 워커의 처리 결과를 덮어쓰지 않게).
+
+    SqliteWorkQueue('crawl_queue.db')   # 한 노드 (여러 프로세스)
+    PgWorkQueue(uni.DB_CONFIG)          # 여러 노드, SELECT ... FOR UPDATE SKIP LOCKED
+
+두 구현은 같은 메서드(add, claim, heartbeat, complete, fail, release, ...)를 가진다.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+# 임대 시간(초): 이 시간 안에 하트비트가 없으면 다른 워커가 가져감. 한 URL의 최대 임대 횟수
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+
+
+class SqliteWorkQueue:
+    """로컬 SQLite 파일 대기열 (한 노드의 여러 워커 프로세스)
+
+    임대는 BEGIN IMMEDIATE로 쓰기 잠금을 잡고 UPDATE ... RETURNING 한 번으로 한다.
+    """
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_queue (
+                site TEXT NOT NULL,
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                disease TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (site, url)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS crawl_queue_status ON crawl_queue (site, status, position)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_queue_sites (
+                site TEXT PRIMARY KEY,
+                list_complete INTEGER NOT NULL
+            )
+        """)
+        self.lock = threading.Lock()
+
+    def _write(self, sql, params=()):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(sql, params).fetchall()
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def reset(self, site):
+        """사이트의 대기열을 비움 (새 크롤링)"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute("DELETE FROM crawl_queue WHERE site = ?", (site,))
+            self.conn.execute("INSERT OR REPLACE INTO crawl_queue_sites VALUES (?, 0)", (site,))
+            self.conn.execute("COMMIT")
+
+    def add(self, site, diseases):
+        """발견한 질병 추가 (이미 있는 URL은 그대로) → 새로 추가한 수"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            position = self.conn.execute(
+                "SELECT COALESCE(MAX(position), 0) FROM crawl_queue WHERE site = ?", (site,)
+            ).fetchone()[0]
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO crawl_queue (site, url, position, disease, status) VALUES (?, ?, ?, ?, ?)",
+                [(site, d['url'], position + i, json.dumps(d, ensure_ascii=False), PENDING)
+                 for i, d in enumerate(diseases, 1)],
+            )
+            self.conn.execute("COMMIT")
+            return self.conn.total_changes - before
+
+    def finish_list(self, site):
+        """목록 탐색이 끝났음을 기록 (이후 대기열이 비면 워커가 끝남)"""
+        self._write("INSERT OR REPLACE INTO crawl_queue_sites VALUES (?, 1)", (site,))
+
+    def claim(self, site, worker, limit):
+        """대기 중이거나 임대가 끝난 URL을 limit개까지 임대 → 질병 목록 (발견 순서)"""
+        now = time.time()
+        # 임대 횟수를 다 쓰고 임대도 끝난 URL은 실패로
+        self._write(
+            "UPDATE crawl_queue SET status = ?, worker = NULL "
+            "WHERE site = ? AND status = ? AND lease_until < ? AND attempts >= ?",
+            (FAILED, site, LEASED, now, self.max_attempts),
+        )
+        rows = self._write(
+            "UPDATE crawl_queue SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1 "
+            "WHERE rowid IN (SELECT rowid FROM crawl_queue WHERE site = ? AND attempts < ? "
+            "  AND (status = ? OR (status = ? AND lease_until < ?)) ORDER BY position LIMIT ?) "
+            "RETURNING position, disease",
+            (LEASED, worker, now + self.lease_seconds, site, self.max_attempts, PENDING, LEASED, now, limit),
+        )
+        return [json.loads(disease) for _, disease in sorted(rows)]
+
+    def heartbeat(self, worker):
+        """워커가 임대 중인 URL의 임대 연장 → 연장한 수"""
+        rows = self._write(
+            "UPDATE crawl_queue SET lease_until = ? WHERE worker = ? AND status = ? RETURNING url",
+            (time.time() + self.lease_seconds, worker, LEASED),
+        )
+        return len(rows)
+
+    def complete(self, site, worker, urls):
+        """처리가 끝난 URL → 임대를 잃어 반영하지 못한 URL 목록"""
+        return self._update_leased(
+            "UPDATE crawl_queue SET status = ?, worker = NULL "
+            "WHERE site = ? AND url = ? AND status = ? AND worker = ? AND lease_until >= ?",
+            lambda url, now: (DONE, site, url, LEASED, worker, now), urls,
+        )
+
+    def fail(self, site, worker, urls):
+        """처리에 실패한 URL (임대 횟수가 남았으면 다시 대기, 아니면 실패로) → 임대를 잃은 URL 목록"""
+        return self._update_leased(
+            "UPDATE crawl_queue SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, worker = NULL "
+            "WHERE site = ? AND url = ? AND status = ? AND worker = ? AND lease_until >= ?",
+            lambda url, now: (self.max_attempts, FAILED, PENDING, site, url, LEASED, worker, now), urls,
+        )
+
+    def _update_leased(self, sql, params, urls):
+        # 한 트랜잭션에서 URL마다 갱신하고, 갱신되지 않은(임대가 이 워커에게 없는) URL을 모음
+        if not urls:
+            return []
+        lost = []
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                for url in urls:
+                    if self.conn.execute(sql, params(url, now)).rowcount == 0:
+                        lost.append(url)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return lost
+
+    def release(self, worker):
+        """워커 종료: 임대 중인 URL을 임대 횟수를 되돌려 대기열로"""
+        self._write(
+            "UPDATE crawl_queue SET status = ?, worker = NULL, attempts = attempts - 1 "
+            "WHERE worker = ? AND status = ? RETURNING url",
+            (PENDING, worker, LEASED),
+        )
+
+    def drained(self, site):
+        """목록 탐색이 끝났고 대기·임대 중인 URL이 없는지"""
+        with self.lock:
+            row = self.conn.execute("SELECT list_complete FROM crawl_queue_sites WHERE site = ?", (site,)).fetchone()
+            active = self.conn.execute(
+                "SELECT COUNT(*) FROM crawl_queue WHERE site = ? AND status IN (?, ?)", (site, PENDING, LEASED)
+            ).fetchone()[0]
+        return bool(row and row[0]) and active == 0
+
+    def counts(self, site):
+        """상태별 URL 수"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM crawl_queue WHERE site = ? GROUP BY status", (site,)
+            ).fetchall()
+        counts = dict.fromkeys((PENDING, LEASED, DONE, FAILED), 0)
+        counts.update(rows)
+        return counts
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class PgWorkQueue:
+    """PostgreSQL 대기열 (여러 노드). 임대는 SELECT ... FOR UPDATE SKIP LOCKED로 한다
+
+    임대 시각은 DB 시계(clock_timestamp)로 정하므로 노드 간 시계 차이의 영향을 받지 않는다.
+    """
+
+    def __init__(self, db_config, table='crawl_queue', lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        import psycopg2  # DB 대기열을 쓸 때만 불러옴
+
+        self.table = table
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.conn = psycopg2.connect(**db_config)
+        self.lock = threading.Lock()
+        self._execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                site text NOT NULL,
+                url text NOT NULL,
+                position integer NOT NULL,
+                disease text NOT NULL,
+                status text NOT NULL,
+                worker text,
+                lease_until double precision,
+                attempts integer NOT NULL DEFAULT 0,
+                PRIMARY KEY (site, url)
+            );
+            CREATE INDEX IF NOT EXISTS {table}_status ON {table} (site, status, position);
+            CREATE TABLE IF NOT EXISTS {table}_sites (
+                site text PRIMARY KEY,
+                list_complete boolean NOT NULL
+            )
+        """)
+
+    def _execute(self, sql, params=(), many=False, fetch=False):
+        with self.lock:
+            try:
+                with self.conn.cursor() as cursor:
+                    if many:
+                        cursor.executemany(sql, params)
+                    else:
+                        cursor.execute(sql, params)
+                    rows = cursor.fetchall() if fetch else cursor.rowcount
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return rows
+
+    def reset(self, site):
+        self._execute(
+            f"DELETE FROM {self.table} WHERE site = %s; "
+            f"INSERT INTO {self.table}_sites VALUES (%s, false) "
+            f"ON CONFLICT (site) DO UPDATE SET list_complete = false",
+            (site, site),
+        )
+
+    def add(self, site, diseases):
+        if not diseases:
+            return 0
+        position = self._execute(
+            f"SELECT COALESCE(MAX(position), 0) FROM {self.table} WHERE site = %s", (site,), fetch=True
+        )[0][0]
+        rows = self._execute(
+            f"INSERT INTO {self.table} (site, url, position, disease, status) "
+            f"SELECT %s, d->>'url', %s + n, d::text, %s "
+            f"FROM jsonb_array_elements(%s::jsonb) WITH ORDINALITY AS t(d, n) "
+            f"ON CONFLICT (site, url) DO NOTHING RETURNING url",
+            (site, position, PENDING, json.dumps(list(diseases), ensure_ascii=False)),
+            fetch=True,
+        )
+        return len(rows)
+
+    def finish_list(self, site):
+        self._execute(
+            f"INSERT INTO {self.table}_sites VALUES (%s, true) ON CONFLICT (site) DO UPDATE SET list_complete = true",
+            (site,),
+        )
+
+    def claim(self, site, worker, limit):
+        now = "extract(epoch from clock_timestamp())"
+        self._execute(
+            f"UPDATE {self.table} SET status = %s, worker = NULL "
+            f"WHERE site = %s AND status = %s AND lease_until < {now} AND attempts >= %s",
+            (FAILED, site, LEASED, self.max_attempts),
+        )
+        rows = self._execute(
+            f"UPDATE {self.table} q SET status = %s, worker = %s, lease_until = {now} + %s, attempts = q.attempts + 1 "
+            f"FROM (SELECT site, url FROM {self.table} WHERE site = %s AND attempts < %s "
+            f"      AND (status = %s OR (status = %s AND lease_until < {now})) "
+            f"      ORDER BY position LIMIT %s FOR UPDATE SKIP LOCKED) c "
+            f"WHERE q.site = c.site AND q.url = c.url RETURNING q.position, q.disease",
+            (LEASED, worker, self.lease_seconds, site, self.max_attempts, PENDING, LEASED, limit),
+            fetch=True,
+        )
+        return [json.loads(disease) for _, disease in sorted(rows)]
+
+    def heartbeat(self, worker):
+        return self._execute(
+            f"UPDATE {self.table} SET lease_until = extract(epoch from clock_timestamp()) + %s "
+            f"WHERE worker = %s AND status = %s",
+            (self.lease_seconds, worker, LEASED),
+        )
+
+    def complete(self, site, worker, urls):
+        if not urls:
+            return []
+        rows = self._execute(
+            f"UPDATE {self.table} SET status = %s, worker = NULL "
+            f"WHERE site = %s AND url = ANY(%s) AND status = %s AND worker = %s "
+            f"AND lease_until >= extract(epoch from clock_timestamp()) RETURNING url",
+            (DONE, site, list(urls), LEASED, worker), fetch=True,
+        )
+        updated = {url for url, in rows}
+        return [url for url in urls if url not in updated]
+
+    def fail(self, site, worker, urls):
+        if not urls:
+            return []
+        rows = self._execute(
+            f"UPDATE {self.table} SET status = CASE WHEN attempts >= %s THEN %s ELSE %s END, worker = NULL "
+            f"WHERE site = %s AND url = ANY(%s) AND status = %s AND worker = %s "
+            f"AND lease_until >= extract(epoch from clock_timestamp()) RETURNING url",
+            (self.max_attempts, FAILED, PENDING, site, list(urls), LEASED, worker), fetch=True,
+        )
+        updated = {url for url, in rows}
+        return [url for url in urls if url not in updated]
+
+    def release(self, worker):
+        self._execute(
+            f"UPDATE {self.table} SET status = %s, worker = NULL, attempts = attempts - 1 "
+            f"WHERE worker = %s AND status = %s",
+            (PENDING, worker, LEASED),
+        )
+
+    def drained(self, site):
+        complete, active = self._execute(
+            f"SELECT COALESCE((SELECT list_complete FROM {self.table}_sites WHERE site = %s), false), "
+            f"(SELECT COUNT(*) FROM {self.table} WHERE site = %s AND status IN (%s, %s))",
+            (site, site, PENDING, LEASED), fetch=True,
+        )[0]
+        return complete and active == 0
+
+    def counts(self, site):
+        rows = self._execute(
+            f"SELECT status, COUNT(*) FROM {self.table} WHERE site = %s GROUP BY status", (site,), fetch=True
+        )
+        counts = dict.fromkeys((PENDING, LEASED, DONE, FAILED), 0)
+        counts.update(rows)
+        return counts
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def open_queue(target, db_config=None, **options):
+    """'postgres'면 PostgreSQL 대기열(db_config), 아니면 그 경로의 SQLite 대기열"""
+    if target == 'postgres':
+        return PgWorkQueue(db_config, **options)
+    return SqliteWorkQueue(target, **options)